@@ -2,7 +2,6 @@ import math
 import random
 from math import pow, sin, degrees
 from pyglet.event import EventDispatcher
-from pyglet.resource import media
 from wasabisg.scenegraph import ModelNode, GroupNode
 from wasabisg.lighting import Light
 
@@ -12,9 +11,10 @@ from .sound import SoundPlayer
 from .models import (
     hull_model, mast_models, cannonball_model
 )
-from .physics import Positionable, Sphere, Body, LineSegment
+from .physics import Positionable, Sphere, Body
+from .pool import Pool
 from .particles import WakeEmitter, spawn_smoke, spawn_splinters
-from .sailing import get_sail_power, get_heeling_moment, get_sail_setting
+from .sailing import SailingPolar
 from .utils import map_angle
 
 
@@ -78,57 +78,60 @@ class InterpolatingController(object):
 
 
 class Cannonball(object):
-    GRAVITY = Vector3(0, -1.0, 0)
     HIT_SOUND = SoundPlayer('explode.mp3')
     SPLASH_SOUND = SoundPlayer('watersplash.mp3')
 
     def __init__(self, pos, v, owner):
-        self.model = ModelNode(cannonball_model)
-        self.pos = self.lastpos = pos
+        self.model = ModelNode(cannonball_model.get())
+        self.reset(pos, v, owner)
+
+    def reset(self, pos, v, owner):
+        self.pos = self.lastpos = self.model.pos = pos
         self.v = v
         self.owner = owner
 
-    def update(self, dt):
-        u = self.v
-        self.v += self.GRAVITY * dt
-        s = 0.5 * (u + self.v) * dt
-
-        line = LineSegment(self.pos, s)
-        for o in self.world.objects:
-            if not isinstance(o, Ship) or o is self.owner:
-                continue
-            hit = line.collide_body(o.body)
-            if hit:
-                self.HIT_SOUND.play(hit)
-                spawn_splinters(hit, self.v)
-                self.world.destroy(self)
-                o.dispatch_event('on_hit', self.owner, hit)
-                killed = o.damage()
-                if killed:
-                    self.owner.dispatch_event('on_kill', o)
-                else:
-                    self.owner.dispatch_event('on_enemy_hit', o, hit)
-                return
-
-        self.pos += s
-
-        if self.pos.y < 0:
-            self.world.destroy(self)
-            self.SPLASH_SOUND.play(self.pos, volume=0.5)
+    # Cannonballs are moved by the world's Projectiles system, which calls
+    # these methods back.
+
+    def moved(self, pos):
+        self.pos = self.model.pos = pos
+
+    def hit(self, target, pos, v):
+        self.pos = pos
+        self.v = v
+        self.HIT_SOUND.play(pos)
+        spawn_splinters(pos, v)
+        self.world.destroy(self)
+        target.dispatch_event('on_hit', self.owner, pos)
+        killed = target.damage()
+        if killed:
+            self.owner.dispatch_event('on_kill', target)
         else:
-            self.model.pos = self.pos
+            self.owner.dispatch_event('on_enemy_hit', target, pos)
+
+    def splash(self, pos):
+        self.pos = pos
+        self.world.destroy(self)
+        self.SPLASH_SOUND.play(pos, volume=0.5)
 
 
 class MuzzleFlash(object):
+    INTENSITY = 10
+
     def __init__(self, pos):
         self.model = Light(
             pos,
             colour=(1, 0.6, 0.3, 1.0),
-            intensity=10,
+            intensity=self.INTENSITY,
             falloff=0.5
         )
         self.age = 0
 
+    def reset(self, pos):
+        self.model.pos = pos
+        self.model.intensity = self.INTENSITY
+        self.age = 0
+
     def update(self, dt):
         self.age += dt
         if self.age > 1.0:
@@ -136,6 +139,12 @@ class MuzzleFlash(object):
         self.model.intensity *= pow(0.01, dt)
 
 
+# Dead cannonballs and muzzle flashes are recycled. The World releases
+# objects to their class's pool when they are destroyed.
+Cannonball.pool = Pool(Cannonball, size=256)
+MuzzleFlash.pool = Pool(MuzzleFlash, size=32)
+
+
 class Ship(EventDispatcher, Positionable):
     # Y up, -z forward
     GUNS = {
@@ -156,17 +165,20 @@ class Ship(EventDispatcher, Positionable):
 
     WIND = Vector3(1, 0, 0)
 
+    # Sailing performance; ship classes may provide their own
+    POLAR = SailingPolar()
+
     MODELS = mast_models
 
-    SINKING_SOUND = media('bubble1.mp3', streaming=False)
-    CANNON_SOUND = media('cannon2.mp3', streaming=False)
+    SINKING_SOUND = SoundPlayer('bubble1.mp3')
+    CANNON_SOUND = SoundPlayer('cannon2.mp3')
 
     faction = 1
 
     def __init__(self, pos=Point3(0, 0, 0), angle=0, max_health=3):
         super(Ship, self).__init__(pos)
         self.model = GroupNode([
-            ModelNode(hull_model),
+            ModelNode(hull_model.get()),
             ModelNode(self.MODELS[0], pos=Point3(0, 1.18, 2.67)),
             ModelNode(self.MODELS[3], pos=Point3(0, 1.08, 0.61)),
             ModelNode(self.MODELS[6], pos=Point3(0, 1.18, -1.2)),
@@ -191,26 +203,35 @@ class Ship(EventDispatcher, Positionable):
         lookahead units ahead or astern of us.
 
         """
-        if not self.world:
-            return []
         targets = {
             'port': [],
             'starboard': []
         }
+        if not self.world:
+            return targets
 
         m = self.get_matrix()
         forward = m * Vector3(0, 0, -1)
         port = m * Vector3(1, 0, 0)
         range2 = range * range
 
-        for o in self.world.objects:
-            if isinstance(o, Ship) and o is not self:
+        for o in self.world.index.query(self.pos, range):
+            if o is not self:
                 rel = o.pos - self.pos
                 if abs(rel.dot(forward)) < lookahead and rel.magnitude_squared() < range2:
                     side = 'port' if rel.dot(port) > 0 else 'starboard'
                     targets[side].append(o)
         return targets
 
+    def get_nearest_enemy(self, range=70):
+        """Get the nearest ship of another faction within range, or None."""
+        if not self.world:
+            return None
+        return self.world.index.nearest(
+            self.pos, range,
+            lambda o: o.faction != self.faction and o.alive
+        )
+
     def fire(self):
         """Fire the cannons!
 
@@ -243,7 +264,7 @@ class Ship(EventDispatcher, Positionable):
                 num
             )
         self.last_broadside = side
-        self.world.spawn(MuzzleFlash(wpos))
+        self.world.spawn(MuzzleFlash.pool.acquire(wpos))
 
     def fire_gun(self, side, num):
         pos, v = self.GUNS[side][num]
@@ -258,9 +279,8 @@ class Ship(EventDispatcher, Positionable):
         up = Vector3(0, 1, 0)
         wvec -= up * 0.5 * wvec.dot(up)
         wpos = m * pos
-        p = self.CANNON_SOUND.play()
-        p.position = wpos
-        self.world.spawn(Cannonball(wpos, wvec, owner=self))
+        self.CANNON_SOUND.play(wpos)
+        self.world.spawn(Cannonball.pool.acquire(wpos, wvec, owner=self))
         spawn_smoke(wpos, wvec)
         return wpos
 
@@ -303,8 +323,7 @@ class Ship(EventDispatcher, Positionable):
 
     def kill(self):
         if self.alive:
-            p = self.SINKING_SOUND.play()
-            p.position = self.pos
+            self.SINKING_SOUND.play(self.pos)
             self.alive = False
             self.helm.set_immediate(0)
             self.sail.set_immediate(0)
@@ -348,8 +367,7 @@ class Ship(EventDispatcher, Positionable):
         forward = q * Vector3(0, 0, 1)
         angular_velocity = self.helm.current * min(forward.dot(self.vel), 2) * 0.03
         angle_to_wind = map_angle(self.world.wind_angle - self.angle)
-        sail_power = get_sail_power(angle_to_wind)
-        heeling_moment = get_heeling_moment(angle_to_wind)
+        sail_power, heeling_moment, sail_angle = self.POLAR.get(angle_to_wind)
 
         rollmoment += angular_velocity * 0.5  # lean over from centrifugal force of turn
         rollmoment -= heeling_moment * 0.05 * self.sail.current  # heel from wind force
@@ -381,7 +399,6 @@ class Ship(EventDispatcher, Positionable):
 
         # Adjust sail angle to wind direction
         if self.alive:
-            sail_angle = get_sail_setting(angle_to_wind)
             for sail in self.model.nodes[1:]:
                 sail.rotation = degrees(sail_angle), 0, 1, 0
 
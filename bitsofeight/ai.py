@@ -1,5 +1,7 @@
 import random
 import math
+import heapq
+from timeit import default_timer
 from math import pi, degrees
 from euclid import Vector2, Vector3
 
@@ -17,6 +19,79 @@ def in_plane(vec3):
     return Vector2(vec3.x, vec3.z)
 
 
+class AIScheduler(object):
+    """Run the periodic thinking of all ship AIs.
+
+    Rather than every AI and strategy registering its own callback with the
+    world clock, they register with the scheduler, which runs everything
+    that is due each frame as one batch.
+
+    New tasks are given staggered phases, so that tasks with the same
+    interval are spread across frames rather than all falling due together.
+
+    If budget is given, the scheduler stops running tasks once it has spent
+    budget seconds in a frame; the rest run first thing next frame. At least
+    one task always runs per frame. Without a budget, the order in which
+    tasks run is deterministic.
+
+    """
+    # Golden ratio conjugate, for spreading out phases
+    STAGGER = 0.6180339887
+
+    def __init__(self, budget=None):
+        self.budget = budget
+        self.t = 0.0
+        self.queue = []
+        self.tasks = {}
+        self.seq = 0
+        self.deferred = 0  # number of tasks postponed by the budget last frame
+
+    def __len__(self):
+        return len(self.tasks)
+
+    def schedule_interval(self, func, interval):
+        """Call func(dt) every interval seconds until unscheduled."""
+        self.unschedule(func)
+        self.seq += 1
+        phase = (self.seq * self.STAGGER) % 1.0
+        task = [self.t + interval * phase, self.seq, func, interval, self.t]
+        self.tasks[func] = task
+        heapq.heappush(self.queue, task)
+
+    def unschedule(self, func):
+        """Stop calling func."""
+        task = self.tasks.pop(func, None)
+        if task:
+            task[2] = None
+
+    def update(self, t):
+        """Run the tasks that are due at time t."""
+        self.t = t
+        queue = self.queue
+        budget = self.budget
+        if budget is not None:
+            deadline = default_timer() + budget
+        ran = 0
+        self.deferred = 0
+        while queue and queue[0][0] <= t:
+            if ran and budget is not None and default_timer() > deadline:
+                self.deferred = sum(
+                    1 for task in queue if task[0] <= t and task[2]
+                )
+                break
+            task = heapq.heappop(queue)
+            due, seq, func, interval, last = task
+            if func is None:
+                continue
+            next_due = due + interval
+            task[0] = next_due if next_due > t else t + interval
+            task[4] = t
+            heapq.heappush(queue, task)
+            func(t - last)
+            ran += 1
+        return ran
+
+
 class ShipAI(object):
     def __init__(self, ship, debug=False):
         self.world = ship.world
@@ -40,10 +115,13 @@ class ShipAI(object):
             print msg % args
 
     def on_death(self):
+        self.clear_target()
         self.stop()
 
     def on_hit(self, ship, pos):
         """Set this as the current target."""
+        if not self.ship.alive:
+            return
         if ship.faction != self.ship.faction:
             self.set_target(ship)
             self.consider_strategy()
@@ -52,11 +130,15 @@ class ShipAI(object):
     def clock(self):
         return self.world.clock
 
+    @property
+    def scheduler(self):
+        return self.world.ai
+
     def start(self):
-        self.clock.schedule_interval(self.consider_strategy, 5.0)
+        self.scheduler.schedule_interval(self.consider_strategy, 5.0)
 
     def stop(self):
-        self.clock.unschedule(self.consider_strategy)
+        self.scheduler.unschedule(self.consider_strategy)
         if self.strategy:
             self.strategy.stop()
 
@@ -132,17 +214,24 @@ class ShipAI(object):
         self.consider_strategy()
 
     def pick_target(self):
-        """Pick and return a promising target."""
-        for lookahead, range in [(15, 30), (70, 70)]:
-            targets = [
-                t
-                for side in self.ship.get_targets(lookahead, range).values()
-                for t in side
-                if t.faction != self.ship.faction
-            ]
-            if targets:
-                self.set_target(random.choice(targets))
-                return
+        """Pick and return a promising target.
+
+        We prefer enemies that are close to our broadside, otherwise we go
+        for the nearest enemy in range.
+
+        """
+        targets = [
+            t
+            for side in self.ship.get_targets(15, 30).values()
+            for t in side
+            if t.faction != self.ship.faction
+        ]
+        if targets:
+            self.set_target(random.choice(targets))
+            return
+        nearest = self.ship.get_nearest_enemy(70)
+        if nearest:
+            self.set_target(nearest)
 
     def consider_strategy(self, *args):
         """Consider a different strategy."""
@@ -202,10 +291,10 @@ class Strategy(object):
         return self.ai.ship
 
     def start(self):
-        self.ai.clock.schedule_interval(self.update_base, self.INTERVAL)
+        self.ai.scheduler.schedule_interval(self.update_base, self.INTERVAL)
 
     def stop(self):
-        self.ai.clock.unschedule(self.update_base)
+        self.ai.scheduler.unschedule(self.update_base)
 
     def update_base(self, dt):
         try:
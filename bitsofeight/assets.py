@@ -0,0 +1,131 @@
+"""Game assets, declared by name and loaded when they are first used.
+
+Modules declare the models, sounds and textures they need when they are
+imported, but nothing is loaded until it is used, so that tools, tests and
+headless simulations need not pay for assets they never touch::
+
+    from .assets import assets
+
+    FIRE_SOUND = assets.sound('fire.wav')
+    ...
+    FIRE_SOUND.get().play()
+
+The game calls assets.warm_up() once it has a GL context, to load everything
+up front rather than in the middle of a battle.
+
+"""
+import pyglet.resource
+from wasabisg.atlas import Atlas
+
+from . import resources  # noqa
+
+
+class Asset(object):
+    """A named asset, loaded by calling load() when it is first used."""
+    def __init__(self, name, load, kind=None):
+        self.name = name
+        self.load = load
+        self.kind = kind
+        self.value = None
+        self.loaded = False
+
+    def __repr__(self):
+        return '<Asset %s%s>' % (self.name, '' if self.loaded else ' (lazy)')
+
+    def get(self):
+        """Get the asset, loading it if necessary."""
+        if not self.loaded:
+            self.value = self.load()
+            self.loaded = True
+        return self.value
+
+
+class AssetList(object):
+    """A sequence of assets, each loaded when it is first accessed."""
+    def __init__(self, assets):
+        self.assets = assets
+
+    def __len__(self):
+        return len(self.assets)
+
+    def __getitem__(self, i):
+        return self.assets[i].get()
+
+    def __iter__(self):
+        for a in self.assets:
+            yield a.get()
+
+
+class Assets(object):
+    """A registry of assets, in the order they were declared."""
+    def __init__(self):
+        self.assets = {}
+        self.order = []
+
+    def __contains__(self, name):
+        return name in self.assets
+
+    def __getitem__(self, name):
+        """Get the asset name, loading it if necessary."""
+        return self.assets[name].get()
+
+    def declare(self, name, load, kind=None):
+        """Declare an asset, to be loaded by calling load().
+
+        If name has already been declared, the existing Asset is returned.
+
+        """
+        try:
+            return self.assets[name]
+        except KeyError:
+            asset = self.assets[name] = Asset(name, load, kind)
+            self.order.append(asset)
+            return asset
+
+    def sound(self, name):
+        """Declare a sound resource that is decoded into memory."""
+        return self.declare(
+            name, lambda: pyglet.resource.media(name, streaming=False),
+            kind='sound'
+        )
+
+    def texture(self, name):
+        """Declare a texture resource."""
+        return self.declare(name, lambda: pyglet.resource.texture(name))
+
+    def packed_texture(self, name):
+        """Declare a texture resource that is packed into the shared atlas."""
+        return self.declare(name, lambda: atlas.texture(name))
+
+    def image(self, name):
+        """Declare an image resource."""
+        return self.declare(name, lambda: pyglet.resource.image(name))
+
+    def names(self, kind):
+        """Get the names of the assets of the given kind, in order."""
+        return [a.name for a in self.order if a.kind == kind]
+
+    def list(self, names):
+        """Get an AssetList of the assets name, which must be declared."""
+        return AssetList([self.assets[n] for n in names])
+
+    def warm_up(self, progress=None):
+        """Load every asset that is not yet loaded.
+
+        If given, progress(done, total, name) is called as each is loaded.
+        Return the number of assets loaded.
+
+        """
+        pending = [a for a in self.order if not a.loaded]
+        for i, a in enumerate(pending):
+            a.get()
+            if progress:
+                progress(i + 1, len(pending), a.name)
+        return len(pending)
+
+
+# The assets of the game
+assets = Assets()
+
+# Small textures are packed into this, to share texture binds
+atlas = Atlas()
@@ -0,0 +1,318 @@
+"""Repeatable benchmarks of the battle simulation.
+
+Each scenario sets up a headless World from a fixed random seed, steps it
+through a fixed number of ticks and records the simulation rate, the time
+spent in each part of World.update and the growth in memory use. Results are
+written as JSON so that runs on different commits can be compared::
+
+    bitsofeight-bench -o before.json
+    # ... make changes ...
+    bitsofeight-bench -o after.json --compare before.json
+
+"""
+# headless must be imported before anything that imports pyglet.gl
+from . import headless
+
+import gc
+import os
+import sys
+import json
+import math
+import random
+import platform
+import subprocess
+from timeit import default_timer
+
+import numpy
+from euclid import Point3, Vector3
+
+from .world import World
+from .actors import Ship, Cannonball
+from .ai import ShipAI
+
+tau = 2 * math.pi
+
+# Fleet sizes for the scaling curve
+SHIPS = [5, 10, 20, 50, 100, 200, 500, 1000]
+
+# The sections of World.update that are reported, in the order they run
+SUBSYSTEMS = ['ai', 'ships', 'effects', 'projectiles', 'collisions']
+
+
+class Scenario(object):
+    """A battle of ships ships at some density, with balls cannonballs.
+
+    density is the number of ships per 100x100 area of sea. The game's
+    own spawning puts about 2 ships in such an area.
+
+    balls is the number of cannonballs per ship that are in flight when the
+    benchmark starts.
+
+    """
+    def __init__(self, name, density=2.0, balls=0):
+        self.name = name
+        self.density = density
+        self.balls = balls
+
+    def radius(self, ships):
+        """Radius of the circle that holds ships ships at our density."""
+        return math.sqrt(ships * 10000.0 / (self.density * math.pi))
+
+    def create(self, ships, seed=0, batch_dynamics=False):
+        """Create a world for a battle of the given number of ships."""
+        random.seed(seed)
+        world = World(headless=True, batch_dynamics=batch_dynamics)
+        radius = self.radius(ships)
+        fleet = []
+        for i in xrange(ships):
+            bearing = random.uniform(0, tau)
+            r = radius * math.sqrt(random.random())
+            s = Ship(
+                pos=Point3(r * math.sin(bearing), 0, r * math.cos(bearing)),
+                angle=random.uniform(0, tau)
+            )
+            s.faction = 1 + i % 2
+            world.spawn(s)
+            ShipAI(s).start()
+            fleet.append(s)
+
+        for i in xrange(ships * self.balls):
+            owner = random.choice(fleet)
+            bearing = random.uniform(0, tau)
+            pos = owner.pos + Vector3(0, random.uniform(1.0, 8.0), 0)
+            v = Vector3(
+                15 * math.sin(bearing),
+                random.uniform(0.0, 3.0),
+                15 * math.cos(bearing)
+            )
+            world.spawn(Cannonball(pos, v, owner=owner))
+        return world
+
+
+SCENARIOS = [
+    Scenario('sparse', density=0.5),
+    Scenario('fleet', density=2.0),
+    Scenario('dense', density=8.0),
+    Scenario('barrage', density=2.0, balls=4),
+]
+
+
+def max_rss():
+    """Return the peak resident memory of this process in kilobytes."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def run_scenario(scenario, ships, ticks, warmup=60, seed=0, dt=headless.DT,
+        batch_dynamics=False):
+    """Benchmark scenario with the given number of ships.
+
+    Return a dictionary of results.
+
+    """
+    world = scenario.create(ships, seed, batch_dynamics=batch_dynamics)
+    balls = len(world.projectiles)
+    for i in xrange(warmup):
+        world.update(dt)
+
+    gc.collect()
+    objects_before = len(gc.get_objects())
+    world.timings.reset()
+    start = default_timer()
+    for i in xrange(ticks):
+        world.update(dt)
+    elapsed = default_timer() - start
+    gc.collect()
+    objects_after = len(gc.get_objects())
+
+    return {
+        'scenario': scenario.name,
+        'ships': ships,
+        'balls': balls,
+        'ticks': ticks,
+        'seconds': elapsed,
+        'ticks_per_sec': ticks / elapsed if elapsed else float('inf'),
+        'ms_per_tick': dict(
+            (k, 1000.0 * world.timings.total(k) / ticks) for k in SUBSYSTEMS
+        ),
+        'objects_delta': objects_after - objects_before,
+        'max_rss_kb': max_rss(),
+        'survivors': len(world.ships),
+    }
+
+
+def git_revision():
+    """Return the git commit we're running from, or None."""
+    try:
+        with open(os.devnull, 'w') as devnull:
+            out = subprocess.check_output(
+                ['git', 'rev-parse', '--short', 'HEAD'],
+                stderr=devnull
+            )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.strip()
+
+
+def run(scenarios, ships, ticks, warmup=60, seed=0, batch_dynamics=False,
+        out=sys.stdout):
+    """Run scenarios at each fleet size, printing a table as we go.
+
+    Return the full results, ready to be written as JSON.
+
+    """
+    results = []
+    out.write(format_header())
+    for scenario in scenarios:
+        for n in ships:
+            r = run_scenario(
+                scenario, n, ticks,
+                warmup=warmup,
+                seed=seed,
+                batch_dynamics=batch_dynamics
+            )
+            out.write(format_row(r))
+            out.flush()
+            results.append(r)
+    return {
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'numpy': numpy.__version__,
+        'platform': platform.platform(),
+        'seed': seed,
+        'batch_dynamics': batch_dynamics,
+        'results': results,
+    }
+
+
+def format_header():
+    return '%-8s %5s %5s %9s  %s %8s\n' % (
+        'scenario', 'ships', 'balls', 'ticks/s',
+        ' '.join('%11s' % s for s in SUBSYSTEMS), 'objects'
+    )
+
+
+def format_row(r):
+    ms = r['ms_per_tick']
+    return '%-8s %5d %5d %9.1f  %s %8d\n' % (
+        r['scenario'], r['ships'], r['balls'], r['ticks_per_sec'],
+        ' '.join('%9.3fms' % ms[s] for s in SUBSYSTEMS),
+        r['objects_delta']
+    )
+
+
+def compare(old, new, threshold=0.1):
+    """Compare two sets of results.
+
+    Return a list of (scenario, ships, old rate, new rate, ratio) for each
+    benchmark present in both, and a list of those that are slower by more
+    than threshold.
+
+    """
+    def key(r):
+        return r['scenario'], r['ships']
+
+    before = dict((key(r), r) for r in old['results'])
+    rows = []
+    regressions = []
+    for r in new['results']:
+        o = before.get(key(r))
+        if o is None:
+            continue
+        ratio = r['ticks_per_sec'] / o['ticks_per_sec']
+        row = key(r) + (o['ticks_per_sec'], r['ticks_per_sec'], ratio)
+        rows.append(row)
+        if ratio < 1.0 - threshold:
+            regressions.append(row)
+    return rows, regressions
+
+
+def main():
+    from optparse import OptionParser
+
+    parser = OptionParser('%prog [-s SHIPS,...] [-o RESULTS] [--compare OLD]')
+    parser.add_option(
+        '-s', '--ships',
+        default=','.join(str(n) for n in SHIPS),
+        help='Comma-separated fleet sizes to benchmark'
+    )
+    parser.add_option(
+        '-S', '--scenario',
+        action='append',
+        choices=[s.name for s in SCENARIOS],
+        help='Scenario to run (may be repeated; default all)'
+    )
+    parser.add_option(
+        '-t', '--ticks',
+        type='int',
+        default=300,
+        help='Number of time steps to time in each benchmark'
+    )
+    parser.add_option(
+        '-w', '--warmup',
+        type='int',
+        default=60,
+        help='Number of time steps to run before timing'
+    )
+    parser.add_option(
+        '--seed',
+        type='int',
+        default=0,
+        help='Random seed for setting up scenarios'
+    )
+    parser.add_option(
+        '-b', '--batch-dynamics',
+        action='store_true',
+        help='Advance ships with the vectorised FleetIntegrator'
+    )
+    parser.add_option(
+        '-o', '--output',
+        help='File to write results to (default benchmark-REVISION.json)'
+    )
+    parser.add_option(
+        '--compare',
+        metavar='OLD',
+        help='Compare results against those saved in OLD'
+    )
+
+    options, args = parser.parse_args()
+    ships = [int(n) for n in options.ships.split(',')]
+    if options.scenario:
+        scenarios = [s for s in SCENARIOS if s.name in options.scenario]
+    else:
+        scenarios = SCENARIOS
+
+    results = run(
+        scenarios, ships, options.ticks,
+        warmup=options.warmup,
+        seed=options.seed,
+        batch_dynamics=options.batch_dynamics
+    )
+
+    output = options.output
+    if not output:
+        output = 'benchmark-%s.json' % (results['revision'] or 'unknown')
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    print "Results written to", output
+
+    if options.compare:
+        with open(options.compare) as f:
+            old = json.load(f)
+        rows, regressions = compare(old, results)
+        print
+        print 'Compared to %s (%s):' % (options.compare, old.get('revision'))
+        for scenario, n, before, after, ratio in rows:
+            print '%-8s %5d %9.1f -> %9.1f ticks/s  %+6.1f%%' % (
+                scenario, n, before, after, (ratio - 1) * 100
+            )
+        if regressions:
+            print '%d benchmarks are more than 10%% slower' % len(regressions)
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
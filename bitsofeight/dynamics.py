@@ -0,0 +1,213 @@
+"""Advance the dynamics of a whole fleet of ships at once.
+
+FleetIntegrator performs the same calculations as Ship.update(), but holds
+the state of every ship in arrays and advances them all with a handful of
+NumPy operations, rather than building quaternions and vectors for each ship
+in turn.
+
+Ships are still changed by other parts of the game - the AI steers them and
+collisions push them around - so each step gathers the ships' state into
+the arrays and writes the results back afterwards.
+
+"""
+import numpy
+from numpy import sin, cos, pi
+from euclid import Point3, Vector3, Quaternion
+
+tau = 2 * pi
+
+
+def map_angles(a):
+    """Map an array of angles into the [-pi, pi] range, like map_angle()."""
+    return numpy.where(a < -pi, a + tau, numpy.where(a > pi, a - tau, a))
+
+
+def qmul(a, b):
+    """Multiply arrays of quaternions, as euclid's Quaternion.__mul__.
+
+    Quaternions are given as (w, x, y, z) tuples of arrays.
+
+    """
+    Aw, Ax, Ay, Az = a
+    Bw, Bx, By, Bz = b
+    return (
+        -Ax * Bx - Ay * By - Az * Bz + Aw * Bw,
+        Ax * Bw + Ay * Bz - Az * By + Aw * Bx,
+        -Ax * Bz + Ay * Bw + Az * Bx + Aw * By,
+        Ax * By - Ay * Bx + Az * Bw + Aw * Bz,
+    )
+
+
+def angle_axis(q):
+    """Vectorised version of Quaternion.get_angle_axis().
+
+    Return arrays of the angle and the x, y and z components of the axis.
+
+    """
+    w, x, y, z = q
+    w = numpy.clip(w, -1.0, 1.0)
+    angle = 2 * numpy.arccos(w)
+    s = numpy.sqrt(1 - w * w)
+    small = s < 0.001
+    s = numpy.where(small, 1.0, s)
+    return (
+        angle,
+        numpy.where(small, 1.0, x / s),
+        numpy.where(small, 0.0, y / s),
+        numpy.where(small, 0.0, z / s),
+    )
+
+
+class FleetIntegrator(object):
+    """Advance ships through time as arrays.
+
+    After gather(), the state of the ships is held in these arrays:
+
+    * t, angle, roll - per ship
+    * helm, sail - the current helm and sail settings
+    * alive - boolean
+    * vel, pos - (n, 3) arrays
+
+    step() advances them, and also computes rot (the ship orientation as a
+    tuple of w, x, y, z arrays) and sail_setting. scatter() writes them
+    back to the ships.
+
+    Sailing performance is looked up from each ship's POLAR, with one batch
+    of lookups for each ship class.
+
+    """
+    def update(self, ships, dt, wind_angle):
+        """Advance ships by the time step dt."""
+        if not ships:
+            return
+        for s in ships:
+            if s.alive:
+                s.helm.update(dt)
+                s.sail.update(dt)
+                s.update_masts(s.sail.current)
+        self.gather(ships)
+        self.step(dt, wind_angle)
+        self.scatter(ships)
+
+    def gather(self, ships):
+        """Load the state of ships into arrays."""
+        state = numpy.array([
+            (s.t, s.angle, s.roll, s.helm.current, s.sail.current, s.alive)
+            + tuple(s.vel) + tuple(s.pos)
+            for s in ships
+        ], dtype=float)
+        self.t = state[:, 0]
+        self.angle = state[:, 1]
+        self.roll = state[:, 2]
+        self.helm = state[:, 3]
+        self.sail = state[:, 4]
+        self.alive = state[:, 5] != 0
+        self.vel = state[:, 6:9]
+        self.pos = state[:, 9:12]
+        self.polars = [s.POLAR for s in ships]
+
+    def polar_groups(self):
+        """Get pairs of polar and the index of the ships that use it."""
+        polars = self.polars
+        first = polars[0]
+        if all(p is first for p in polars):
+            return [(first, slice(None))]
+        return [
+            (p, numpy.array([q is p for q in polars]))
+            for p in set(polars)
+        ]
+
+    def step(self, dt, wind_angle):
+        """Advance the arrays by the time step dt, as Ship.update() does."""
+        self.t += dt
+        t = self.t
+        alive = self.alive
+        angle = self.angle
+        sail = self.sail
+        vel = self.vel
+        pos = self.pos
+
+        # damp roll
+        self.roll *= pow(0.6, dt)
+
+        # Compute some bobbing motion
+        rollmoment = 0.05 * sin(t)
+        pitch = 0.02 * sin(0.31 * t)
+
+        # Compute the forward vector from the current heading
+        half = 0.5 * angle
+        q = (cos(half), numpy.zeros_like(half), sin(half), numpy.zeros_like(half))
+        forward = numpy.column_stack(
+            (sin(angle), numpy.zeros_like(angle), cos(angle))
+        )
+        speed = (forward * vel).sum(axis=1)
+        angular_velocity = self.helm * numpy.minimum(speed, 2) * 0.03
+        angle_to_wind = map_angles(wind_angle - angle)
+        sail_power = numpy.empty_like(angle)
+        heeling_moment = numpy.empty_like(angle)
+        self.sail_setting = numpy.empty_like(angle)
+        for polar, ships in self.polar_groups():
+            a = angle_to_wind[ships]
+            sail_power[ships] = polar.get_sail_powers(a)
+            heeling_moment[ships] = polar.get_heeling_moments(a)
+            self.sail_setting[ships] = polar.get_sail_settings(a)
+
+        rollmoment += angular_velocity * 0.5
+        rollmoment -= heeling_moment * 0.05 * sail
+
+        # Update ship angle and position
+        self.angle = map_angles(angle + angular_velocity * dt)
+        accel = forward * (sail * sail_power * 0.5 * dt)[:, numpy.newaxis]
+        vel += accel
+        vel *= pow(0.7, dt)
+        pos += vel * dt
+
+        # Float
+        pos[:, 1] -= numpy.where(alive, 0.5 * pos[:, 1], 1.0) * dt
+
+        self.roll += rollmoment * dt
+
+        zeros = numpy.zeros_like(t)
+        hp = 0.5 * pitch
+        hr = 0.5 * self.roll
+        self.rot = qmul(
+            qmul(q, (cos(hp), sin(hp), zeros, zeros)),
+            (cos(hr), zeros, zeros, sin(hr))
+        )
+
+    def scatter(self, ships):
+        """Write the arrays back to ships and their models."""
+        rotangle, rotx, roty, rotz = angle_axis(self.rot)
+        rotations = zip(
+            numpy.degrees(rotangle).tolist(),
+            rotx.tolist(), roty.tolist(), rotz.tolist()
+        )
+        sail_angles = numpy.degrees(self.sail_setting).tolist()
+        quaternions = zip(*[c.tolist() for c in self.rot])
+
+        for (s, t, angle, roll, alive, v, p, q, rotation, sail_angle) in zip(
+                ships,
+                self.t.tolist(),
+                self.angle.tolist(),
+                self.roll.tolist(),
+                self.alive.tolist(),
+                self.vel.tolist(),
+                self.pos.tolist(),
+                quaternions,
+                rotations,
+                sail_angles):
+            s.t = t
+            s.angle = angle
+            s.roll = roll
+            s.vel = Vector3(*v)
+            s.pos = pos = Point3(*p)
+            s.rot = Quaternion(*q)
+            model = s.model
+            model.rotation = rotation
+            model.pos = pos
+
+            # Adjust sail angle to wind direction
+            if alive:
+                sail_rotation = (sail_angle, 0, 1, 0)
+                for sail in model.nodes[1:]:
+                    sail.rotation = sail_rotation
@@ -3,39 +3,25 @@ import pyglet
 import random
 import math
 import threading
-from pyglet.event import EventDispatcher
 
 from euclid import Point3, Vector3
-import posixpath
 
-from wasabisg.scenegraph import Camera, Scene, ModelNode
-from wasabisg.lighting import Sunlight, Light
 from Queue import Queue, Empty
 
 
 # Configure loader before importing any game assets
-pyglet.resource.path += [posixpath.join('assets', d) for d in [
-    'sounds',
-    'textures',
-    'sprites',
-    'fonts'
-]]
-pyglet.resource.reindex()
+from . import resources
 pyglet.resource.add_font('benegraphic.ttf')
 
 # Import other modules here
 from .sound import Music, Sound
+from .assets import assets
 from .hud import HUD
-from .models import (
-    skydome, sea_model
-)
 from .orders import OrdersQueue
 from .keys import KeyControls
 from .actors import Ship
-from .particles import particles
-from .physics import Physics
-from .sea import sea_shader, SeaNode
 from .ai import ShipAI
+from .world import World
 from .server import serve, send_msg
 
 SERVER_HOST = '0.0.0.0'
@@ -46,128 +32,10 @@ HEIGHT = 600
 
 FPS = 60
 
-tau = 2 * math.pi
+# Maximum time to spend on AI thinking per frame, in seconds
+AI_BUDGET = 0.002
 
-
-class World(EventDispatcher):
-    def __init__(self):
-        self.objects = []
-        self.emitters = []
-        self.physics = Physics()
-        self.wind_angle = 0.0
-
-        self.create_scene()
-        self.camera = Camera(
-            pos=Point3(10, 5, 10),
-            look_at=Point3(0, 1, 0),
-            width=WIDTH,
-            height=HEIGHT
-        )
-        self.t = 0.0
-        self.clock = pyglet.clock.Clock(time_function=self.time)
-
-    def time(self):
-        return self.t
-
-    def spawn(self, obj):
-        self.objects.append(obj)
-        try:
-            model = obj.model
-        except AttributeError:
-            pass
-        else:
-            self.scene.add(model)
-        if hasattr(obj, 'emitters'):
-            for e in obj.emitters:
-                self.emitters.append(e)
-                e.start()
-        if hasattr(obj, 'body'):
-            self.physics.add(obj.body)
-        obj.world = self
-
-    def destroy(self, obj):
-        self.objects.remove(obj)
-
-        try:
-            model = obj.model
-        except AttributeError:
-            pass
-        else:
-            self.scene.remove(model)
-        if hasattr(obj, 'emitters'):
-            for e in obj.emitters:
-                e.stop()
-            self.emitters = [o for o in self.emitters if o not in obj.emitters]
-        if hasattr(obj, 'body'):
-            self.physics.remove(obj.body)
-
-        obj.world = None
-
-    def update(self, dt):
-        """Update the world through the given time step (in seconds)."""
-        self.t += dt
-        self.clock.tick()
-        pyglet.media.listener.position = self.camera.pos
-        pyglet.media.listener.forward_orientation = self.camera.eye_vector()
-
-        for e in self.emitters:
-            e.update()
-        particles.update(dt)
-        for o in self.objects:
-            o.update(dt)
-        self.physics.do_collisions()
-
-    def create_scene(self):
-        """Initialise the scene with static objects."""
-        self.scene = Scene(
-            ambient=(0.2, 0.2, 0.2, 1.0),
-        )
-
-        for m in Ship.MODELS:
-            self.scene.prepare_model(m)
-
-        # Add the particle system
-        self.scene.add(particles)
-
-        # Sun
-        self.scene.add(Sunlight(
-            direction=Vector3(0.82, 0.31, 0.48),
-            colour=(1.0, 0.85, 0.6, 1.0),
-            intensity=1,
-        ))
-
-        # Sky dome
-        self.skydome = ModelNode(skydome, rotation=(59, 0, 1, 0))
-        self.scene.add(self.skydome)
-
-        # Sea
-        self.sea = SeaNode(sea_model)
-        self.sea.shader = sea_shader
-        self.scene.add(self.sea)
-
-    def spawn_ships(self):
-        for i in range(5):
-            self.spawn_one_ship()
-
-    def spawn_one_ship(self):
-        bearing = random.uniform(0, tau)
-        rng = random.uniform(50, 100)
-        x = rng * math.sin(bearing)
-        z = rng * math.cos(bearing)
-
-        angle = random.uniform(0, tau)
-        s = Ship(
-            pos=Point3(x, 0, z),
-            angle=angle
-        )
-        self.spawn(s)
-        ShipAI(s).start()
-
-    def draw(self):
-        x, _, z = self.camera.pos
-        self.skydome.pos = Point3(x, 0, z)
-        self.sea.pos = Point3(x, 0, z)
-        self.scene.render(self.camera)
+CANNON_SOUNDS = [assets.sound('cannon1.mp3'), assets.sound('cannon2.mp3')]
 
 
 class ChaseCamera(object):
@@ -216,7 +84,7 @@ class BattleMode(object):
     def __init__(self, game):
         self.game = game
         self.window = game.window
-        self.world = World()
+        self.world = World(width=WIDTH, height=HEIGHT, ai_budget=AI_BUDGET)
 
         self.ship = Ship(max_health=5)
         self.ship.faction = 0
@@ -241,7 +109,7 @@ class BattleMode(object):
 
         self.t = 0
         self.music = Music(['battletrack.mp3'])
-        self.sounds = Sound(['cannon1.mp3', 'cannon2.mp3'])
+        self.sounds = Sound([s.name for s in CANNON_SOUNDS])
 
         self.connect_message = None
         self.started = False
@@ -254,13 +122,13 @@ class BattleMode(object):
             send_msg(math.degrees(self.ship.get_wind_angle()))
 
     KILL_SOUNDS = [
-        pyglet.resource.media('get_back_to_shore_you_landlubber.wav', streaming=False),
-        pyglet.resource.media('pass_me_greetings_to_davy_jones.wav', streaming=False),
+        assets.sound('get_back_to_shore_you_landlubber.wav'),
+        assets.sound('pass_me_greetings_to_davy_jones.wav'),
     ]
 
     def on_kill(self, *args):
         sound = random.choice(self.KILL_SOUNDS)
-        sound.play()
+        sound.get().play()
         self.hud.add_booty(100)
         self.world.spawn_one_ship()
 
@@ -358,6 +226,10 @@ class Game(object):
             WIDTH = self.window.width
             HEIGHT = self.window.height
         self.window.push_handlers(self.on_draw)
+
+        # Load everything now, rather than when it is first needed in battle
+        assets.warm_up()
+
         self.gamestate = BattleMode(self)
         self.gamestate.start()
 
@@ -406,7 +278,7 @@ def main():
     else:
         # start the command websockets server in the background
         com_thread = threading.Thread(target=serve,
-                                      args=(SERVER_HOST, SERVER_PORT, game.gamestate.orders_queue, game.gamestate.system_queue)
+                                      args=(SERVER_HOST, SERVER_PORT, game.gamestate.orders_queue, game.gamestate.system_queue, game.gamestate.world.timings)
                                       )
         com_thread.daemon = True
         com_thread.start()
@@ -414,6 +286,9 @@ def main():
         print "Please connect to http://%s:%d/ with a mobile browser (or desktop browser) for the controls" % (
             get_ip_address(), SERVER_PORT
         )
+        print "Frame timings are available at http://%s:%d/stats" % (
+            get_ip_address(), SERVER_PORT
+        )
 
         pyglet.app.run()
 
@@ -0,0 +1,109 @@
+"""Run battles without a display or audio device.
+
+This module must be imported before any other game module, because pyglet
+must be configured not to create a GL context before pyglet.gl is first
+imported::
+
+    from bitsofeight import headless
+    from bitsofeight.world import World
+
+    world = World(headless=True)
+    world.spawn_ships()
+    headless.run(world, ticks=1000)
+
+"""
+import pyglet
+
+pyglet.options['shadow_window'] = False
+pyglet.options['audio'] = ('silent',)
+
+import random
+from timeit import default_timer
+
+from . import sound, particles
+
+sound.enabled = False
+particles.effects_enabled = False
+
+# The simulation time step, in seconds
+DT = 1.0 / 60
+
+
+def run(world, ticks, dt=DT):
+    """Step world through a number of fixed time steps, as fast as possible.
+
+    Return the simulation rate in ticks per second of wall-clock time.
+
+    """
+    update = world.update
+    start = default_timer()
+    for i in xrange(ticks):
+        update(dt)
+    elapsed = default_timer() - start
+    return ticks / elapsed if elapsed else float('inf')
+
+
+def main():
+    from optparse import OptionParser
+    from .world import World
+    from .actors import Cannonball
+
+    parser = OptionParser('%prog [-s SHIPS] [-f FACTIONS] [-t TICKS]')
+    parser.add_option(
+        '-s', '--ships',
+        type='int',
+        default=5,
+        help='Number of AI ships to spawn'
+    )
+    parser.add_option(
+        '-t', '--ticks',
+        type='int',
+        default=3600,
+        help='Number of time steps to simulate'
+    )
+    parser.add_option(
+        '-f', '--factions',
+        type='int',
+        default=2,
+        help='Number of factions to divide the ships between'
+    )
+    parser.add_option(
+        '-p', '--pool-size',
+        type='int',
+        default=None,
+        help='Number of dead cannonballs to keep for reuse'
+    )
+    parser.add_option(
+        '--seed',
+        type='int',
+        default=None,
+        help='Seed the random number generator, for repeatable battles'
+    )
+
+    options, args = parser.parse_args()
+    if options.seed is not None:
+        random.seed(options.seed)
+
+    if options.pool_size is not None:
+        Cannonball.pool.resize(options.pool_size)
+
+    world = World(headless=True)
+    for i in xrange(options.ships):
+        world.spawn_one_ship(faction=1 + i % options.factions)
+
+    rate = run(world, options.ticks)
+    print "Simulated %d ticks (%.1fs of game time) at %.1f ticks/s" % (
+        options.ticks, options.ticks * DT, rate
+    )
+    print "%d ships and %d projectiles remain" % (
+        len(world.physics.bodies), len(world.projectiles)
+    )
+    stats = Cannonball.pool.stats()
+    print "%d cannonballs created, %d reused (%.0f%%), peak %d in flight" % (
+        stats['created'], stats['reused'], 100 * stats['reuse_rate'],
+        stats['peak_in_use']
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -4,34 +4,45 @@ from pyglet.graphics import Batch, OrderedGroup
 from pyglet.sprite import Sprite, SpriteGroup
 from pyglet.text import Label
 
+from .assets import assets
+
 FONT_NAME = 'Benegraphic'
 COLOUR = (0x2c, 0x21, 0x21, 0xff)  # Brown colour
 
 
-scroll_left = pyglet.resource.image('scroll-left.png')
-scroll_left.anchor_x = 10
-scroll_right = pyglet.resource.image('scroll-right.png')
-scroll_right.anchor_x = 10
-scroll_bg = pyglet.resource.image('scroll-bg.png')
+def load_scroll_end(name):
+    img = pyglet.resource.image(name)
+    img.anchor_x = 10
+    return img
+
+
+scroll_left = assets.declare(
+    'scroll-left.png', lambda: load_scroll_end('scroll-left.png')
+)
+scroll_right = assets.declare(
+    'scroll-right.png', lambda: load_scroll_end('scroll-right.png')
+)
+scroll_bg = assets.image('scroll-bg.png')
 
 
 class ScrollBG(object):
     def __init__(self, left, right, bottom, batch, group=None):
-        w = scroll_bg.width
-        h = scroll_bg.height
+        bg = scroll_bg.get()
+        w = bg.width
+        h = bg.height
         top = bottom + h
 
         group = SpriteGroup(
-            texture=scroll_bg,
+            texture=bg,
             blend_src=gl.GL_SRC_ALPHA,
             blend_dest=gl.GL_ONE_MINUS_SRC_ALPHA,
             parent=group
         )
 
-        vb = scroll_bg.tex_coords[1]
-        vt = scroll_bg.tex_coords[7]
-        ul = scroll_bg.tex_coords[0]
-        ur = scroll_bg.tex_coords[3]
+        vb = bg.tex_coords[1]
+        vt = bg.tex_coords[7]
+        ul = bg.tex_coords[0]
+        ur = bg.tex_coords[3]
 
         frac = min((right - left) / float(w), 1.0)
         ur = ul + (ur - ul) * frac
@@ -80,8 +91,12 @@ class Scroll(object):
             batch=batch,
             group=OrderedGroup(0)
         )
-        self.left = Sprite(scroll_left, x=x, y=y, group=group, batch=batch)
-        self.right = Sprite(scroll_right, x=x + w, y=y, group=group, batch=batch)
+        self.left = Sprite(
+            scroll_left.get(), x=x, y=y, group=group, batch=batch
+        )
+        self.right = Sprite(
+            scroll_right.get(), x=x + w, y=y, group=group, batch=batch
+        )
 
     def delete(self):
         self.label.delete()
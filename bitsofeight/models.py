@@ -1,3 +1,4 @@
+import os.path
 from itertools import product
 from euclid import Vector3
 from wasabisg.loaders.objloader import ObjFileLoader
@@ -6,36 +7,52 @@ from wasabisg.plane import Plane
 from wasabisg.sphere import Sphere
 
 from .sea import sea_shader
+from .assets import assets
+from .preload import MODEL_CACHE, HULL_MODEL, SKYDOME_MODEL, MAST_MODELS
 
 
-model_loader = ObjFileLoader()
-hull_model = model_loader.load_obj('assets/models/hull.obj')
-skydome = model_loader.load_obj('assets/models/skydome.obj')
-
-mast_models = [
-    model_loader.load_obj('assets/models/%s%s.obj' % (mast, state))
-    for mast in ['foremast', 'mainmast', 'mizzenmast']
-    for state in ['-furled', '-half', '']
-]
-
-sea_model = Model(meshes=[
-    Plane(
-        size=1000,
-        material=Material(
-            name='sea',
-            Kd=(0.2, 0.4, 0.6),
-            Ks=(1.0, 1.0, 1.0, 1.0),
-            Ns=30.0,
-            illum=1,
+model_loader = ObjFileLoader(cache_dir=MODEL_CACHE)
+
+# The library that defines the materials of the ship models
+SHIP_MATERIALS = 'assets/models/ship.mtl'
+
+
+def declare_model(filename):
+    """Declare the model in filename as an asset named for the file."""
+    name = os.path.splitext(os.path.basename(filename))[0]
+    return assets.declare(name, lambda: model_loader.load_obj(filename))
+
+
+def load_sea_model():
+    return Model(meshes=[
+        Plane(
+            size=1000,
+            material=Material(
+                name='sea',
+                Kd=(0.2, 0.4, 0.6),
+                Ks=(1.0, 1.0, 1.0, 1.0),
+                Ns=30.0,
+                illum=1,
+            )
         )
-    )
-])
-
-cannonball_model = Model(meshes=[
-    Sphere(
-        radius=0.1,
-        latitude_divisions=3,
-        longitude_divisions=6,
-        material=model_loader.mtl_loader.get_material('Gunmetal')
-    )
-])
+    ])
+
+
+def load_cannonball_model():
+    mtl_loader = model_loader.mtl_loader
+    mtl_loader.load_materials(SHIP_MATERIALS)
+    return Model(meshes=[
+        Sphere(
+            radius=0.1,
+            latitude_divisions=3,
+            longitude_divisions=6,
+            material=mtl_loader.get_material('Gunmetal')
+        )
+    ])
+
+
+hull_model = declare_model(HULL_MODEL)
+skydome = declare_model(SKYDOME_MODEL)
+mast_models = assets.list([declare_model(m).name for m in MAST_MODELS])
+sea_model = assets.declare('sea', load_sea_model)
+cannonball_model = assets.declare('cannonball', load_cannonball_model)
@@ -1,9 +1,10 @@
 import random
 import Queue
 from pyglet.event import EventDispatcher
-from pyglet.resource import media
 from pyglet.media import MediaException
 
+from .assets import assets
+
 
 class ShipOrderHelm(object):
     messages = [
@@ -14,16 +15,16 @@ class ShipOrderHelm(object):
     ]
 
     SOUNDS = {
-        'centre': media('rudder_amidships.wav', streaming=False),
+        'centre': assets.sound('rudder_amidships.wav'),
         'port': [
-            media('a_little_to_port.wav', streaming=False),
-            media('turn_to_port.wav', streaming=False),
-            media('hard_to_port.wav', streaming=False),
+            assets.sound('a_little_to_port.wav'),
+            assets.sound('turn_to_port.wav'),
+            assets.sound('hard_to_port.wav'),
         ],
         'starboard': [
-            media('a_little_to_starboard.wav', streaming=False),
-            media('turn_to_starboard.wav', streaming=False),
-            media('hard_to_starboard.wav', streaming=False),
+            assets.sound('a_little_to_starboard.wav'),
+            assets.sound('turn_to_starboard.wav'),
+            assets.sound('hard_to_starboard.wav'),
         ],
     }
 
@@ -42,7 +43,7 @@ class ShipOrderHelm(object):
         else:
             sound = self.SOUNDS[self.direction][abs(self.strength) - 1]
         try:
-            sound.play()
+            sound.get().play()
         except MediaException:
             pass
         ship.helm.set(self.strength)
@@ -56,7 +57,7 @@ class ShipOrderAccelerate(object):
         u'Give me every scrap of sail!',
     ]
 
-    SOUND = media('more_sail.wav', streaming=False)
+    SOUND = assets.sound('more_sail.wav')
 
     def __init__(self, strength):
         assert 0 <= strength <= 3
@@ -67,7 +68,7 @@ class ShipOrderAccelerate(object):
 
     def act(self, ship):
         try:
-            self.SOUND.play()
+            self.SOUND.get().play()
         except MediaException:
             pass
         ship.sail.set(min(3, ship.sail.target + 1))
@@ -81,9 +82,9 @@ class ShipOrderFire(object):
     ]
 
     SOUNDS = [
-        media('let_em_have_it.wav', streaming=False),
-        media('fire.wav', streaming=False),
-        media('give_em_full_broadside.wav', streaming=False),
+        assets.sound('let_em_have_it.wav'),
+        assets.sound('fire.wav'),
+        assets.sound('give_em_full_broadside.wav'),
     ]
 
     def __init__(self):
@@ -94,7 +95,7 @@ class ShipOrderFire(object):
 
     def act(self, ship):
         try:
-            self.sound.play()
+            self.sound.get().play()
         except MediaException:
             pass
         ship.fire()
@@ -108,11 +109,11 @@ class ShipOrderDecelerate(ShipOrderAccelerate):
         u"All stop!"
     ]
 
-    SOUND = media('ease_off_the_mainsl.wav', streaming=False)
+    SOUND = assets.sound('ease_off_the_mainsl.wav')
 
     def act(self, ship):
         try:
-            self.SOUND.play()
+            self.SOUND.get().play()
         except MediaException:
             pass
         ship.sail.set(max(0, ship.sail.target - 1))
@@ -1,4 +1,3 @@
-import pyglet.resource
 from euclid import Point3, Vector3
 from lepton import Particle
 from lepton.emitter import StaticEmitter
@@ -6,15 +5,26 @@ from lepton import controller
 from lepton import domain
 from wasabisg.particles import ParticleSystemNode
 
+from .assets import assets
+
 
 # The global particle system
 # Groups within here will be renderer
 # Actors should define emitters; the world will spawn these
 particles = ParticleSystemNode()
 
+# Set this to False to stop spawning one-off effects such as smoke and
+# splinters, eg. when there is nothing to draw them
+effects_enabled = True
+
 
 def load(name):
-    return pyglet.resource.texture(name)
+    """Get a function that loads the texture name when it is first needed.
+
+    Particle textures are packed into the shared atlas.
+
+    """
+    return assets.packed_texture(name).get
 
 
 wake_particles = particles.create_group(
@@ -77,6 +87,8 @@ splinters2 = particles.create_group(
 
 def spawn_smoke(pos, vel):
     """Spawn a cannon smoke puff."""
+    if not effects_enabled:
+        return
     e = StaticEmitter(
         template=Particle(
             position=tuple(pos),
@@ -99,6 +111,8 @@ def spawn_smoke(pos, vel):
 
 def spawn_splinters(pos, vel):
     """Spawn a cannon smoke puff."""
+    if not effects_enabled:
+        return
     e = StaticEmitter(
         template=Particle(
             position=tuple(pos),
@@ -3,10 +3,15 @@
 Spheres are very quick to detect collisions on.
 
 """
-from math import sqrt
+from math import sqrt, floor
+import numpy
 from euclid import Point3, Vector3, Quaternion, Matrix4
 
 
+# The direction in which to part shapes whose centres coincide
+COINCIDENT_AXIS = numpy.array([1.0, 0.0, 0.0])
+
+
 class Sphere(object):
     def __init__(self, centre=Point3(0, 0, 0), radius=1.0):
         self.centre = centre
@@ -47,20 +52,91 @@ class Sphere(object):
         return Sphere(self.centre + v, self.radius)
 
 
+class CacheStats(object):
+    """Count the hits and misses of a cache."""
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self):
+        """The fraction of lookups that were served from the cache."""
+        total = self.hits + self.misses
+        if not total:
+            return 0.0
+        return float(self.hits) / total
+
+    def __repr__(self):
+        return '<CacheStats hits=%d misses=%d>' % (self.hits, self.misses)
+
+
+# Counts how often Positionable matrices are reused rather than rebuilt
+transform_stats = CacheStats()
+
+
 class Positionable(object):
-    """Base class for things that are positionable."""
+    """Base class for things that are positionable.
+
+    The world matrix (and its inverse) are cached, and rebuilt only after pos
+    or rot is assigned. Modifying pos or rot in place - other than with
+    augmented assignment such as ``p.pos += v`` - will not be noticed.
+
+    """
     def __init__(self, pos=None, rot=None, vel=None):
         self.pos = pos if pos is not None else Point3()
         self.rot = rot if rot is not None else Quaternion()
         self.vel = vel if vel is not None else Vector3()
 
+    @property
+    def pos(self):
+        return self._pos
+
+    @pos.setter
+    def pos(self, pos):
+        self._pos = pos
+        self._matrix = self._inverse = None
+
+    @property
+    def rot(self):
+        return self._rot
+
+    @rot.setter
+    def rot(self, rot):
+        self._rot = rot
+        self._matrix = self._inverse = None
+
     def local_to_world(self, v):
         return self.rot * v + self.pos
 
     def get_matrix(self):
-        r = self.rot.get_matrix()
-        t = Matrix4.new_translate(*self.pos)
-        return t * r
+        """Get the local-to-world matrix.
+
+        The matrix is shared with other callers and must not be modified.
+
+        """
+        m = self._matrix
+        if m is None:
+            transform_stats.misses += 1
+            r = self._rot.get_matrix()
+            t = Matrix4.new_translate(*self._pos)
+            m = self._matrix = t * r
+        else:
+            transform_stats.hits += 1
+        return m
+
+    def get_inverse_matrix(self):
+        """Get the world-to-local matrix.
+
+        The matrix is shared with other callers and must not be modified.
+
+        """
+        m = self._inverse
+        if m is None:
+            m = self._inverse = self.get_matrix().inverse()
+        return m
 
 
 class Body(object):
@@ -69,6 +145,12 @@ class Body(object):
         self._shapes = shapes
         self._volume = self._bound_volume()
 
+        # Shapes as arrays, for vectorised collision tests
+        self._centres = numpy.array([tuple(s.centre) for s in shapes])
+        self._radii = numpy.array([s.radius for s in shapes])
+        self._world_matrix = None
+        self._world_centres = None
+
     def _bound_volume(self):
         """Compute an untransformed bounding volume for the body's shapes."""
         centroid = (
@@ -90,6 +172,25 @@ class Body(object):
         m = self.positionable.get_matrix()
         return (s.transformed(m) for s in self._shapes)
 
+    def world_shapes(self):
+        """Get the shapes of this body in world space, as arrays.
+
+        Return a pair of arrays (centres, radii), of shape (n, 3) and (n,)
+        respectively. The centres are cached until the positionable's matrix
+        is rebuilt.
+
+        """
+        m = self.positionable.get_matrix()
+        if m is not self._world_matrix:
+            r = numpy.array([
+                [m.a, m.b, m.c],
+                [m.e, m.f, m.g],
+                [m.i, m.j, m.k],
+            ])
+            self._world_centres = self._centres.dot(r.T) + (m.d, m.h, m.l)
+            self._world_matrix = m
+        return self._world_centres, self._radii
+
     def collide(self, b):
         """Detect whether b is colliding with this Body.
 
@@ -103,17 +204,32 @@ class Body(object):
         if not self.bounds().collides(b.bounds()):
             return None
 
-        hits = []
-        for s in self:
-            for bs in b:
-                if s.collides(bs):
-                    v = bs.centre - s.centre
-                    dist = v.magnitude()
-                    need = s.radius + bs.radius
-                    hits.append(((need - dist) / dist) * v)
-        if hits:
-            return max(hits, key=Vector3.magnitude_squared)
-        return None
+        centres, radii = self.world_shapes()
+        bcentres, bradii = b.world_shapes()
+
+        # Test every pair of shapes at once
+        v = bcentres[numpy.newaxis, :, :] - centres[:, numpy.newaxis, :]
+        dist2 = (v * v).sum(axis=2)
+        need = radii[:, numpy.newaxis] + bradii[numpy.newaxis, :]
+        colliding = dist2 <= need * need
+        if not colliding.any():
+            return None
+
+        v = v[colliding]
+        need = need[colliding]
+        dist = numpy.sqrt(dist2[colliding])
+
+        # Shapes with the same centre have no direction to part in, so they
+        # are parted along a fixed axis
+        apart = dist > 0
+        normals = numpy.where(
+            apart[:, numpy.newaxis],
+            v / numpy.where(apart, dist, 1.0)[:, numpy.newaxis],
+            COINCIDENT_AXIS
+        )
+        hits = (need - dist)[:, numpy.newaxis] * normals
+        x, y, z = hits[(hits * hits).sum(axis=1).argmax()]
+        return Vector3(float(x), float(y), float(z))
 
 
 class LineSegment(object):
@@ -183,11 +299,80 @@ class LineSegment(object):
         return d1, o + d1 * l
 
 
+class BruteForce(object):
+    """A broad-phase that considers every pair of bodies.
+
+    This is O(n^2) but has no set-up cost, so it is fine for a handful of
+    bodies.
+
+    """
+    def pairs(self, bodies):
+        """Generate candidate pairs of bodies that may be colliding."""
+        for rest, b1 in enumerate(bodies, start=1):
+            for b2 in bodies[rest:]:
+                yield b1, b2
+
+
+class SpatialHash(object):
+    """A broad-phase that buckets bodies into a uniform grid on the XZ plane.
+
+    Only bodies whose bounds share a grid cell are considered as candidate
+    pairs. The grid is rebuilt every time pairs() is called.
+
+    cell_size should be a little bigger than the largest body, so that each
+    body only occupies a few cells.
+
+    """
+    def __init__(self, cell_size=10.0):
+        self.cell_size = float(cell_size)
+
+    def cells(self, sphere):
+        """Get the keys of all grid cells that the sphere overlaps."""
+        inv = 1.0 / self.cell_size
+        c = sphere.centre
+        r = sphere.radius
+        x0 = int(floor((c.x - r) * inv))
+        x1 = int(floor((c.x + r) * inv))
+        z0 = int(floor((c.z - r) * inv))
+        z1 = int(floor((c.z + r) * inv))
+        for x in xrange(x0, x1 + 1):
+            for z in xrange(z0, z1 + 1):
+                yield x, z
+
+    def pairs(self, bodies):
+        """Generate candidate pairs of bodies that may be colliding.
+
+        Every pair whose bounds overlap is generated, in the same order as
+        BruteForce would generate them. However, the candidates are found
+        before any collision is resolved, so a body pushed by one collision
+        into a body outside its original cells is not tested against it
+        until the next step, as it would be with BruteForce. In crowded
+        scenes the two broad phases can therefore diverge.
+
+        """
+        grid = {}
+        for i, b in enumerate(bodies):
+            for cell in self.cells(b.bounds()):
+                grid.setdefault(cell, []).append(i)
+
+        candidates = set()
+        for members in grid.itervalues():
+            if len(members) < 2:
+                continue
+            for rest, i in enumerate(members, start=1):
+                for j in members[rest:]:
+                    candidates.add((i, j))
+
+        for i, j in sorted(candidates):
+            yield bodies[i], bodies[j]
+
+
 class Physics(object):
     COR = 0.3  # Coefficient of restitution
 
-    def __init__(self):
+    def __init__(self, broadphase=None):
         self.bodies = []
+        self.broadphase = broadphase or BruteForce()
 
     def add(self, body):
         self.bodies.append(body)
@@ -195,14 +380,18 @@ class Physics(object):
     def remove(self, body):
         self.bodies.remove(body)
 
+    def add_all(self, bodies):
+        self.bodies.extend(bodies)
+
+    def remove_all(self, bodies):
+        removed = set(id(b) for b in bodies)
+        self.bodies[:] = [b for b in self.bodies if id(b) not in removed]
+
     def do_collisions(self):
-        bodies = self.bodies
-        # Use an O(n^2) algorithm for now
-        for rest, b1 in enumerate(bodies, start=1):
-            for b2 in bodies[rest:]:
-                v = b1.collide(b2)
-                if v is not None:
-                    self.handle_collision(b1, b2, v)
+        for b1, b2 in self.broadphase.pairs(self.bodies):
+            v = b1.collide(b2)
+            if v is not None:
+                self.handle_collision(b1, b2, v)
 
     def handle_collision(self, b1, b2, overlap):
         p1 = b1.positionable
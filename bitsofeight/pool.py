@@ -0,0 +1,75 @@
+"""Pools of reusable game objects.
+
+Objects such as cannonballs are created in their hundreds and live for
+only a second or two. Rather than allocating new objects - and their scene
+nodes - for each one, dead objects are kept in a pool and reinitialised when
+another is needed.
+
+"""
+
+
+class Pool(object):
+    """A pool of recyclable objects.
+
+    New objects are created with factory(*args, **kwargs). Recycled objects
+    are reinitialised by calling their reset() method with the same
+    arguments, so the class's __init__ would typically create anything that
+    can be reused and then call reset().
+
+    :param size: The maximum number of released objects to keep for reuse.
+
+    """
+    def __init__(self, factory, size=64):
+        self.factory = factory
+        self.size = size
+        self.free = []
+        self.created = 0
+        self.reused = 0
+        self.discarded = 0
+        self.in_use = 0
+        self.peak_in_use = 0
+
+    def __len__(self):
+        """Get the number of objects available for reuse."""
+        return len(self.free)
+
+    def acquire(self, *args, **kwargs):
+        """Get an object, reusing a released one if possible."""
+        if self.free:
+            obj = self.free.pop()
+            obj.reset(*args, **kwargs)
+            self.reused += 1
+        else:
+            obj = self.factory(*args, **kwargs)
+            self.created += 1
+        self.in_use += 1
+        if self.in_use > self.peak_in_use:
+            self.peak_in_use = self.in_use
+        return obj
+
+    def release(self, obj):
+        """Return obj to the pool, once nothing else refers to it."""
+        self.in_use = max(self.in_use - 1, 0)
+        if len(self.free) < self.size:
+            self.free.append(obj)
+        else:
+            self.discarded += 1
+
+    def resize(self, size):
+        """Change the number of released objects kept for reuse."""
+        self.size = size
+        del self.free[size:]
+
+    def stats(self):
+        """Get usage statistics as a dictionary."""
+        acquired = self.created + self.reused
+        return {
+            'size': self.size,
+            'free': len(self.free),
+            'in_use': self.in_use,
+            'peak_in_use': self.peak_in_use,
+            'created': self.created,
+            'reused': self.reused,
+            'discarded': self.discarded,
+            'reuse_rate': float(self.reused) / acquired if acquired else 0.0,
+        }
@@ -0,0 +1,110 @@
+"""Load the game's assets in parallel before the game modules are imported.
+
+Models are parsed in a pool of processes, each of which writes the parsed
+model to the model cache; bitsofeight.models then loads them from the cache
+in the main process, where they can later be uploaded to GL. Sounds are
+decoded in a pool of threads straight into their assets; by default, these
+are every sound that the game modules declare.
+
+Because worker processes may re-import the main module, scripts that call
+preload() must do so under an ``if __name__ == '__main__':`` guard.
+
+"""
+from importlib import import_module
+from multiprocessing import Pool, cpu_count
+from multiprocessing.pool import ThreadPool
+
+from wasabisg.loaders.modelcache import ModelCache
+
+from .assets import assets
+
+
+# Parsed models are cached here, to speed up start-up
+MODEL_CACHE = '.cache/models'
+
+HULL_MODEL = 'assets/models/hull.obj'
+SKYDOME_MODEL = 'assets/models/skydome.obj'
+MAST_MODELS = [
+    'assets/models/%s%s.obj' % (mast, state)
+    for mast in ['foremast', 'mainmast', 'mizzenmast']
+    for state in ['-furled', '-half', '']
+]
+
+MODELS = [HULL_MODEL, SKYDOME_MODEL] + MAST_MODELS
+
+# Importing this declares all of the game's sounds, without loading them
+GAME_MODULE = 'bitsofeight.game'
+
+# Sound decoding is mostly I/O, or done by AVbin outside the GIL
+SOUND_THREADS = 4
+
+
+def parse_model(args):
+    """Parse a model into the cache. This runs in a worker process."""
+    from wasabisg.loaders.objloader import ObjFileLoader
+    filename, cache_dir = args
+    ObjFileLoader(cache_dir=cache_dir).load_obj(filename)
+    return filename
+
+
+def decode_sound(name):
+    """Decode a sound into memory. This runs in a worker thread."""
+    try:
+        assets.sound(name).get()
+    except Exception:
+        # Leave the error to be raised where the sound is used
+        pass
+    return name
+
+
+def game_sounds():
+    """Get the names of the sounds that the game declares."""
+    import_module(GAME_MODULE)
+    return assets.names('sound')
+
+
+def preload(models=MODELS, sounds=None, progress=None,
+            processes=None, cache_dir=MODEL_CACHE):
+    """Parse models and decode sounds in parallel.
+
+    If sounds is None, every sound the game declares is decoded. Models
+    that are already cached and sounds that are already loaded are skipped.
+    If given, progress(done, total, name) is called in the calling thread as
+    each asset is loaded, so that it can draw a loading screen.
+
+    Return the number of assets that were not already loaded.
+
+    """
+    cache = ModelCache(cache_dir)
+    models = [m for m in models if not cache.is_cached(m, swapyz=False)]
+    if sounds is None:
+        sounds = game_sounds()
+    sounds = [s for s in sounds if not assets.sound(s).loaded]
+    total = len(models) + len(sounds)
+
+    threads = process_pool = None
+    results = []
+    # Fork the worker processes before starting any threads, which a forked
+    # child could inherit holding locks
+    if models:
+        process_pool = Pool(min(processes or cpu_count(), len(models)))
+        results.append(process_pool.imap_unordered(
+            parse_model, [(m, cache_dir) for m in models]
+        ))
+    if sounds:
+        threads = ThreadPool(min(SOUND_THREADS, len(sounds)))
+        results.append(threads.imap_unordered(decode_sound, sounds))
+
+    done = 0
+    try:
+        for r in results:
+            for name in r:
+                done += 1
+                if progress:
+                    progress(done, total, name)
+    finally:
+        for p in (threads, process_pool):
+            if p is not None:
+                p.close()
+                p.join()
+    return done
@@ -0,0 +1,172 @@
+"""Simulate all the projectiles in flight as one batch.
+
+Rather than each cannonball casting its own ray against every ship, the
+positions and velocities of all projectiles are held in arrays, integrated
+together and ray-cast together against the spheres of every Body.
+
+Projectiles are objects with pos, v and owner attributes, which also
+implement:
+
+* moved(pos) - called with the projectile's new position each tick.
+* hit(target, pos, v) - called when the projectile hits the positionable
+  target at pos, travelling with velocity v.
+* splash(pos) - called when the projectile falls into the sea at pos.
+
+"""
+import numpy
+from euclid import Point3, Vector3
+
+
+class Projectiles(object):
+    GRAVITY = numpy.array([0, -1.0, 0])
+
+    def __init__(self, capacity=64):
+        self.objects = []
+        self.index = {}
+        self.pos = numpy.zeros((capacity, 3))
+        self.vel = numpy.zeros((capacity, 3))
+
+    def __len__(self):
+        return len(self.objects)
+
+    def __iter__(self):
+        return iter(self.objects)
+
+    def add(self, p):
+        """Add the projectile p, starting at p.pos with velocity p.v."""
+        n = len(self.objects)
+        if n == len(self.pos):
+            self.pos = numpy.resize(self.pos, (n * 2, 3))
+            self.vel = numpy.resize(self.vel, (n * 2, 3))
+        self.pos[n] = tuple(p.pos)
+        self.vel[n] = tuple(p.v)
+        self.index[p] = n
+        self.objects.append(p)
+
+    def remove(self, p):
+        """Remove the projectile p, by moving the last projectile into its slot."""
+        i = self.index.pop(p)
+        last = self.objects.pop()
+        if last is not p:
+            n = len(self.objects)
+            self.pos[i] = self.pos[n]
+            self.vel[i] = self.vel[n]
+            self.objects[i] = last
+            self.index[last] = i
+
+    def update(self, dt, bodies):
+        """Advance all projectiles by dt, casting them against bodies."""
+        n = len(self.objects)
+        if not n:
+            return
+        objects = self.objects[:]
+        pos = self.pos[:n]
+        vel = self.vel[:n]
+
+        u = vel.copy()
+        vel += self.GRAVITY * dt
+        s = 0.5 * (u + vel) * dt
+
+        hits = self.raycast(pos, s, [p.owner for p in objects], bodies)
+
+        missed = numpy.ones(n, dtype=bool)
+        for i, body, hitpos in hits:
+            missed[i] = False
+        pos[missed] += s[missed]
+
+        splashes = []
+        for i in numpy.flatnonzero(missed):
+            x, y, z = pos[i].tolist()
+            p = objects[i]
+            if y < 0:
+                splashes.append((p, Point3(x, y, z)))
+            else:
+                p.moved(Point3(x, y, z))
+
+        # Take velocities before callbacks remove projectiles from the arrays
+        hits = [
+            (objects[i], body.positionable, hitpos, Vector3(*vel[i].tolist()))
+            for i, body, hitpos in hits
+        ]
+        for p, target, hitpos, v in hits:
+            p.hit(target, hitpos, v)
+        for p, splashpos in splashes:
+            p.splash(splashpos)
+
+    def raycast(self, origins, vecs, owners, bodies):
+        """Cast the segments from origins along vecs against bodies.
+
+        A segment never hits the body of its owner.
+
+        Return a list of (segment index, body, hit position) for each segment
+        that hits anything, giving the closest hit for each segment.
+
+        """
+        if not bodies:
+            return []
+
+        # First, find segments whose bounds touch the bounds of each body
+        lengths = numpy.sqrt((vecs * vecs).sum(axis=1))
+        mids = origins + 0.5 * vecs
+        seg_r = 0.5 * lengths
+        bounds = [b.bounds() for b in bodies]
+        body_c = numpy.array([tuple(bs.centre) for bs in bounds])
+        body_r = numpy.array([bs.radius for bs in bounds])
+        d = mids[:, numpy.newaxis, :] - body_c[numpy.newaxis, :, :]
+        r = seg_r[:, numpy.newaxis] + body_r[numpy.newaxis, :]
+        candidates = (d * d).sum(axis=2) <= r * r
+
+        body_index = dict((id(b.positionable), j) for j, b in enumerate(bodies))
+        owner = numpy.array([body_index.get(id(o), -1) for o in owners])
+        candidates[numpy.flatnonzero(owner >= 0), owner[owner >= 0]] = False
+
+        seg, cand_body = numpy.nonzero(candidates)
+        if not len(seg):
+            return []
+
+        # Then test those segments against every sphere of those bodies
+        all_centres, all_radii = zip(*[b.world_shapes() for b in bodies])
+        counts = numpy.array([len(r) for r in all_radii])
+        starts = numpy.cumsum(counts) - counts
+        centres = numpy.concatenate(all_centres)
+        radii = numpy.concatenate(all_radii)
+        sphere_body = numpy.repeat(numpy.arange(len(bodies)), counts)
+
+        per_pair = counts[cand_body]
+        seg = numpy.repeat(seg, per_pair)
+        pair_starts = numpy.cumsum(per_pair) - per_pair
+        sphere = (
+            numpy.repeat(starts[cand_body] - pair_starts, per_pair) +
+            numpy.arange(per_pair.sum())
+        )
+
+        o = origins[seg]
+        length = lengths[seg]
+        l = vecs[seg] / length[:, numpy.newaxis]
+        co = o - centres[sphere]
+        b = (l * co).sum(axis=1)
+        rad = radii[sphere]
+        discriminant = b * b - (co * co).sum(axis=1) + rad * rad
+        ok = discriminant >= 0
+        sqrt_discriminant = numpy.sqrt(numpy.where(ok, discriminant, 0))
+        d1 = -b - sqrt_discriminant
+        d2 = -b + sqrt_discriminant
+        ok &= (d1 <= length) & (d2 >= 0)
+        if not ok.any():
+            return []
+
+        seg = seg[ok]
+        dist = numpy.maximum(d1[ok], 0)
+        hitpos = o[ok] + dist[:, numpy.newaxis] * l[ok]
+        hit_body = sphere_body[sphere[ok]]
+
+        # Keep only the nearest hit for each segment
+        order = numpy.lexsort((dist, seg))
+        first = numpy.flatnonzero(
+            numpy.r_[True, seg[order][1:] != seg[order][:-1]]
+        )
+        out = []
+        for k in order[first]:
+            x, y, z = hitpos[k].tolist()
+            out.append((int(seg[k]), bodies[hit_body[k]], Point3(x, y, z)))
+        return out
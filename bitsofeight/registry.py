@@ -0,0 +1,104 @@
+"""Collections of game objects with constant-time add and remove."""
+from collections import OrderedDict
+
+
+class Registry(object):
+    """An unordered collection of objects.
+
+    Objects are held in a list, with a dictionary mapping each object to its
+    position in the list, so they can be removed by moving the last object
+    into their place.
+
+    Objects removed while the registry is being iterated are skipped for the
+    rest of the iteration and actually removed when it finishes, so it is
+    safe for objects to remove themselves - or others - while being updated.
+
+    If key is given, objects are also grouped by key(obj), as it is when they
+    are added; group(k) returns a Registry of the objects with that key.
+
+    """
+    def __init__(self, key=None):
+        self.objects = []
+        self.index = {}
+        self.key = key
+        self.groups = {}
+        self.keys = {}
+        self.iterating = 0
+        # Removed during iteration, in order, so that flushing is repeatable
+        self.removed = OrderedDict()
+
+    def __len__(self):
+        return len(self.objects) - len(self.removed)
+
+    def __contains__(self, obj):
+        return obj in self.index and obj not in self.removed
+
+    def __iter__(self):
+        self.iterating += 1
+        try:
+            objects = self.objects
+            removed = self.removed
+            for i in xrange(len(objects)):
+                o = objects[i]
+                if o not in removed:
+                    yield o
+        finally:
+            self.iterating -= 1
+            if not self.iterating:
+                self.flush()
+
+    def add(self, obj):
+        if obj in self.index:
+            # Allow objects to be added back before their removal happens
+            if obj in self.removed:
+                del self.removed[obj]
+                self._add_to_group(obj)
+            return
+        self.index[obj] = len(self.objects)
+        self.objects.append(obj)
+        self._add_to_group(obj)
+
+    def _add_to_group(self, obj):
+        if self.key:
+            k = self.keys[obj] = self.key(obj)
+            try:
+                group = self.groups[k]
+            except KeyError:
+                group = self.groups[k] = Registry()
+            group.add(obj)
+
+    def remove(self, obj):
+        """Remove obj, raising KeyError if it is not present."""
+        if obj not in self.index or obj in self.removed:
+            raise KeyError(obj)
+        if self.key:
+            self.groups[self.keys.pop(obj)].remove(obj)
+        if self.iterating:
+            self.removed[obj] = True
+        else:
+            self._remove(obj)
+
+    def discard(self, obj):
+        """Remove obj if it is present."""
+        if obj in self:
+            self.remove(obj)
+
+    def _remove(self, obj):
+        i = self.index.pop(obj)
+        last = self.objects.pop()
+        if last is not obj:
+            self.objects[i] = last
+            self.index[last] = i
+
+    def flush(self):
+        """Carry out removals that were deferred during iteration."""
+        for obj in self.removed:
+            self._remove(obj)
+        self.removed.clear()
+
+    def group(self, k):
+        """Get a Registry of the objects with key k."""
+        try:
+            return self.groups[k]
+        except KeyError:
+            return Registry()
@@ -0,0 +1,16 @@
+"""Configure pyglet's resource loader to find the game assets.
+
+Import this before any module that loads assets.
+
+"""
+import posixpath
+import pyglet.resource
+
+
+pyglet.resource.path += [posixpath.join('assets', d) for d in [
+    'sounds',
+    'textures',
+    'sprites',
+    'fonts'
+]]
+pyglet.resource.reindex()
@@ -1,5 +1,6 @@
 """Some sailing heuristics."""
 from math import sin, cos, pi, radians
+import numpy
 
 tau = 2 * pi
 closest_starboard = radians(160)
@@ -30,3 +31,71 @@ def get_heeling_moment(angle_to_wind):
 
 def get_sail_setting(angle_to_wind):
     return sin(angle_to_wind)
+
+
+class SailingPolar(object):
+    """The sailing performance of a class of ship, as lookup tables.
+
+    Each curve is a function of the angle to the wind. It is sampled at
+    resolution points around the compass and linearly interpolated, so a
+    detailed polar diagram costs no more to evaluate than a simple one.
+    Discontinuities in a curve are smoothed over one table step.
+
+    Angles may be given as single numbers, using get() or get_sail_power()
+    etc, or as NumPy arrays, using get_sail_powers() etc.
+
+    """
+    def __init__(
+            self,
+            sail_power=get_sail_power,
+            heeling_moment=get_heeling_moment,
+            sail_setting=get_sail_setting,
+            resolution=720):
+        self.resolution = resolution
+        self.scale = resolution / tau
+        self.angles = numpy.linspace(-pi, pi, resolution + 1)
+        self.power = self.tabulate(sail_power)
+        self.heeling = self.tabulate(heeling_moment)
+        self.setting = self.tabulate(sail_setting)
+
+        # For single lookups, each row of a plain list holds the values at
+        # the start of a table step and their gradients across it. The last
+        # row is repeated in case of rounding at the end of the table.
+        tables = (self.power, self.heeling, self.setting)
+        self.rows = zip(*(
+            [t[:-1].tolist() for t in tables] +
+            [numpy.diff(t).tolist() for t in tables]
+        ))
+        self.rows.append(self.rows[-1])
+
+    def tabulate(self, func):
+        return numpy.array([func(a) for a in self.angles.tolist()])
+
+    def get(self, angle_to_wind):
+        """Get the sail power, heeling moment and sail setting at once."""
+        x = ((angle_to_wind + pi) % tau) * self.scale
+        i = int(x)
+        f = x - i
+        p, h, s, dp, dh, ds = self.rows[i]
+        return p + dp * f, h + dh * f, s + ds * f
+
+    def get_sail_power(self, angle_to_wind):
+        return self.get(angle_to_wind)[0]
+
+    def get_heeling_moment(self, angle_to_wind):
+        return self.get(angle_to_wind)[1]
+
+    def get_sail_setting(self, angle_to_wind):
+        return self.get(angle_to_wind)[2]
+
+    def lookup_array(self, table, angles):
+        return numpy.interp((angles + pi) % tau - pi, self.angles, table)
+
+    def get_sail_powers(self, angles_to_wind):
+        return self.lookup_array(self.power, angles_to_wind)
+
+    def get_heeling_moments(self, angles_to_wind):
+        return self.lookup_array(self.heeling, angles_to_wind)
+
+    def get_sail_settings(self, angles_to_wind):
+        return self.lookup_array(self.setting, angles_to_wind)
@@ -20,6 +20,9 @@ TEMPLATE_ROOT = os.path.dirname(os.path.abspath(__file__))
 orders_queue = None
 order_processor = OrderProcessor()
 
+# A wasabisg.timings.Timings object to report at /stats
+timings = None
+
 
 def not_found(environ, start_response):
     """Called if no URL matches."""
@@ -95,6 +98,16 @@ socket = None
 import json
 
 
+def stats(environ, start_response):
+    """Serve frame timing statistics as JSON, for a live dashboard."""
+    report = timings.report() if timings else {}
+    start_response('200 OK', [
+        ('Content-Type', 'application/json'),
+        ('Cache-Control', 'no-cache'),
+    ])
+    return [json.dumps(report, sort_keys=True)]
+
+
 class GameWebSocket(WebSocket):
     def opened(self):
         global socket
@@ -129,13 +142,15 @@ urls = [
     (r'^$', index),
     (r'^assets/(.*)$', serve),
     (r'^ws$', websocket_application),
+    (r'^stats$', stats),
 ]
 
 
-def serve(host, port, orders_q, system_q):
-    global orders_queue, system_queue
+def serve(host, port, orders_q, system_q, frame_timings=None):
+    global orders_queue, system_queue, timings
     orders_queue = orders_q
     system_queue = system_q
+    timings = frame_timings
 
     # start server
     server = make_server(host, port, server_class=WSGIServer,
@@ -3,6 +3,11 @@ from itertools import cycle
 from pyglet.media import Player, ManagedSoundPlayer
 from pyglet.resource import media, ResourceNotFoundException
 
+from .assets import assets
+
+# Set this to False to silence all sound effects, eg. when running without
+# an audio device
+enabled = True
 
 class Music(Player):
     def __init__(self, songs):
@@ -30,7 +35,7 @@ class Sound(object):
         self.sounds = {}
         for sound in sounds:
             try:
-                self.sounds[sound] = media(sound, streaming=False)
+                self.sounds[sound] = assets.sound(sound).get()
             except ResourceNotFoundException:
                 pass
 
@@ -52,9 +57,22 @@ class Sound(object):
 
 
 class SoundPlayer(object):
+    """A positional sound effect.
+
+    The sound is not loaded until it is first played, or assets are warmed up.
+
+    """
     def __init__(self, sound):
-        self.sound = media(sound, streaming=False)
+        self.name = sound
+        self.asset = assets.sound(sound)
+
+    def load(self):
+        return self.asset.get()
 
     def play(self, pos, volume=1.0):
-        p = self.sound.play()
-        p.pos = pos
+        if not enabled:
+            return None
+        p = self.load().play()
+        p.position = pos
+        p.volume = volume
+        return p
@@ -0,0 +1,111 @@
+"""An index of objects by their position on the sea.
+
+Queries for objects near a point only examine the grid cells that overlap
+the query circle, so their cost depends on how crowded the area is rather
+than on how many objects there are in total.
+
+"""
+from math import floor
+
+from .registry import Registry
+
+
+class SpatialIndex(object):
+    """A uniform grid over the XZ plane.
+
+    Objects must have a pos attribute. As objects move, update() must be
+    called to move them to their new cells.
+
+    """
+    def __init__(self, cell_size=30.0):
+        self.cell_size = float(cell_size)
+        self.cells = {}
+        self.where = {}
+        self.objects = Registry()
+
+    def __len__(self):
+        return len(self.objects)
+
+    def __contains__(self, obj):
+        return obj in self.where
+
+    def key(self, pos):
+        """Get the key of the cell containing pos."""
+        size = self.cell_size
+        return int(floor(pos.x / size)), int(floor(pos.z / size))
+
+    def add(self, obj):
+        k = self.key(obj.pos)
+        self.cells.setdefault(k, []).append(obj)
+        self.where[obj] = k
+        self.objects.add(obj)
+
+    def remove(self, obj):
+        k = self.where.pop(obj)
+        self._remove_from_cell(obj, k)
+        self.objects.remove(obj)
+
+    def _remove_from_cell(self, obj, k):
+        cell = self.cells[k]
+        cell.remove(obj)
+        if not cell:
+            del self.cells[k]
+
+    def update(self):
+        """Move objects that have moved into a new cell."""
+        key = self.key
+        where = self.where
+        cells = self.cells
+        for obj in self.objects:
+            k = key(obj.pos)
+            old = where[obj]
+            if k != old:
+                self._remove_from_cell(obj, old)
+                cells.setdefault(k, []).append(obj)
+                where[obj] = k
+
+    def query(self, pos, radius):
+        """Get a list of objects within radius of pos, in the XZ plane."""
+        size = self.cell_size
+        x = pos.x
+        z = pos.z
+        i0 = int(floor((x - radius) / size))
+        i1 = int(floor((x + radius) / size))
+        j0 = int(floor((z - radius) / size))
+        j1 = int(floor((z + radius) / size))
+        r2 = radius * radius
+        cells = self.cells
+        found = []
+        for i in xrange(i0, i1 + 1):
+            for j in xrange(j0, j1 + 1):
+                cell = cells.get((i, j))
+                if not cell:
+                    continue
+                for o in cell:
+                    p = o.pos
+                    dx = p.x - x
+                    dz = p.z - z
+                    if dx * dx + dz * dz <= r2:
+                        found.append(o)
+        return found
+
+    def nearest(self, pos, radius, filter=None):
+        """Get the nearest object within radius of pos, or None.
+
+        If filter is given, only objects for which filter(obj) is true are
+        considered.
+
+        """
+        best = None
+        best_d2 = None
+        x = pos.x
+        z = pos.z
+        for o in self.query(pos, radius):
+            if filter and not filter(o):
+                continue
+            p = o.pos
+            d2 = (p.x - x) ** 2 + (p.z - z) ** 2
+            if best is None or d2 < best_d2:
+                best = o
+                best_d2 = d2
+        return best
@@ -0,0 +1,299 @@
+"""The simulated world: ships, projectiles and the physics between them.
+
+A World can be headless, in which case it builds no scene, camera or
+particle effects and touches no audio. Combined with bitsofeight.headless
+this lets battles be simulated without a display.
+
+"""
+import pyglet
+import random
+import math
+from operator import attrgetter
+from pyglet.event import EventDispatcher
+
+from euclid import Point3, Vector3
+
+from wasabisg.scenegraph import Camera, Scene, ModelNode
+from wasabisg.lighting import Sunlight
+from wasabisg.renderer import LightingAccumulationRenderer
+from wasabisg.timings import Timings
+
+# Configure loader before importing any game assets
+from . import resources
+
+from .assets import atlas
+from .models import (
+    skydome, sea_model
+)
+from .actors import Ship, Cannonball
+from .particles import particles
+from .physics import Physics, SpatialHash
+from .projectiles import Projectiles
+from .spatial import SpatialIndex
+from .registry import Registry
+from .dynamics import FleetIntegrator
+from .sea import sea_shader, SeaNode
+from .ai import ShipAI, AIScheduler
+
+tau = 2 * math.pi
+
+
+class World(EventDispatcher):
+    def __init__(self, headless=False, width=1024, height=600, ai_budget=None,
+            batch_dynamics=False):
+        self.headless = headless
+        self.timings = Timings()
+        self.ships = Registry(key=attrgetter('faction'))
+        self.effects = Registry()  # other objects that need updating
+        self.emitters = Registry()
+        self.physics = Physics(broadphase=SpatialHash(cell_size=10.0))
+        self.projectiles = Projectiles()
+        self.index = SpatialIndex()
+        # If set, ships are advanced together by a FleetIntegrator
+        self.fleet = FleetIntegrator() if batch_dynamics else None
+        self.wind_angle = 0.0
+
+        if headless:
+            self.scene = None
+            self.camera = None
+        else:
+            self.create_scene()
+            self.camera = Camera(
+                pos=Point3(10, 5, 10),
+                look_at=Point3(0, 1, 0),
+                width=width,
+                height=height
+            )
+        self.t = 0.0
+        self.clock = pyglet.clock.Clock(time_function=self.time)
+
+        # Objects spawned and destroyed during update(), to apply at the end
+        self.updating = False
+        self.spawning = Registry()
+        self.destroying = Registry()
+        self.ai = AIScheduler(budget=ai_budget)
+
+    def time(self):
+        return self.t
+
+    def registry_for(self, obj):
+        """Get the registry that obj belongs in."""
+        if isinstance(obj, Cannonball):
+            return self.projectiles
+        elif isinstance(obj, Ship):
+            return self.ships
+        return self.effects
+
+    def spawn(self, obj):
+        """Add obj to the world.
+
+        Objects spawned during update() join the world at the end of the
+        tick, along with any others spawned in the same tick.
+
+        """
+        obj.world = self
+        if self.updating:
+            if obj in self.destroying:
+                self.destroying.remove(obj)
+            else:
+                self.spawning.add(obj)
+        else:
+            self.add_all([obj])
+
+    def destroy(self, obj):
+        """Remove obj from the world.
+
+        Objects destroyed during update() leave the world at the end of the
+        tick, so they may still be seen by other objects until then.
+
+        """
+        if self.updating:
+            if obj in self.spawning:
+                self.spawning.remove(obj)
+                obj.world = None
+                self.recycle([obj])
+            elif obj not in self.destroying:
+                self.destroying.add(obj)
+        else:
+            self.remove_all([obj])
+
+    def flush(self):
+        """Apply the spawns and destroys made during update()."""
+        if self.destroying:
+            destroyed = list(self.destroying)
+            self.destroying = Registry()
+            self.remove_all(destroyed)
+        if self.spawning:
+            spawned = list(self.spawning)
+            self.spawning = Registry()
+            self.add_all(spawned)
+
+    def add_all(self, objs):
+        """Add objs to the world, registering them with the scene and physics
+        in one batch.
+
+        """
+        bodies = []
+        models = []
+        for obj in objs:
+            self.registry_for(obj).add(obj)
+            obj.world = self
+            if self.scene:
+                try:
+                    models.append(obj.model)
+                except AttributeError:
+                    pass
+            if hasattr(obj, 'emitters') and not self.headless:
+                for e in obj.emitters:
+                    self.emitters.add(e)
+                    e.start()
+            if hasattr(obj, 'body'):
+                bodies.append(obj.body)
+            if isinstance(obj, Ship):
+                self.index.add(obj)
+        if models:
+            self.scene.add_all(models)
+        if bodies:
+            self.physics.add_all(bodies)
+
+    def remove_all(self, objs):
+        """Remove objs from the world, unregistering them from the scene and
+        physics in one batch.
+
+        """
+        bodies = []
+        models = []
+        for obj in objs:
+            self.registry_for(obj).remove(obj)
+            if self.scene:
+                try:
+                    models.append(obj.model)
+                except AttributeError:
+                    pass
+            if hasattr(obj, 'emitters') and not self.headless:
+                for e in obj.emitters:
+                    e.stop()
+                    self.emitters.remove(e)
+            if hasattr(obj, 'body'):
+                bodies.append(obj.body)
+            if isinstance(obj, Ship):
+                self.index.remove(obj)
+            obj.world = None
+        if models:
+            self.scene.remove_all(models)
+        if bodies:
+            self.physics.remove_all(bodies)
+
+        self.recycle(objs)
+
+    def recycle(self, objs):
+        """Return the pooled objects among objs to their pools.
+
+        This must be called once the world is done with them.
+
+        """
+        for obj in objs:
+            pool = getattr(obj, 'pool', None)
+            if pool is not None:
+                pool.release(obj)
+
+    def update(self, dt):
+        """Update the world through the given time step (in seconds)."""
+        section = self.timings.section
+        with section('update'):
+            self.updating = True
+            try:
+                self.step(dt)
+            finally:
+                self.updating = False
+            with section('spawn'):
+                self.flush()
+
+    def step(self, dt):
+        """Advance everything in the world by dt."""
+        section = self.timings.section
+        self.t += dt
+        with section('ai'):
+            self.clock.tick()
+            self.ai.update(self.t)
+        if not self.headless:
+            pyglet.media.listener.position = self.camera.pos
+            pyglet.media.listener.forward_orientation = self.camera.eye_vector()
+
+            with section('emitters'):
+                for e in self.emitters:
+                    e.update()
+            with section('particles'):
+                particles.update(dt)
+        with section('ships'):
+            if self.fleet:
+                self.fleet.update(self.ships.objects, dt, self.wind_angle)
+            else:
+                for s in self.ships:
+                    s.update(dt)
+            self.index.update()
+        with section('effects'):
+            for o in self.effects:
+                o.update(dt)
+        with section('projectiles'):
+            self.projectiles.update(dt, self.physics.bodies)
+        with section('collisions'):
+            self.physics.do_collisions()
+
+    def create_scene(self):
+        """Initialise the scene with static objects."""
+        self.scene = Scene(
+            ambient=(0.2, 0.2, 0.2, 1.0),
+            renderer=LightingAccumulationRenderer(
+                timings=self.timings,
+                atlas=atlas
+            )
+        )
+
+        for m in Ship.MODELS:
+            self.scene.prepare_model(m)
+
+        # Add the particle system
+        self.scene.add(particles)
+
+        # Sun
+        self.scene.add(Sunlight(
+            direction=Vector3(0.82, 0.31, 0.48),
+            colour=(1.0, 0.85, 0.6, 1.0),
+            intensity=1,
+        ))
+
+        # Sky dome
+        self.skydome = ModelNode(skydome.get(), rotation=(59, 0, 1, 0))
+        self.scene.add(self.skydome)
+
+        # Sea
+        self.sea = SeaNode(sea_model.get())
+        self.sea.shader = sea_shader
+        self.scene.add(self.sea)
+
+    def spawn_ships(self):
+        for i in range(5):
+            self.spawn_one_ship()
+
+    def spawn_one_ship(self, faction=None):
+        bearing = random.uniform(0, tau)
+        rng = random.uniform(50, 100)
+        x = rng * math.sin(bearing)
+        z = rng * math.cos(bearing)
+
+        angle = random.uniform(0, tau)
+        s = Ship(
+            pos=Point3(x, 0, z),
+            angle=angle
+        )
+        if faction is not None:
+            s.faction = faction
+        self.spawn(s)
+        ShipAI(s).start()
+
+    def draw(self):
+        x, _, z = self.camera.pos
+        self.skydome.pos = Point3(x, 0, z)
+        self.sea.pos = Point3(x, 0, z)
+        self.scene.render(self.camera)
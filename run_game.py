@@ -1,3 +1,16 @@
-from bitsofeight.game import main
+import sys
 
-main()
+
+def show_progress(done, total, name):
+    sys.stderr.write('\rLoading assets... %d/%d' % (done, total))
+    if done == total:
+        sys.stderr.write('\n')
+
+
+if __name__ == '__main__':
+    # Load assets in parallel, rather than as the game first uses them
+    from bitsofeight.preload import preload
+    preload(progress=show_progress)
+
+    from bitsofeight.game import main
+    main()
@@ -10,7 +10,7 @@ setup(
     url='https://bitbucket.org/lordmauve/wasabi-peace',
     packages=['bitsofeight'],
     install_requires=[
-        #'numpy',
+        'numpy',
         'pyglet==1.2alpha1',
         'wasabi-lepton==1.0b2',
         'PyOpenGL==3.0.2',
@@ -28,6 +28,8 @@ setup(
     entry_points={
         'console_scripts': [
             'bitsofeight = bitsofeight.game:main',
+            'bitsofeight-sim = bitsofeight.headless:main',
+            'bitsofeight-bench = bitsofeight.benchmark:main',
         ],
     }
 )
@@ -73,3 +73,68 @@ def test_relative_bearing5():
         abs(a.relative_bearing(Point3(0, 0, 1))),
         pi
     )
+
+
+class Recorder(object):
+    """A task that records the times at which it is called."""
+    def __init__(self, scheduler):
+        self.scheduler = scheduler
+        self.calls = []
+
+    def __call__(self, dt):
+        self.calls.append(self.scheduler.t)
+
+
+def run_scheduler(scheduler, until, dt=0.1):
+    t = scheduler.t
+    while t < until - 1e-9:
+        t += dt
+        scheduler.update(t)
+
+
+def test_scheduler_interval():
+    """Scheduled tasks are called once per interval."""
+    s = ai.AIScheduler()
+    r = Recorder(s)
+    s.schedule_interval(r, 1.0)
+    run_scheduler(s, 10.0)
+    eq_(len(r.calls), 10)
+
+
+def test_scheduler_stagger():
+    """Tasks with the same interval fall due on different frames."""
+    s = ai.AIScheduler()
+    tasks = [Recorder(s) for i in xrange(5)]
+    for r in tasks:
+        s.schedule_interval(r, 1.0)
+    run_scheduler(s, 1.0)
+    frames = [t for r in tasks for t in r.calls]
+    eq_(len(frames), 5)
+    eq_(len(set(frames)), 5)
+
+
+def test_scheduler_unschedule():
+    """Unscheduled tasks are not called again."""
+    s = ai.AIScheduler()
+    r = Recorder(s)
+    s.schedule_interval(r, 0.5)
+    run_scheduler(s, 1.0)
+    s.unschedule(r)
+    n = len(r.calls)
+    run_scheduler(s, 2.0)
+    eq_(len(r.calls), n)
+    eq_(len(s), 0)
+
+
+def test_scheduler_budget():
+    """Tasks over the frame budget are postponed to the next frame."""
+    s = ai.AIScheduler(budget=0)
+    tasks = [Recorder(s) for i in xrange(3)]
+    for r in tasks:
+        s.schedule_interval(r, 1.0)
+    s.update(1.0)
+    eq_(sum(len(r.calls) for r in tasks), 1)
+    eq_(s.deferred, 2)
+    s.update(1.01)
+    s.update(1.02)
+    eq_([len(r.calls) for r in tasks], [1, 1, 1])
@@ -0,0 +1,67 @@
+from nose.tools import eq_
+
+# Configure pyglet to run without a display
+from bitsofeight import headless  # noqa
+from bitsofeight.assets import Assets
+
+
+def counting_loader(calls, value):
+    def load():
+        calls.append(value)
+        return value
+    return load
+
+
+def test_lazy():
+    """Assets are loaded once, when first used."""
+    assets = Assets()
+    calls = []
+    a = assets.declare('a', counting_loader(calls, 1))
+    eq_(calls, [])
+    eq_(assets['a'], 1)
+    eq_(a.get(), 1)
+    eq_(calls, [1])
+
+
+def test_declare_twice():
+    assets = Assets()
+    a = assets.declare('a', lambda: 1)
+    b = assets.declare('a', lambda: 2)
+    assert a is b
+    eq_(assets['a'], 1)
+
+
+def test_list():
+    """Assets in a list are loaded as they are accessed."""
+    assets = Assets()
+    calls = []
+    for i in xrange(3):
+        assets.declare(i, counting_loader(calls, i))
+    models = assets.list([0, 1, 2])
+    eq_(len(models), 3)
+    eq_(models[1], 1)
+    eq_(calls, [1])
+    eq_(list(models), [0, 1, 2])
+    eq_(calls, [1, 0, 2])
+
+
+def test_warm_up():
+    """Warming up loads the remaining assets, in order of declaration."""
+    assets = Assets()
+    calls = []
+    for name in 'abc':
+        assets.declare(name, counting_loader(calls, name))
+    assets['b']
+    progress = []
+    eq_(assets.warm_up(lambda *args: progress.append(args)), 2)
+    eq_(calls, ['b', 'a', 'c'])
+    eq_(progress, [(1, 2, 'a'), (2, 2, 'c')])
+    eq_(assets.warm_up(), 0)
+
+
+def test_names():
+    assets = Assets()
+    assets.declare('a', lambda: 1)
+    assets.sound('b.wav')
+    assets.sound('c.wav')
+    eq_(assets.names('sound'), ['b.wav', 'c.wav'])
@@ -0,0 +1,135 @@
+from nose.tools import eq_
+import numpy
+
+# Configure pyglet to run without a display
+from bitsofeight import headless  # noqa
+from wasabisg import atlas as atlas_module
+from wasabisg.atlas import (
+    Atlas, region_bounds, sprite_coords, fits_region, region_texcoords
+)
+from wasabisg.model import Model, Mesh, Material
+
+
+class Texture(object):
+    width = 100
+    height = 50
+
+
+class Region(object):
+    """A 10x10 region at (20, 10) within a 100x50 texture."""
+    owner = Texture()
+    tex_coords = (
+        0.2, 0.2, 0,
+        0.3, 0.2, 0,
+        0.3, 0.4, 0,
+        0.2, 0.4, 0,
+    )
+
+
+def assert_close(a, b):
+    assert numpy.allclose(a, b), '%r != %r' % (a, b)
+
+
+def test_region_bounds():
+    """Regions of a larger texture are inset by half a texel."""
+    assert_close(region_bounds(Region()), (0.205, 0.21, 0.295, 0.39))
+    assert_close(
+        sprite_coords(Region()),
+        (0.205, 0.21, 0.295, 0.21, 0.295, 0.39, 0.205, 0.39)
+    )
+
+
+def test_fits_region():
+    assert fits_region([0, 0, 1, 1, 0.5, -0.0005])
+    assert not fits_region([0, 0, 2.5, 1])
+    assert not fits_region([])
+
+
+def test_region_texcoords():
+    bounds = (0.5, 0.0, 1.0, 0.25)
+    assert_close(
+        region_texcoords([0, 0, 1, 1, 0.5, 0.5], bounds),
+        [0.5, 0.0, 1.0, 0.25, 0.75, 0.125]
+    )
+
+
+def mesh(texcoords):
+    return Mesh(
+        mode=None,
+        vertices=[0] * 9,
+        normals=[],
+        texcoords=texcoords,
+        indices=[0, 1, 2],
+        material=Material(name='sail', map_Kd='sail.png')
+    )
+
+
+def test_pack_mesh():
+    """Packed meshes share a copy of the material that uses the atlas."""
+    atlas = Atlas()
+    region = atlas.regions['sail.png'] = Region()
+    a = mesh([0, 0, 1, 0, 1, 1])
+    material = a.material
+    assert atlas.pack_mesh(a)
+    assert a.material is not material
+    assert a.material['tex_map_Kd'] is region
+    assert 'tex_map_Kd' not in material
+    assert_close(a.texcoords[:2], region_bounds(region)[:2])
+
+    b = mesh([0, 0, 0.5, 0.5, 1, 1])
+    b.material = material
+    assert atlas.pack_mesh(b)
+    assert b.material is a.material
+
+
+def test_pack_copy():
+    """Copies of packed models are not packed a second time."""
+    atlas = Atlas()
+    atlas.regions['sail.png'] = Region()
+    model = Model([mesh([0, 0, 1, 0, 1, 1])])
+    atlas.pack_mesh(model.meshes[0])
+    texcoords = list(model.meshes[0].texcoords)
+
+    copy = model.copy()
+    m = copy.meshes[0]
+    assert m.material is not model.meshes[0].material
+    assert atlas.pack_mesh(m)
+    assert_close(m.texcoords, texcoords)
+    assert m.material['tex_map_Kd'] is atlas.regions['sail.png']
+
+
+def test_tiling_mesh():
+    """Meshes whose textures repeat are left alone."""
+    atlas = Atlas()
+    atlas.regions['sail.png'] = Region()
+    m = mesh([0, 0, 3, 0, 3, 2])
+    material = m.material
+    assert not atlas.pack_mesh(m)
+    assert m.material is material
+    eq_(m.texcoords, [0, 0, 3, 0, 3, 2])
+
+
+class Image(object):
+    """An image too large to pack, that counts its uploads."""
+    width = height = 1024
+    uploads = 0
+
+    def get_mipmapped_texture(self):
+        Image.uploads += 1
+        return 'texture'
+
+
+def test_oversized():
+    """Oversized images are only given a texture when one is asked for."""
+    orig = atlas_module.load_image
+    atlas_module.load_image = lambda name: Image()
+    try:
+        atlas = Atlas()
+        eq_(atlas.region('sky.png'), None)
+        eq_(atlas.pack_mesh(mesh([0, 0, 1, 1])), False)
+        eq_(Image.uploads, 0)
+        eq_(atlas.texture('sky.png'), 'texture')
+        eq_(atlas.texture('sky.png'), 'texture')
+        eq_(Image.uploads, 1)
+    finally:
+        atlas_module.load_image = orig
@@ -0,0 +1,41 @@
+from nose.tools import eq_
+from bitsofeight import benchmark
+
+
+def test_scenario_is_repeatable():
+    """Scenarios set up the same battle from the same seed."""
+    scenario = benchmark.Scenario('test', balls=2)
+    a = scenario.create(6, seed=3)
+    b = scenario.create(6, seed=3)
+    eq_(len(a.projectiles), 12)
+    eq_(
+        [tuple(o.pos) for o in a.ships],
+        [tuple(o.pos) for o in b.ships]
+    )
+
+
+def test_run_scenario():
+    """Benchmark results report the time in each subsystem."""
+    r = benchmark.run_scenario(
+        benchmark.Scenario('test', balls=1), 4, ticks=5, warmup=1
+    )
+    eq_(r['ships'], 4)
+    eq_(r['balls'], 4)
+    eq_(sorted(r['ms_per_tick']), sorted(benchmark.SUBSYSTEMS))
+    assert r['ticks_per_sec'] > 0
+
+
+def test_compare():
+    """Benchmarks that have slowed down are reported as regressions."""
+    old = {'results': [
+        {'scenario': 'fleet', 'ships': 5, 'ticks_per_sec': 100.0},
+        {'scenario': 'fleet', 'ships': 10, 'ticks_per_sec': 100.0},
+    ]}
+    new = {'results': [
+        {'scenario': 'fleet', 'ships': 5, 'ticks_per_sec': 95.0},
+        {'scenario': 'fleet', 'ships': 10, 'ticks_per_sec': 50.0},
+        {'scenario': 'dense', 'ships': 10, 'ticks_per_sec': 50.0},
+    ]}
+    rows, regressions = benchmark.compare(old, new)
+    eq_(len(rows), 2)
+    eq_(regressions, [('fleet', 10, 100.0, 50.0, 0.5)])
@@ -1,7 +1,10 @@
+import random
 from nose.tools import eq_
 from mock import patch
 from euclid import Point3, Vector3
-from bitsofeight.physics import Sphere, Body, Positionable, Physics
+from bitsofeight.physics import (
+    Sphere, Body, Positionable, Physics, BruteForce, SpatialHash
+)
 
 
 def test_collision():
@@ -86,3 +89,38 @@ def test_resolve_collision_static():
         Vector3(0, 0, 0)
     ]
     eq_(out, expected)
+
+
+def test_spatial_hash_cells():
+    """A sphere straddling a cell boundary occupies both cells."""
+    grid = SpatialHash(cell_size=10.0)
+    cells = sorted(grid.cells(Sphere(Point3(10, 0, 5), 1)))
+    eq_(cells, [(0, 0), (1, 0)])
+
+
+def test_spatial_hash_separated():
+    """Bodies far apart are not candidates for collision."""
+    shapes = [Sphere()]
+    b1 = Body(Positionable(Point3(0, 0, 0)), shapes)
+    b2 = Body(Positionable(Point3(50, 0, 0)), shapes)
+    eq_(list(SpatialHash().pairs([b1, b2])), [])
+
+
+def test_spatial_hash_matches_brute_force():
+    """The spatial hash finds every colliding pair, in brute force order."""
+    rng = random.Random(0)
+    shapes = [Sphere(Point3(0, 0, z), 1.3) for z in xrange(-3, 4)]
+    # Crowded enough that most bodies collide with several others
+    bodies = [
+        Body(Positionable(Point3(x, 0, z)), shapes)
+        for x, z in (
+            (rng.uniform(-10, 10), rng.uniform(-10, 10)) for i in xrange(60)
+        )
+    ]
+    colliding = [
+        (b1, b2) for b1, b2 in BruteForce().pairs(bodies)
+        if b1.collide(b2) is not None
+    ]
+    assert len(colliding) > len(bodies)
+    candidates = list(SpatialHash(cell_size=10.0).pairs(bodies))
+    eq_([p for p in candidates if p in colliding], colliding)
@@ -0,0 +1,62 @@
+from nose.tools import eq_
+from euclid import Point3
+
+# Configure pyglet to run without a display
+from bitsofeight import headless  # noqa
+from wasabisg.model import Model, Mesh
+from wasabisg.scenegraph import (
+    Scene, Camera, OrthographicCamera, ModelNode, GroupNode
+)
+from wasabisg.lighting import Light
+
+
+def ball(radius=1.0):
+    m = Model(name='ball')
+    m.radius = radius
+    return m
+
+
+def make_scene(objects):
+    scene = Scene()
+    scene.objects.extend(objects)
+    return scene
+
+
+def test_bounding_radius():
+    """The model radius is the distance of its furthest vertex."""
+    mesh = Mesh(None, [0, 0, 0, 3, 4, 0, -1, 0, 0], [], [], [0, 1, 2], {})
+    eq_(Model(meshes=[mesh]).bounding_radius(), 5.0)
+
+
+def test_group_radius():
+    """A group's radius contains the radii of its nodes."""
+    g = GroupNode([
+        ModelNode(ball(1.0)),
+        ModelNode(ball(2.0), pos=Point3(0, 3, 4)),
+    ])
+    eq_(g.bounding_radius(), 7.0)
+
+
+def test_cull():
+    """Objects outside the view are culled; lights never are."""
+    camera = Camera(pos=Point3(0, 0, 0), look_at=Point3(0, 0, -10))
+    ahead = ModelNode(ball(), pos=Point3(0, 0, -20))
+    behind = ModelNode(ball(), pos=Point3(0, 0, 20))
+    aside = ModelNode(ball(), pos=Point3(100, 0, -20))
+    straddling = ModelNode(ball(5.0), pos=Point3(0, 0, 2))
+    too_far = ModelNode(ball(), pos=Point3(0, 0, -20000))
+    light = Light(Point3(0, 0, 50))
+    scene = make_scene([ahead, behind, aside, straddling, too_far, light])
+    eq_(scene.cull(camera), [ahead, straddling, light])
+    eq_(scene.drawn, 3)
+    eq_(scene.culled, 3)
+
+
+def test_cull_orthographic():
+    camera = OrthographicCamera(
+        pos=Point3(0, 0, 0), look_at=Point3(0, 0, -10), scale=20.0
+    )
+    inside = ModelNode(ball(), pos=Point3(9, 0, -20))
+    outside = ModelNode(ball(), pos=Point3(12, 0, -20))
+    scene = make_scene([inside, outside])
+    eq_(scene.cull(camera), [inside])
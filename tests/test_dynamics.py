@@ -0,0 +1,78 @@
+import random
+from math import pi
+from nose.tools import eq_
+from euclid import Point3, Vector3
+
+from bitsofeight import headless
+from bitsofeight.actors import Ship
+from bitsofeight.dynamics import FleetIntegrator, map_angles
+from bitsofeight.sailing import SailingPolar
+from bitsofeight.utils import map_angle
+import numpy
+
+
+# A ship class that is quicker upwind
+SLOOP = SailingPolar(sail_power=lambda a: 0.5 + 0.5 * abs(a) / pi)
+
+
+class Sea(object):
+    """Just enough of a world for ships to sail in."""
+    wind_angle = 0.7
+
+
+def make_fleet(seed, n=12):
+    random.seed(seed)
+    sea = Sea()
+    fleet = []
+    for i in xrange(n):
+        s = Ship(
+            pos=Point3(random.uniform(-50, 50), 0.1, random.uniform(-50, 50)),
+            angle=random.uniform(-pi, pi)
+        )
+        s.world = sea
+        s.vel = Vector3(random.uniform(-2, 2), 0, random.uniform(-2, 2))
+        s.roll = random.uniform(-0.1, 0.1)
+        s.helm.set(random.choice([-3, -1, 0, 2]))
+        s.sail.set(random.choice([0, 1, 2, 3]))
+        if i % 5 == 4:
+            s.alive = False
+        if i % 3 == 2:
+            s.POLAR = SLOOP
+        fleet.append(s)
+    return fleet
+
+
+def approx_eq(a, b, tolerance=1e-9):
+    assert abs(a - b) < tolerance, "%r !~== %r" % (a, b)
+
+
+def test_map_angles():
+    angles = numpy.array([-4.0, -1.0, 0.0, 2.0, 4.0])
+    eq_(map_angles(angles).tolist(), [map_angle(a) for a in angles.tolist()])
+
+
+def test_matches_ship_update():
+    """The fleet integrator matches Ship.update() for every ship class."""
+    scalar = make_fleet(1)
+    batch = make_fleet(1)
+    integrator = FleetIntegrator()
+    dt = headless.DT
+    for i in xrange(300):
+        for s in scalar:
+            s.update(dt)
+        integrator.update(batch, dt, Sea.wind_angle)
+
+    for a, b in zip(scalar, batch):
+        approx_eq(a.angle, b.angle)
+        approx_eq(a.roll, b.roll)
+        approx_eq((a.pos - b.pos).magnitude(), 0)
+        approx_eq((a.vel - b.vel).magnitude(), 0)
+        for x, y in zip(a.model.rotation, b.model.rotation):
+            approx_eq(x, y, 1e-6)
+        eq_(
+            [n.model_instance for n in a.model.nodes],
+            [n.model_instance for n in b.model.nodes]
+        )
+        approx_eq(a.model.nodes[1].rotation[0], b.model.nodes[1].rotation[0])
+        for c in 'wxyz':
+            approx_eq(getattr(a.rot, c), getattr(b.rot, c))
@@ -0,0 +1,119 @@
+from math import radians
+from nose.tools import eq_
+from nose.plugins.skip import SkipTest
+import numpy
+from euclid import Point3, Vector3, Matrix4
+
+# Configure pyglet to run without a display
+from bitsofeight import headless  # noqa
+from wasabisg.model import Model
+from wasabisg.scenegraph import ModelNode, GroupNode, Scene, Camera
+from wasabisg.instancing import Instancer, transform_matrices
+
+
+def gl_matrix(pos, rotation):
+    """Compute the matrix set up by glTranslatef() and glRotatef()."""
+    angle, x, y, z = rotation
+    return (
+        Matrix4.new_translate(*pos) *
+        Matrix4.new_rotate_axis(radians(angle), Vector3(x, y, z).normalized())
+    )
+
+
+def as_array(m):
+    return numpy.array(m[:]).reshape(4, 4).T
+
+
+def test_transform_matrices():
+    """Matrices match those that GL would compute."""
+    positions = [(1, 2, 3), (0, 0, 0), (-5, 0.5, 2)]
+    rotations = [(30, 0, 1, 0), (0, 0, 1, 0), (-120, 1, 2, 3)]
+    ms = transform_matrices(numpy.array(positions), numpy.array(rotations))
+    for m, pos, rot in zip(ms, positions, rotations):
+        assert numpy.allclose(m, as_array(gl_matrix(pos, rot)))
+
+
+def test_collect():
+    """Nodes are batched by model, with their group's transformation."""
+    hull = Model(name='hull')
+    mast = Model(name='mast')
+    ships = [
+        GroupNode(
+            [ModelNode(hull), ModelNode(mast, pos=Point3(0, 1, 2))],
+            pos=Point3(i, 0, 0),
+            rotation=(90 * i, 0, 1, 0)
+        )
+        for i in xrange(3)
+    ]
+    other = ModelNode(hull, transparent=True)
+    instancer = Instancer()
+    batches, others = instancer.collect(ships + [other])
+    eq_(others, [other])
+    eq_([(b.model, b.first, b.count) for b in batches], [
+        (hull, 0, 3),
+        (mast, 3, 3),
+    ])
+    eq_(instancer.matrices.shape, (6, 4, 4))
+
+    # Matrices are stored column by column
+    i = 2
+    expected = gl_matrix(Point3(i, 0, 0), (90 * i, 0, 1, 0)) * \
+        gl_matrix(Point3(0, 1, 2), (0, 0, 1, 0))
+    assert numpy.allclose(
+        instancer.matrices[3 + i].T, as_array(expected), atol=1e-6
+    )
+
+
+def render(window, instancing):
+    """Render a few spheres, returning the contents of the framebuffer."""
+    import pyglet
+    from wasabisg.renderer import LightingAccumulationRenderer
+    from wasabisg.lighting import Sunlight
+    from wasabisg.sphere import Sphere
+
+    scene = Scene(
+        ambient=(0.2, 0.2, 0.2, 1.0),
+        renderer=LightingAccumulationRenderer(instancing=instancing),
+        culling=False
+    )
+    scene.add(Sunlight(direction=Vector3(0.82, 0.31, 0.48)))
+    sphere = Model([Sphere(latitude_divisions=8, longitude_divisions=16)])
+    for i in xrange(4):
+        scene.add(ModelNode(
+            sphere,
+            pos=Point3(3 * i - 4.5, 0, 0),
+            rotation=(30 * i, 0, 1, 0)
+        ))
+    camera = Camera(width=window.width, height=window.height)
+
+    window.switch_to()
+    pyglet.gl.glClearColor(0, 0, 0, 1)
+    window.clear()
+    scene.render(camera)
+    buf = pyglet.image.get_buffer_manager().get_color_buffer()
+    return buf.get_image_data().get_data('RGBA', window.width * 4)
+
+
+def test_render_instanced():
+    """Instanced drawing renders the same image as drawing nodes one by one.
+
+    This needs a display, but runs with software GL such as Mesa's llvmpipe,
+    eg. under xvfb-run with LIBGL_ALWAYS_SOFTWARE=1.
+
+    """
+    import pyglet
+    from wasabisg.instancing import have_instancing
+    try:
+        window = pyglet.window.Window(width=160, height=120, visible=False)
+    except Exception:
+        raise SkipTest('no display to create a GL context')
+    try:
+        if not have_instancing():
+            raise SkipTest('GL does not support instanced drawing')
+        instanced = render(window, instancing=True)
+        individual = render(window, instancing=False)
+        blank = '\x00\x00\x00\xff' * (window.width * window.height)
+        assert instanced != blank, 'nothing was rendered'
+        assert instanced == individual
+    finally:
+        window.close()
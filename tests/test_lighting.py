@@ -0,0 +1,71 @@
+from nose.tools import eq_
+from euclid import Point3, Vector3
+
+from wasabisg.lighting import Light, Sunlight, select_lights
+
+
+class Thing(object):
+    def __init__(self, pos, radius=1.0):
+        self.pos = pos
+        self.radius = radius
+
+    def bounding_radius(self):
+        return self.radius
+
+
+def test_few_lights():
+    """With no more lights than the shader takes, everything gets them all."""
+    lights = [Sunlight(Vector3(0, 1, 0)), Light(Point3(1000, 0, 0))]
+    things = [Thing(Point3(0, 0, 0)), Thing(Point3(5, 0, 0))]
+    eq_(select_lights(lights, things), [(lights, things)])
+
+
+def test_select_nearby():
+    """Objects are grouped by the lights that reach them."""
+    sun = Sunlight(Vector3(0, 1, 0))
+    flashes = [
+        Light(Point3(100 * i, 0, 0), intensity=10, falloff=0.5)
+        for i in xrange(10)
+    ]
+    a = Thing(Point3(0, 0, 5))
+    b = Thing(Point3(0, 0, -5))
+    c = Thing(Point3(300, 0, 0))
+    far = Thing(Point3(5000, 0, 0))
+    groups = select_lights([sun] + flashes, [a, b, c, far])
+    eq_(groups, [
+        ([sun, flashes[0]], [a, b]),
+        ([sun, flashes[3]], [c]),
+        ([sun], [far]),
+    ])
+
+
+def test_select_brightest():
+    """At most 8 lights are applied, keeping sunlights and the brightest."""
+    sun = Sunlight(Vector3(0, 1, 0))
+    flashes = [
+        Light(Point3(i, 0, 0), intensity=10, falloff=0.5)
+        for i in xrange(10)
+    ]
+    unbounded = Thing(Point3(0, 0, 0), radius=None)
+    [(lights, _), (unbounded_lights, _)] = select_lights(
+        flashes + [sun], [Thing(Point3(9, 0, 0), radius=0), unbounded]
+    )
+    eq_(lights, flashes[3:] + [sun])
+    eq_(len(unbounded_lights), 8)
+    assert sun in unbounded_lights
+
+
+def test_strongest_kept():
+    """Beyond the limit, the lights contributing most to an object are kept.
+
+    The others are dropped, however bright they are elsewhere.
+
+    """
+    strengths = [5, 1, 9, 3, 12, 2, 8, 11, 4, 10, 6, 7]
+    lights = [
+        Light(Point3(d, 0, 0), intensity=s * (1.0 + d * d), falloff=1)
+        for d, s in enumerate(strengths, start=1)
+    ]
+    [(kept, _)] = select_lights(lights, [Thing(Point3(0, 0, 0), radius=0)])
+    strongest = sorted(strengths, reverse=True)[:8]
+    eq_(kept, [l for l, s in zip(lights, strengths) if s in strongest])
@@ -0,0 +1,90 @@
+import os
+import shutil
+import tempfile
+
+from nose.tools import eq_, with_setup
+
+# Configure pyglet to run without a display
+from bitsofeight import headless  # noqa
+from wasabisg.loaders.objloader import ObjFileLoader
+
+
+OBJ = """mtllib box.mtl
+v 0 0 0
+v 1 0 0
+v 1 1 0
+v 0 1 0
+vn 0 0 1
+vt 0 0
+vt 1 0
+vt 1 1
+vt 0 1
+usemtl Red
+f 1/1/1 2/2/1 3/3/1
+f 1/1/1 3/3/1 4/4/1
+"""
+
+MTL = """newmtl Red
+Kd 1.0 0.0 0.0
+"""
+
+tmp = None
+
+
+def make_sources():
+    global tmp
+    tmp = tempfile.mkdtemp()
+    write('box.obj', OBJ)
+    write('box.mtl', MTL)
+
+
+def remove_sources():
+    shutil.rmtree(tmp)
+
+
+def write(name, data):
+    with open(os.path.join(tmp, name), 'w') as f:
+        f.write(data)
+
+
+def load():
+    loader = ObjFileLoader(cache_dir=os.path.join(tmp, 'cache'))
+    return loader, loader.load_obj(os.path.join(tmp, 'box.obj'))
+
+
+@with_setup(make_sources, remove_sources)
+def test_round_trip():
+    """A cached model has the same meshes and materials as the original."""
+    _, original = load()
+    loader, cached = load()
+    eq_(loader.cache.hits, 1)
+    eq_(len(cached.meshes), len(original.meshes))
+    for a, b in zip(original.meshes, cached.meshes):
+        eq_(a.mode, b.mode)
+        eq_(list(a.vertices), list(b.vertices))
+        eq_(list(a.normals), list(b.normals))
+        eq_(list(a.texcoords), list(b.texcoords))
+        eq_(list(a.indices), list(b.indices))
+        eq_(b.material['name'], 'Red')
+        eq_(b.material['Kd'], [1.0, 0.0, 0.0])
+
+
+@with_setup(make_sources, remove_sources)
+def test_invalidate():
+    """Changing a material library invalidates the cached model."""
+    load()
+    write('box.mtl', MTL.replace('1.0 0.0 0.0', '0.0 0.0 1.0'))
+    loader, model = load()
+    eq_(loader.cache.misses, 1)
+    eq_(model.meshes[0].material['Kd'], [0.0, 0.0, 1.0])
+
+
+@with_setup(make_sources, remove_sources)
+def test_touch():
+    """A source whose mtime changes but whose contents do not is unchanged."""
+    load()
+    path = os.path.join(tmp, 'box.obj')
+    st = os.stat(path)
+    os.utime(path, (st.st_atime, st.st_mtime + 10))
+    loader, _ = load()
+    eq_(loader.cache.hits, 1)
@@ -0,0 +1,43 @@
+from nose.tools import eq_
+import numpy
+
+# Configure pyglet to run without a display
+from bitsofeight import headless  # noqa
+from wasabisg.loaders.objloader import parse_corners, first_occurrences
+
+
+def test_corners():
+    """Every form of face corner is parsed, with 0 for missing indices."""
+    for faces in [
+        ['1/2/3 4/5/6 7/8/9'],
+        ['1 4 7'],
+        ['1//3 4//6 7//9'],
+        ['1/2 4/5 7/8'],
+        ['1/2/3 4 7//9'],
+    ]:
+        corners, quads = parse_corners(faces)
+        eq_(corners.shape, (3, 3))
+        eq_(list(corners[:, 0]), [1, 4, 7])
+        assert not quads
+
+    corners, _ = parse_corners(['1/2/3 4 7//9'])
+    eq_(corners.tolist(), [[1, 2, 3], [4, 0, 0], [7, 0, 9]])
+
+
+def test_quads():
+    _, quads = parse_corners(['1 2 3', '1 2 3 4'])
+    assert quads
+
+
+def test_first_occurrences():
+    """Distinct rows are numbered in the order they first appear."""
+    rows = numpy.array([
+        [5, 1, 1],
+        [2, 1, 1],
+        [5, 1, 1],
+        [2, 1, 2],
+        [2, 1, 1],
+    ])
+    first, numbers = first_occurrences(rows)
+    eq_(list(first), [0, 1, 3])
+    eq_(list(numbers), [0, 1, 0, 2, 1])
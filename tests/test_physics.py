@@ -1,7 +1,10 @@
 import math
+import warnings
 from nose.tools import eq_
-from euclid import Point3, Matrix4, Vector3
-from bitsofeight.physics import Sphere, LineSegment, Body, Positionable
+from euclid import Point3, Matrix4, Vector3, Quaternion
+from bitsofeight.physics import (
+    Sphere, LineSegment, Body, Positionable, transform_stats
+)
 
 
 def test_sphere_contains():
@@ -81,6 +84,50 @@ def test_body_collision():
     eq_(col, Vector3(0.25, 0, 0))
 
 
+def test_body_collision_rotated():
+    """Vectorised collision matches sphere-by-sphere tests for rotated bodies."""
+    shapes = [Sphere(Point3(0, 1, z), 1.3) for z in xrange(-3, 4)]
+    b1 = Body(
+        Positionable(
+            pos=Point3(0, 0, 0),
+            rot=Quaternion.new_rotate_axis(0.3, Vector3(0, 1, 0))
+        ),
+        shapes
+    )
+    b2 = Body(
+        Positionable(
+            pos=Point3(2.0, 0, 1.0),
+            rot=Quaternion.new_rotate_axis(1.2, Vector3(0, 1, 0))
+        ),
+        shapes
+    )
+
+    hits = []
+    for s in b1:
+        for bs in b2:
+            if s.collides(bs):
+                v = bs.centre - s.centre
+                dist = v.magnitude()
+                hits.append(((s.radius + bs.radius - dist) / dist) * v)
+    expected = max(hits, key=Vector3.magnitude_squared)
+
+    col = b1.collide(b2)
+    assert col is not None
+    assert (col - expected).magnitude() < 1e-9, \
+        "%r != %r" % (col, expected)
+
+
+def test_body_collision_coincident():
+    """Bodies whose shapes share a centre are parted along a fixed axis."""
+    shapes = [Sphere(Point3(0, 0, 0), 2)]
+    b1 = Body(Positionable(pos=Point3(1, 0, 1)), shapes)
+    b2 = Body(Positionable(pos=Point3(1, 0, 1)), shapes)
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        col = b1.collide(b2)
+    eq_(col, Vector3(4, 0, 0))
+
+
 def test_line_segment_bounds():
     """Get a bounding sphere for a line segment."""
     l = LineSegment(Point3(5, 5, 5), Vector3(-10, -10, -10))
@@ -140,3 +187,34 @@ def test_line_sphere_intersection5():
     i = l.first_intersection(s)
     assert i is not None
     eq_(i[0], 5 - math.sqrt(0.75))
+
+
+def test_matrix_cached():
+    """The world matrix is reused until the positionable moves."""
+    p = Positionable(pos=Point3(1, 2, 3))
+    m = p.get_matrix()
+    assert p.get_matrix() is m
+    p.pos += Vector3(1, 0, 0)
+    m2 = p.get_matrix()
+    assert m2 is not m
+    eq_(m2 * Point3(0, 0, 0), Point3(2, 2, 3))
+
+
+def test_matrix_invalidated_by_rotation():
+    """Assigning a rotation invalidates the cached matrices."""
+    p = Positionable()
+    m = p.get_matrix()
+    inv = p.get_inverse_matrix()
+    p.rot = Quaternion.new_rotate_axis(math.pi, Vector3(0, 1, 0))
+    assert p.get_matrix() is not m
+    assert p.get_inverse_matrix() is not inv
+
+
+def test_matrix_cache_stats():
+    """Cache hits and misses are counted."""
+    transform_stats.reset()
+    p = Positionable()
+    p.get_matrix()
+    p.get_matrix()
+    p.get_matrix()
+    eq_((transform_stats.hits, transform_stats.misses), (2, 1))
@@ -0,0 +1,91 @@
+from nose.tools import eq_
+from bitsofeight.pool import Pool
+
+
+class Thing(object):
+    def __init__(self, value):
+        self.reset(value)
+
+    def reset(self, value):
+        self.value = value
+
+
+def test_reuse():
+    """Released objects are reset and handed out again."""
+    p = Pool(Thing)
+    a = p.acquire(1)
+    p.release(a)
+    b = p.acquire(2)
+    assert b is a
+    eq_(b.value, 2)
+    eq_(p.stats()['created'], 1)
+    eq_(p.stats()['reused'], 1)
+
+
+def test_size():
+    """No more than size released objects are kept."""
+    p = Pool(Thing, size=2)
+    things = [p.acquire(i) for i in xrange(5)]
+    for t in things:
+        p.release(t)
+    eq_(len(p), 2)
+    eq_(p.discarded, 3)
+    p.resize(1)
+    eq_(len(p), 1)
+
+
+def test_stats():
+    p = Pool(Thing, size=4)
+    a = p.acquire(0)
+    b = p.acquire(1)
+    p.release(a)
+    p.acquire(2)
+    stats = p.stats()
+    eq_(stats['in_use'], 2)
+    eq_(stats['peak_in_use'], 2)
+    eq_(stats['reuse_rate'], 1 / 3.0)
+
+
+def test_world_recycles_cannonballs():
+    """Cannonballs destroyed by the world go back to the pool."""
+    from bitsofeight import headless
+    from bitsofeight.world import World
+    from bitsofeight.actors import Cannonball
+    from euclid import Point3, Vector3
+
+    w = World(headless=True)
+    ball = Cannonball.pool.acquire(Point3(0, 1, 0), Vector3(0, 0, 0), None)
+    w.spawn(ball)
+    headless.run(w, 120)
+    eq_(len(w.projectiles), 0)
+    assert ball in Cannonball.pool.free
+    again = Cannonball.pool.acquire(Point3(5, 1, 0), Vector3(1, 0, 0), None)
+    assert again is ball
+    eq_(again.model.pos, Point3(5, 1, 0))
+
+
+class Gun(object):
+    """An effect that fires a cannonball and destroys it in the same tick."""
+    def __init__(self):
+        self.world = None
+
+    def update(self, dt):
+        from bitsofeight.actors import Cannonball
+        from euclid import Point3, Vector3
+        ball = Cannonball.pool.acquire(Point3(0, 1, 0), Vector3(0, 0, 0), None)
+        self.world.spawn(ball)
+        self.world.destroy(ball)
+
+
+def test_spawn_then_destroy_recycles():
+    """Pooled objects destroyed in the tick they were spawned are released."""
+    from bitsofeight import headless
+    from bitsofeight.world import World
+    from bitsofeight.actors import Cannonball
+
+    w = World(headless=True)
+    w.spawn(Gun())
+    in_use = Cannonball.pool.in_use
+    headless.run(w, 10)
+    eq_(Cannonball.pool.in_use, in_use)
+    eq_(len(w.projectiles), 0)
@@ -0,0 +1,44 @@
+import os
+import shutil
+import tempfile
+
+from nose.tools import eq_
+
+# Configure pyglet to run without a display
+from bitsofeight import headless  # noqa
+from bitsofeight.preload import preload
+from wasabisg.loaders.modelcache import ModelCache
+
+
+OBJ = """v 0 0 0
+v 1 0 0
+v 1 1 0
+f 1 2 3
+"""
+
+
+def test_preload_models():
+    """Models are parsed into the cache, and skipped once they are cached."""
+    tmp = tempfile.mkdtemp()
+    try:
+        filename = os.path.join(tmp, 'triangle.obj')
+        with open(filename, 'w') as f:
+            f.write(OBJ)
+        cache_dir = os.path.join(tmp, 'cache')
+
+        calls = []
+        progress = lambda *args: calls.append(args)
+        loaded = preload(
+            models=[filename],
+            sounds=[],
+            progress=progress,
+            processes=1,
+            cache_dir=cache_dir
+        )
+        eq_(loaded, 1)
+        eq_(calls, [(1, 1, filename)])
+        assert ModelCache(cache_dir).is_cached(filename, swapyz=False)
+
+        eq_(preload(models=[filename], sounds=[], cache_dir=cache_dir), 0)
+    finally:
+        shutil.rmtree(tmp)
@@ -0,0 +1,136 @@
+import random
+from nose.tools import eq_
+from euclid import Point3, Vector3, Quaternion
+from bitsofeight.physics import Sphere, Body, Positionable, LineSegment
+from bitsofeight.projectiles import Projectiles
+
+
+class Ball(object):
+    """A projectile that records what happened to it."""
+    def __init__(self, pos, v, owner=None):
+        self.pos = pos
+        self.v = v
+        self.owner = owner
+        self.events = []
+
+    def moved(self, pos):
+        self.events.append(('moved', pos))
+
+    def hit(self, target, pos, v):
+        self.events.append(('hit', target, pos))
+
+    def splash(self, pos):
+        self.events.append(('splash', pos))
+
+
+SHAPES = [Sphere(Point3(0, 1, z), 1.3) for z in xrange(-3, 4)]
+
+
+def approx_eq(a, b):
+    assert (a - b).magnitude() < 1e-9, "%r !~== %r" % (a, b)
+
+
+def test_projectile_moves():
+    """A projectile in free flight falls under gravity."""
+    p = Projectiles()
+    b = Ball(Point3(0, 10, 0), Vector3(1, 0, 0))
+    p.add(b)
+    p.update(1.0, [])
+    eq_(b.events, [('moved', Point3(1, 9.5, 0))])
+
+
+def test_projectile_splash():
+    """A projectile that falls below the sea splashes."""
+    p = Projectiles()
+    b = Ball(Point3(0, 0.1, 0), Vector3(0, -1, 0))
+    p.add(b)
+    p.update(1.0, [])
+    eq_(b.events, [('splash', Point3(0, -1.4, 0))])
+
+
+def test_projectile_hit():
+    """A projectile hits the body in its path."""
+    target = Positionable(Point3(5, 0, 0))
+    body = Body(target, SHAPES)
+    p = Projectiles()
+    b = Ball(Point3(0, 1, 0), Vector3(10, 0, 0))
+    p.add(b)
+    p.update(1.0, [body])
+    eq_(len(b.events), 1)
+    event, hit_target, pos = b.events[0]
+    eq_((event, hit_target), ('hit', target))
+    expected = LineSegment(Point3(0, 1, 0), Vector3(10, -0.5, 0)).collide_body(body)
+    approx_eq(pos, expected)
+
+
+def test_projectile_ignores_owner():
+    """A projectile cannot hit the ship that fired it."""
+    owner = Positionable(Point3(0, 0, 0))
+    p = Projectiles()
+    b = Ball(Point3(0, 1, 0), Vector3(1, 0, 0), owner=owner)
+    p.add(b)
+    p.update(0.1, [Body(owner, SHAPES)])
+    eq_(b.events[0][0], 'moved')
+
+
+def test_remove_projectile():
+    """Removing a projectile keeps the others in flight."""
+    p = Projectiles()
+    balls = [Ball(Point3(i, 10, 0), Vector3(0, 0, 0)) for i in xrange(3)]
+    for b in balls:
+        p.add(b)
+    p.remove(balls[0])
+    p.update(1.0, [])
+    eq_(balls[0].events, [])
+    eq_(balls[1].events, [('moved', Point3(1, 9.5, 0))])
+    eq_(balls[2].events, [('moved', Point3(2, 9.5, 0))])
+
+
+def test_raycast_matches_line_segments():
+    """Batched ray casts find the same hits as casting each line segment."""
+    rng = random.Random(1)
+    bodies = [
+        Body(
+            Positionable(
+                Point3(rng.uniform(-20, 20), 0, rng.uniform(-20, 20)),
+                rot=Quaternion.new_rotate_axis(
+                    rng.uniform(0, 6), Vector3(0, 1, 0)
+                )
+            ),
+            SHAPES
+        )
+        for i in xrange(10)
+    ]
+    origins = []
+    vecs = []
+    for i in xrange(200):
+        origins.append(Point3(rng.uniform(-25, 25), 1, rng.uniform(-25, 25)))
+        vecs.append(Vector3(rng.uniform(-5, 5), 0, rng.uniform(-5, 5)))
+
+    import numpy
+    hits = Projectiles().raycast(
+        numpy.array([tuple(o) for o in origins]),
+        numpy.array([tuple(v) for v in vecs]),
+        [None] * len(origins),
+        bodies
+    )
+    hits = dict((i, (body, pos)) for i, body, pos in hits)
+
+    nhits = 0
+    for i, (o, v) in enumerate(zip(origins, vecs)):
+        line = LineSegment(o, v)
+        best = None
+        for body in bodies:
+            pos = line.collide_body(body)
+            if pos is not None:
+                d = (pos - o).magnitude()
+                if best is None or d < best[0]:
+                    best = d, body, pos
+        if best is None:
+            assert i not in hits
+        else:
+            nhits += 1
+            body, pos = hits[i]
+            assert body is best[1]
+            approx_eq(pos, best[2])
+    assert nhits > 10
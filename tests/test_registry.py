@@ -0,0 +1,70 @@
+from nose.tools import eq_, raises
+from bitsofeight.registry import Registry
+
+
+class Thing(object):
+    def __init__(self, name, faction=0):
+        self.name = name
+        self.faction = faction
+
+    def __repr__(self):
+        return self.name
+
+
+def test_add_remove():
+    r = Registry()
+    things = [Thing(str(i)) for i in xrange(5)]
+    for t in things:
+        r.add(t)
+    r.remove(things[1])
+    eq_(len(r), 4)
+    assert things[1] not in r
+    eq_(sorted(r, key=lambda t: t.name), [things[0]] + things[2:])
+
+
+@raises(KeyError)
+def test_remove_missing():
+    Registry().remove(Thing('a'))
+
+
+def test_remove_while_iterating():
+    """Objects removed during iteration are skipped, then removed."""
+    r = Registry()
+    things = [Thing(str(i)) for i in xrange(5)]
+    for t in things:
+        r.add(t)
+    seen = []
+    for t in r:
+        seen.append(t)
+        if t is things[0]:
+            r.remove(things[0])
+            r.remove(things[3])
+    eq_(seen, [things[0], things[1], things[2], things[4]])
+    eq_(len(r), 3)
+    eq_(len(r.objects), 3)
+    assert things[3] not in r
+
+
+def test_readd_while_iterating():
+    """Objects can be added back before their deferred removal."""
+    r = Registry()
+    a = Thing('a')
+    r.add(a)
+    for t in r:
+        r.remove(a)
+        r.add(a)
+    eq_(list(r), [a])
+
+
+def test_groups():
+    """Objects can be grouped by a key."""
+    r = Registry(key=lambda t: t.faction)
+    a = Thing('a', faction=1)
+    b = Thing('b', faction=2)
+    c = Thing('c', faction=1)
+    for t in (a, b, c):
+        r.add(t)
+    eq_(sorted(r.group(1), key=lambda t: t.name), [a, c])
+    r.remove(a)
+    eq_(list(r.group(1)), [c])
+    eq_(list(r.group(3)), [])
@@ -0,0 +1,107 @@
+from nose.tools import eq_
+from euclid import Point3
+
+# Configure pyglet to run without a display
+from bitsofeight import headless  # noqa
+from wasabisg.model import Model, Mesh
+from wasabisg.scenegraph import ModelNode, GroupNode, Camera
+from wasabisg.renderqueue import RenderQueue, back_to_front
+
+
+class FakeGroup(object):
+    def __init__(self, texture_id):
+        self.material = {'tex_map_Kd': FakeTexture(texture_id)}
+
+
+class FakeTexture(object):
+    def __init__(self, id):
+        self.id = id
+
+
+class FakeShader(object):
+    def __init__(self, name):
+        self.name = name
+
+    def unbind(self):
+        pass
+
+
+class Thing(object):
+    """A node that is drawn whole."""
+    group = None
+
+    def __init__(self, name, log, pos=None):
+        self.name = name
+        self.log = log
+        if pos is not None:
+            self.pos = pos
+
+    def draw(self, camera):
+        self.log.append(('draw', self.name))
+
+
+def model(*groups):
+    meshes = []
+    for g in groups:
+        m = Mesh(None, [], [], [], [], {})
+        m.group = g
+        meshes.append(m)
+    return Model(meshes=meshes)
+
+
+def test_sort_meshes():
+    """Meshes of all nodes are grouped by texture, then material."""
+    wood = FakeGroup(1)
+    sail = FakeGroup(2)
+    rope = FakeGroup(1)
+    hull = model(wood, rope)
+    mast = model(sail, wood)
+    shader = FakeShader('lit')
+    q = RenderQueue()
+    for i in xrange(2):
+        q.add(GroupNode([ModelNode(hull), ModelNode(mast)]), shader)
+    order = [item[8].group for item in sorted(q.items)]
+    eq_(order, [wood] * 4 + [rope] * 2 + [sail] * 2)
+
+
+def test_submit_nodes():
+    """Items are submitted grouped by shader, then lights."""
+    log = []
+    a = FakeShader('a')
+    b = FakeShader('b')
+    q = RenderQueue()
+    q.add(Thing('1', log), a, ('sun',))
+    q.add(Thing('2', log), b, ('sun',))
+    q.add(Thing('3', log), a, ('sun', 'flash'))
+    q.add(Thing('4', log), a, ('sun',))
+    q.submit(
+        None,
+        lambda s: log.append(('shader', s.name)),
+        lambda s, ls: log.append(('lights', ls))
+    )
+    eq_(log, [
+        ('shader', 'a'),
+        ('lights', ('sun',)),
+        ('draw', '1'),
+        ('draw', '4'),
+        ('lights', ('sun', 'flash')),
+        ('draw', '3'),
+        ('shader', 'b'),
+        ('lights', ('sun',)),
+        ('draw', '2'),
+    ])
+    eq_(q.changes.shaders, 2)
+    eq_(q.changes.lights, 3)
+    eq_(q.changes.draws, 4)
+
+
+def test_back_to_front():
+    camera = Camera(pos=Point3(0, 0, 0), look_at=Point3(0, 0, -1))
+    near = Thing('near', [], Point3(0, 0, -1))
+    far = Thing('far', [], Point3(0, 0, -10))
+    behind = Thing('behind', [], Point3(0, 0, 5))
+    unplaced = Thing('unplaced', [])
+    eq_(
+        back_to_front(camera, [near, unplaced, behind, far]),
+        [unplaced, far, near, behind]
+    )
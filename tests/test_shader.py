@@ -0,0 +1,56 @@
+from nose.tools import eq_
+
+# Configure pyglet to run without a display
+from bitsofeight import headless  # noqa
+from wasabisg.shader import Shader, gl_calls
+
+
+class Recorder(object):
+    def __init__(self, calls):
+        self.calls = calls
+
+    def __call__(self, loc, *args):
+        if args and not isinstance(args[-1], (int, float)):
+            args = args[:-1] + (list(args[-1]),)
+        self.calls.append((loc,) + args)
+
+
+def make_shader():
+    """Create a Shader that records uniform uploads instead of making them."""
+    s = Shader()
+    s.handle = 1
+    s.locations = {'a': 1, 'b': 2, 'missing': -1}
+    s.calls = calls = []
+    rec = Recorder(calls)
+    s.UNIFORMFS = s.UNIFORMIS = s.UNIFORMFVS = [None] + [rec] * 4
+    return s
+
+
+def test_skip_unchanged():
+    """Uniforms are only uploaded when their value changes."""
+    s = make_shader()
+    gl_calls.reset()
+    s.uniformf('a', 1.0, 2.0)
+    s.uniformf('a', 1.0, 2.0)
+    s.uniformi('b', 3)
+    s.uniformf('a', 1.0, 3.0)
+    s.uniformf('missing', 1.0)
+    eq_(s.calls, [(1, 1.0, 2.0), (2, 3), (1, 1.0, 3.0)])
+    eq_(gl_calls.calls, 3)
+    eq_(gl_calls.skipped, 2)
+
+
+def test_arrays():
+    """Arrays are uploaded from a reusable buffer."""
+    s = make_shader()
+    s.uniform4fv('a', [(1, 2, 3, 4), (5, 6, 7, 8)])
+    buf = s.buffers[1]
+    s.uniform4fv('a', [(1, 2, 3, 4), (5, 6, 7, 8)])
+    s.uniform4fv('a', [(0, 0, 0, 0)])
+    assert s.buffers[1] is buf
+    s.uniform1fv('b', [0.5, 0.25])
+    eq_(s.calls, [
+        (1, 2, [1, 2, 3, 4, 5, 6, 7, 8]),
+        (1, 1, [0, 0, 0, 0, 5, 6, 7, 8]),
+        (2, 2, [0.5, 0.25]),
+    ])
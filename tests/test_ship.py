@@ -1,6 +1,9 @@
+import numpy
 from nose.tools import eq_
 from math import radians
-from bitsofeight.sailing import get_sail_power, get_heeling_moment
+from bitsofeight.sailing import (
+    get_sail_power, get_heeling_moment, get_sail_setting, SailingPolar
+)
 
 
 def test_downwind():
@@ -55,3 +58,40 @@ def test_heeling_beam():
 def test_heeling_beam2():
     """Heeling moment is strong if we're sailing across the wind."""
     assert get_heeling_moment(-90) < -0.5
+
+
+def approx_eq(a, b, tolerance=1e-3):
+    assert abs(a - b) < tolerance, "%r !~== %r" % (a, b)
+
+
+def test_polar_matches_heuristics():
+    """Sailing polars follow the functions they tabulate.
+
+    We avoid sampling right next to the discontinuities in the functions.
+
+    """
+    polar = SailingPolar()
+    for deg in xrange(-179, 180, 7):
+        a = radians(deg + 0.3)
+        approx_eq(polar.get_sail_power(a), get_sail_power(a))
+        approx_eq(polar.get_heeling_moment(a), get_heeling_moment(a))
+        approx_eq(polar.get_sail_setting(a), get_sail_setting(a))
+
+
+def test_polar_wraps():
+    """Angles outside [-pi, pi] are looked up around the compass."""
+    polar = SailingPolar()
+    approx_eq(polar.get_sail_power(radians(450)), get_sail_power(radians(90)))
+    approx_eq(polar.get_sail_power(radians(-270)), get_sail_power(radians(90)))
+
+
+def test_polar_arrays():
+    """Array lookups give the same results as single lookups."""
+    polar = SailingPolar(resolution=36)
+    angles = numpy.linspace(-4, 4, 101)
+    for table, func in [
+            (polar.get_sail_powers, polar.get_sail_power),
+            (polar.get_heeling_moments, polar.get_heeling_moment),
+            (polar.get_sail_settings, polar.get_sail_setting)]:
+        for a, v in zip(angles.tolist(), table(angles).tolist()):
+            approx_eq(v, func(a), 1e-9)
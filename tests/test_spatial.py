@@ -0,0 +1,72 @@
+import random
+from nose.tools import eq_
+from euclid import Point3
+from bitsofeight.spatial import SpatialIndex
+
+
+class Thing(object):
+    def __init__(self, x, z, faction=0):
+        self.pos = Point3(x, 0, z)
+        self.faction = faction
+
+    def __repr__(self):
+        return '<Thing %r>' % (self.pos,)
+
+
+def brute_force(things, pos, radius):
+    return set(
+        t for t in things
+        if (t.pos.x - pos.x) ** 2 + (t.pos.z - pos.z) ** 2 <= radius * radius
+    )
+
+
+def test_query():
+    """Queries find the same objects as checking every object."""
+    random.seed(0)
+    index = SpatialIndex(cell_size=10)
+    things = [
+        Thing(random.uniform(-100, 100), random.uniform(-100, 100))
+        for i in xrange(200)
+    ]
+    for t in things:
+        index.add(t)
+    for i in xrange(20):
+        pos = Point3(random.uniform(-100, 100), 0, random.uniform(-100, 100))
+        radius = random.uniform(1, 40)
+        eq_(set(index.query(pos, radius)), brute_force(things, pos, radius))
+
+
+def test_update():
+    """Objects that move are found at their new position."""
+    index = SpatialIndex(cell_size=10)
+    t = Thing(0, 0)
+    index.add(t)
+    t.pos = Point3(55, 0, 55)
+    eq_(index.query(Point3(55, 0, 55), 1), [])
+    index.update()
+    eq_(index.query(Point3(55, 0, 55), 1), [t])
+    eq_(index.query(Point3(0, 0, 0), 1), [])
+
+
+def test_remove():
+    index = SpatialIndex()
+    t = Thing(0, 0)
+    index.add(t)
+    index.remove(t)
+    eq_(index.query(Point3(0, 0, 0), 10), [])
+    eq_(len(index), 0)
+    eq_(index.cells, {})
+
+
+def test_nearest():
+    """We can find the nearest object matching a filter."""
+    index = SpatialIndex(cell_size=10)
+    a = Thing(5, 0, faction=1)
+    b = Thing(20, 0, faction=2)
+    c = Thing(-30, 0, faction=2)
+    for t in (a, b, c):
+        index.add(t)
+    origin = Point3(0, 0, 0)
+    eq_(index.nearest(origin, 50), a)
+    eq_(index.nearest(origin, 50, lambda t: t.faction == 2), b)
+    eq_(index.nearest(origin, 10, lambda t: t.faction == 2), None)
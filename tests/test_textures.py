@@ -0,0 +1,82 @@
+from nose.tools import eq_
+
+# Configure pyglet to run without a display
+from bitsofeight import headless  # noqa
+from wasabisg.model import TextureLoader, Material, Mesh, Model
+
+
+class Texture(object):
+    def __init__(self, size):
+        self.width = self.height = size
+
+
+class Loader(TextureLoader):
+    """Load textures of the size given in their names, eg. '64.png'."""
+    def resolve(self, name):
+        return name.lstrip('./')
+
+    def load(self, name):
+        return Texture(int(name.lstrip('./').split('.')[0]))
+
+
+def test_shared():
+    """Each file is loaded once, however it is named."""
+    loader = Loader()
+    a = loader.load_texture('64.png')
+    b = loader.load_texture('./64.png')
+    assert a is b
+    eq_(loader.stats()['misses'], 1)
+    eq_(loader.stats()['hits'], 1)
+    eq_(loader.refs['64.png'], 2)
+    eq_(loader.stats()['resident_bytes'], 64 * 64 * 4 * 4 // 3)
+
+
+def test_budget():
+    """Unreferenced textures are evicted, least recently released first."""
+    sizes = [64, 65, 66]
+    loader = Loader(budget=sum(s * s * 4 * 4 // 3 for s in sizes))
+    textures = [loader.load_texture('%d.png' % s) for s in sizes]
+    for t in textures:
+        loader.release(t)
+    eq_(loader.stats()['evicted'], 0)
+    eq_(loader.stats()['unused'], 3)
+
+    # Reusing a texture makes it the most recently used
+    loader.release(loader.load_texture('64.png'))
+    loader.load_texture('8.png')
+    eq_(sorted(loader.textures), ['64.png', '66.png', '8.png'])
+    eq_(loader.stats()['evicted'], 1)
+
+
+def test_referenced():
+    """Textures that are still referenced are never evicted."""
+    loader = Loader(budget=0)
+    t = loader.load_texture('64.png')
+    loader.evict()
+    assert '64.png' in loader.textures
+    loader.release(t)
+    eq_(loader.textures, {})
+
+
+def test_material_copies():
+    """Copies of a material hold their own references to its textures."""
+    orig = Material.loader
+    loader = Material.loader = Loader(budget=0)
+    try:
+        m = Material(name='sail', map_Kd='64.png')
+        mesh = Mesh(
+            mode=None, vertices=[], normals=[], texcoords=[], indices=[],
+            material=m
+        )
+        model = Model(meshes=[mesh, mesh.copy(material=m)])
+        m.load_textures()
+        copy = model.copy()
+        assert copy.meshes[0].material is copy.meshes[1].material
+        eq_(loader.refs['64.png'], 2)
+
+        model.release_textures()
+        eq_(loader.refs['64.png'], 1)
+        copy.release_textures()
+        eq_(loader.textures, {})
+    finally:
+        Material.loader = orig
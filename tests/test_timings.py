@@ -0,0 +1,43 @@
+from nose.tools import eq_
+from wasabisg.timings import Timings, percentile
+
+
+def test_percentile():
+    """Percentiles are taken by nearest rank."""
+    samples = range(101)
+    eq_(percentile(samples, 50), 50)
+    eq_(percentile(samples, 99), 99)
+    eq_(percentile([3], 90), 3)
+
+
+def test_section():
+    """Sections record a sample each time they are entered."""
+    t = Timings()
+    for i in xrange(3):
+        with t.section('physics'):
+            pass
+    stats = t.stats('physics')
+    eq_(stats['count'], 3)
+    assert 0 <= stats['p50'] <= stats['p99'] <= stats['max']
+
+
+def test_rolling():
+    """Only the most recent samples contribute to the statistics."""
+    t = Timings(samples=10)
+    for i in xrange(100):
+        t.record('ai', i / 1000.0)
+    stats = t.stats('ai')
+    eq_(stats['count'], 100)
+    eq_(stats['max'], 99.0)
+    eq_(stats['p50'], 95.0)
+    assert abs(t.total('ai') - 4.95) < 1e-9
+
+
+def test_report():
+    """Reports include all sections with samples."""
+    t = Timings()
+    t.record('ai', 0.001)
+    t.section('unused')
+    eq_(t.report().keys(), ['ai'])
+    t.reset()
+    eq_(t.report(), {})
@@ -0,0 +1,71 @@
+import random
+from nose.tools import eq_
+from bitsofeight import headless
+from bitsofeight.world import World
+
+
+def simulate(seed, ticks=600):
+    random.seed(seed)
+    world = World(headless=True)
+    for i in xrange(4):
+        world.spawn_one_ship(faction=1 + i % 2)
+    headless.run(world, ticks)
+    return world
+
+
+def test_headless_world():
+    """A headless world has no scene but still simulates ships."""
+    w = simulate(1)
+    eq_(w.scene, None)
+    eq_(len(w.physics.bodies), 4)
+    assert abs(w.t - 600 * headless.DT) < 1e-9
+
+
+def test_deterministic():
+    """Battles with the same seed play out the same."""
+    a = simulate(2)
+    b = simulate(2)
+    eq_(
+        [tuple(o.pos) for o in a.ships],
+        [tuple(o.pos) for o in b.ships]
+    )
+
+
+class Spark(object):
+    """An effect that replaces itself with a new spark every tick."""
+    def __init__(self, log):
+        self.log = log
+
+    def update(self, dt):
+        self.log.append(self)
+        world = self.world
+        world.destroy(self)
+        assert self in world.effects
+        world.spawn(Spark(self.log))
+
+
+def test_deferred_spawn():
+    """Objects spawned and destroyed during a tick change over at its end."""
+    w = World(headless=True)
+    log = []
+    first = Spark(log)
+    w.spawn(first)
+    eq_(len(w.effects), 1)
+    headless.run(w, 3)
+    eq_(len(log), 3)
+    eq_(len(set(log)), 3)
+    eq_(len(w.effects), 1)
+    eq_(first.world, None)
+
+
+def test_spawn_then_destroy():
+    """An object destroyed in the tick it was spawned never joins."""
+    w = World(headless=True)
+    w.updating = True
+    s = Spark([])
+    w.spawn(s)
+    w.destroy(s)
+    w.updating = False
+    w.flush()
+    eq_(len(w.effects), 0)
+    eq_(s.world, None)
@@ -0,0 +1,206 @@
+"""Pack small textures into shared atlas textures.
+
+Every texture that is drawn with needs a texture bind, and the draws that use
+it can't be batched with draws that use another. An Atlas packs small images
+into a few large textures, so that particle groups and materials can share a
+texture; each image becomes a TextureRegion of the atlas, and texture
+coordinates are mapped into that region.
+
+Only textures whose coordinates lie within [0, 1] can be packed - textures
+that tile by repeating need a texture of their own.
+
+"""
+import numpy
+import pyglet.image
+import pyglet.resource
+from pyglet.image import SolidColorImagePattern
+from pyglet.image.atlas import Allocator, AllocatorException
+
+
+# Texture coordinates this far outside [0, 1] are treated as lying on the edge
+TOLERANCE = 1e-3
+
+
+def region_bounds(region):
+    """Get the (u0, v0, u1, v1) bounds of a texture region.
+
+    If region is part of a larger texture, the bounds are inset by half a
+    texel, so that filtering does not pick up neighbouring images.
+
+    """
+    tc = region.tex_coords
+    u0, v0, u1, v1 = tc[0], tc[1], tc[6], tc[7]
+    owner = getattr(region, 'owner', None)
+    if owner is not None:
+        du = 0.5 / owner.width
+        dv = 0.5 / owner.height
+        u0, v0, u1, v1 = u0 + du, v0 + dv, u1 - du, v1 - dv
+    return u0, v0, u1, v1
+
+
+def sprite_coords(region):
+    """Get the corners of region in the order lepton's SpriteTexturizer takes.
+
+    That is bottom left, bottom right, top right and top left.
+
+    """
+    u0, v0, u1, v1 = region_bounds(region)
+    return (u0, v0, u1, v0, u1, v1, u0, v1)
+
+
+def fits_region(texcoords):
+    """Return True if texcoords can be mapped into a region of an atlas."""
+    t = numpy.asarray(texcoords)
+    return (
+        len(t) > 0 and
+        t.min() >= -TOLERANCE and
+        t.max() <= 1 + TOLERANCE
+    )
+
+
+def region_texcoords(texcoords, bounds):
+    """Map a flat array of (u, v) texcoords in [0, 1] into bounds."""
+    u0, v0, u1, v1 = bounds
+    t = numpy.clip(numpy.asarray(texcoords, dtype=float).reshape(-1, 2), 0, 1)
+    t = t * (u1 - u0, v1 - v0) + (u0, v0)
+    return t.astype(numpy.float32).ravel()
+
+
+def load_image(name):
+    """Load the image resource name."""
+    f = pyglet.resource.file(name)
+    try:
+        return pyglet.image.load(name, f)
+    finally:
+        f.close()
+
+
+class Atlas(object):
+    """Pack images into shared textures of width x height texels.
+
+    Images larger than max_size in either dimension are given textures of
+    their own. Packed images are separated by a transparent gap of padding
+    texels.
+
+    """
+    def __init__(self, width=512, height=512, max_size=128, padding=1):
+        self.width = width
+        self.height = height
+        self.max_size = max_size
+        self.padding = padding
+        self.textures = []
+        self.allocators = []
+        self.regions = {}
+        self.oversized = set()
+        self.unpacked = {}
+        self.materials = {}
+
+    def new_texture(self):
+        blank = SolidColorImagePattern((0, 0, 0, 0))
+        texture = blank.create_image(self.width, self.height).get_texture()
+        self.textures.append(texture)
+        self.allocators.append(Allocator(self.width, self.height))
+
+    def add(self, name, image):
+        """Pack image, returning its TextureRegion.
+
+        Return None if image is too large to pack.
+
+        """
+        try:
+            return self.regions[name]
+        except KeyError:
+            pass
+        if image.width > self.max_size or image.height > self.max_size:
+            return None
+
+        p = self.padding
+        w = image.width + 2 * p
+        h = image.height + 2 * p
+        for texture, allocator in zip(self.textures, self.allocators):
+            try:
+                x, y = allocator.alloc(w, h)
+                break
+            except AllocatorException:
+                continue
+        else:
+            self.new_texture()
+            texture = self.textures[-1]
+            x, y = self.allocators[-1].alloc(w, h)
+
+        texture.blit_into(image, x + p, y + p, 0)
+        region = texture.get_region(x + p, y + p, image.width, image.height)
+        self.regions[name] = region
+        return region
+
+    def region(self, name):
+        """Get the region of the image resource name, packing it if needed.
+
+        Return None if the image is too large to pack.
+
+        """
+        try:
+            return self.regions[name]
+        except KeyError:
+            if name in self.oversized:
+                return None
+        region = self.add(name, load_image(name))
+        if region is None:
+            self.oversized.add(name)
+        return region
+
+    def texture(self, name):
+        """Get a texture for the image resource name.
+
+        This is its region of the atlas, or if it is too large to pack, a
+        texture of its own.
+
+        """
+        region = self.region(name)
+        if region is not None:
+            return region
+        try:
+            return self.unpacked[name]
+        except KeyError:
+            image = load_image(name)
+            tex = self.unpacked[name] = image.get_mipmapped_texture()
+            return tex
+
+    def pack_mesh(self, mesh):
+        """Move the diffuse texture of mesh into the atlas, if possible.
+
+        The mesh's texture coordinates are mapped into the atlas, and it is
+        given a copy of its material that uses the atlas. Return True if the
+        mesh was packed, or already had been.
+
+        """
+        material = mesh.material
+        name = material.get('map_Kd')
+        if not name:
+            return False
+        tex = material.get('tex_map_Kd')
+        if tex is not None and self.regions.get(name) is tex:
+            # The material, or the one it was copied from, is already packed,
+            # so the texture coordinates are already mapped into the atlas
+            return True
+        if not fits_region(mesh.texcoords):
+            return False
+        region = self.region(name)
+        if region is None:
+            return False
+        mesh.texcoords = region_texcoords(
+            mesh.texcoords, region_bounds(region)
+        )
+        mesh.material = self.packed_material(material, region)
+        return True
+
+    def packed_material(self, material, region):
+        """Get a copy of material that uses region as its diffuse texture."""
+        try:
+            return self.materials[id(material)][1]
+        except KeyError:
+            packed = material.copy()
+            packed['tex_map_Kd'] = region
+            # Hold a reference to material, so that its id is not reused
+            self.materials[id(material)] = material, packed
+            return packed
@@ -60,7 +60,9 @@ class FallbackRenderer(object):
     def __init__(self):
         self.textures = {}
 
-    def render(self, scene, camera):
+    def render(self, scene, camera, objects=None):
+        if objects is None:
+            objects = scene.objects
         glEnable(GL_TEXTURE_2D)
         glClearColor(1.0, 0, 0, 0)
         glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
@@ -83,7 +85,7 @@ class FallbackRenderer(object):
         # glPolygonMode(GL_FRONT_AND_BACK, GL_LINE)
 
         camera.set_matrix()
-        self.render_scene(camera, scene.objects)
+        self.render_scene(camera, objects)
 
     def prepare_model(self, model):
         if hasattr(model, 'draw'):
@@ -0,0 +1,289 @@
+"""Draw many copies of the same model with hardware instancing.
+
+Rather than each ModelNode setting up its own transformation and drawing
+its model, nodes that share a model are collected into an InstanceBatch. The
+transformations of all instances are uploaded to a buffer once per frame, and
+each mesh of the model is then drawn with a single glDrawElementsInstanced()
+call, so the number of draw calls depends on the number of distinct models
+rather than the number of nodes.
+
+"""
+from ctypes import c_void_p
+
+import numpy
+from OpenGL.GL import *
+
+from .model import Model
+
+
+# The attribute location used for the per-instance transformation matrix,
+# which occupies this location and the three following it. Locations 0-3 may
+# alias the built-in vertex attributes on some drivers.
+INSTANCE_MATRIX_LOCATION = 4
+
+# Size in bytes of one instance's matrix, and of one column of it
+MATRIX_SIZE = 64
+COLUMN_SIZE = 16
+
+
+def transform_matrices(positions, rotations):
+    """Compute the matrices of nodes as glTranslatef() then glRotatef().
+
+    positions is an (n, 3) array and rotations an (n, 4) array of angle in
+    degrees and axis, as for ModelNode. Return an (n, 4, 4) array.
+
+    """
+    n = len(positions)
+    angle = numpy.radians(rotations[:, 0])
+    axis = rotations[:, 1:]
+    norm = numpy.sqrt((axis * axis).sum(axis=1))
+    null = norm == 0
+    angle = numpy.where(null, 0.0, angle)
+    x, y, z = (axis / numpy.where(null, 1.0, norm)[:, numpy.newaxis]).T
+    c = numpy.cos(angle)
+    s = numpy.sin(angle)
+    t = 1 - c
+
+    m = numpy.zeros((n, 4, 4))
+    m[:, 0, 0] = x * x * t + c
+    m[:, 0, 1] = x * y * t - z * s
+    m[:, 0, 2] = x * z * t + y * s
+    m[:, 1, 0] = y * x * t + z * s
+    m[:, 1, 1] = y * y * t + c
+    m[:, 1, 2] = y * z * t - x * s
+    m[:, 2, 0] = x * z * t - y * s
+    m[:, 2, 1] = y * z * t + x * s
+    m[:, 2, 2] = z * z * t + c
+    m[:, :3, 3] = positions
+    m[:, 3, 3] = 1.0
+    return m
+
+
+def have_instancing():
+    """Return True if the current GL context supports instanced drawing."""
+    return bool(glDrawElementsInstanced) and bool(glVertexAttribDivisor)
+
+
+def draw_instanced(mode, vertex_list, count):
+    """Draw count instances of a pyglet IndexedVertexList.
+
+    This does what IndexedVertexDomain.draw() does for a single list, but
+    with glDrawElementsInstanced().
+
+    """
+    domain = vertex_list.domain
+    glPushClientAttrib(GL_CLIENT_VERTEX_ARRAY_BIT)
+    for buffer, attributes in domain.buffer_attributes:
+        buffer.bind()
+        for attribute in attributes:
+            attribute.enable()
+            attribute.set_pointer(attribute.buffer.ptr)
+    index_buffer = domain.index_buffer
+    index_buffer.bind()
+    glDrawElementsInstanced(
+        mode,
+        vertex_list.index_count,
+        domain.index_gl_type,
+        c_void_p(
+            index_buffer.ptr +
+            vertex_list.index_start * domain.index_element_size
+        ),
+        count
+    )
+    index_buffer.unbind()
+    for buffer, _ in domain.buffer_attributes:
+        buffer.unbind()
+    glPopClientAttrib()
+
+
+class InstanceBatch(object):
+    """The instances of one model, as a range of the instance buffer.
+
+    Batches can be drawn in place of the nodes they were collected from, with
+    a shader that reads the instance_matrix attribute.
+
+    """
+    def __init__(self, instancer, model, first, count):
+        self.instancer = instancer
+        self.model = model
+        self.first = first
+        self.count = count
+
+    def __repr__(self):
+        return '<InstanceBatch %s x%d>' % (self.model.name, self.count)
+
+    def update(self, dt):
+        pass
+
+    def is_transparent(self):
+        return False
+
+    def draw(self, camera):
+        self.instancer.draw_batch(self)
+
+
+class Instancer(object):
+    """Collect scene nodes into batches of instances of the same model.
+
+    Only plain ModelNodes of static models, and GroupNodes made up of them,
+    are collected; nodes with a group or transparency, or of subclasses that
+    may draw themselves differently, are left to be drawn as usual.
+
+    collect() may be called several times between clear() and upload(), eg.
+    once for each set of objects lit by the same lights; the instances of
+    every call are uploaded together.
+
+    """
+    def __init__(self):
+        from .scenegraph import ModelNode, GroupNode
+        self.ModelNode = ModelNode
+        self.GroupNode = GroupNode
+        self.supported = None
+        self.buffer = None
+        self.parts = []
+        self.count = 0
+        self.draw_calls = 0
+
+    @property
+    def matrices(self):
+        """The matrices of all instances collected since clear()."""
+        if not self.parts:
+            return numpy.zeros((0, 4, 4), dtype=numpy.float32)
+        return numpy.concatenate(self.parts)
+
+    def clear(self):
+        """Forget the instances collected so far."""
+        del self.parts[:]
+        self.count = 0
+
+    def available(self):
+        """Return True if instancing can be used in the current context."""
+        if self.supported is None:
+            self.supported = have_instancing()
+        return self.supported
+
+    def instanceable(self, node):
+        """Return True if node can be drawn as instances."""
+        if node.group is not None:
+            return False
+        cls = type(node)
+        if cls is self.ModelNode:
+            return (
+                not node.transparent and
+                isinstance(node.model_instance, Model)
+            )
+        elif cls is self.GroupNode:
+            return all(self.instanceable(n) for n in node.nodes)
+        return False
+
+    def collect(self, objects):
+        """Split objects into batches of instances and other objects.
+
+        Return a list of InstanceBatches and a list of the objects that must
+        be drawn individually. The matrices for all the batches are added to
+        self.matrices, ready to be uploaded.
+
+        """
+        others = []
+        parents = []
+        depths = []
+        positions = []
+        rotations = []
+        instances = {}
+        models = []
+
+        def add(node, parent, depth):
+            i = len(parents)
+            parents.append(parent)
+            depths.append(depth)
+            positions.append(tuple(node.pos))
+            rotations.append(tuple(node.rotation))
+            if type(node) is self.GroupNode:
+                for n in node.nodes:
+                    add(n, i, depth + 1)
+            else:
+                model = node.model_instance
+                try:
+                    instances[model].append(i)
+                except KeyError:
+                    instances[model] = [i]
+                    models.append(model)
+
+        for o in objects:
+            if self.instanceable(o):
+                add(o, -1, 0)
+            else:
+                others.append(o)
+
+        if not models:
+            return [], others
+
+        world = transform_matrices(
+            numpy.array(positions, dtype=float),
+            numpy.array(rotations, dtype=float)
+        )
+        parents = numpy.array(parents)
+        depths = numpy.array(depths)
+        for depth in xrange(1, depths.max() + 1):
+            nodes = numpy.flatnonzero(depths == depth)
+            world[nodes] = numpy.matmul(world[parents[nodes]], world[nodes])
+
+        batches = []
+        order = []
+        for model in models:
+            nodes = instances[model]
+            batches.append(InstanceBatch(
+                self, model, self.count + len(order), len(nodes)
+            ))
+            order.extend(nodes)
+
+        # GL expects each matrix column by column
+        self.parts.append(numpy.ascontiguousarray(
+            world[order].transpose(0, 2, 1), dtype=numpy.float32
+        ))
+        self.count += len(order)
+        return batches, others
+
+    def upload(self):
+        """Upload the matrices collected since clear() to the instance buffer."""
+        if self.buffer is None:
+            self.buffer = glGenBuffers(1)
+        matrices = self.matrices
+        glBindBuffer(GL_ARRAY_BUFFER, self.buffer)
+        glBufferData(
+            GL_ARRAY_BUFFER,
+            matrices.nbytes,
+            matrices,
+            GL_STREAM_DRAW
+        )
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        self.draw_calls = 0
+
+    def draw_batch(self, batch):
+        """Draw every mesh of batch.model, once for each instance."""
+        loc = INSTANCE_MATRIX_LOCATION
+        offset = batch.first * MATRIX_SIZE
+        glBindBuffer(GL_ARRAY_BUFFER, self.buffer)
+        for i in xrange(4):
+            glEnableVertexAttribArray(loc + i)
+            glVertexAttribPointer(
+                loc + i, 4, GL_FLOAT, GL_FALSE, MATRIX_SIZE,
+                c_void_p(offset + i * COLUMN_SIZE)
+            )
+            glVertexAttribDivisor(loc + i, 1)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+        for mesh in batch.model.meshes:
+            mesh.group.set_state_recursive()
+            draw_instanced(mesh.mode, mesh.list, batch.count)
+            mesh.group.unset_state_recursive()
+            self.draw_calls += 1
+
+        for i in xrange(4):
+            glVertexAttribDivisor(loc + i, 0)
+            glDisableVertexAttribArray(loc + i)
+
+    def __del__(self):
+        if self.buffer is not None:
+            glDeleteBuffers(1, [self.buffer])
+            self.buffer = None
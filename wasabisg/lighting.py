@@ -1,6 +1,14 @@
+import numpy
 from euclid import Point3, Vector3
 
 
+# The most lights that the lighting shaders can apply to an object
+MAX_LIGHTS = 8
+
+# Point lights are ignored where they would be dimmer than this
+LIGHT_THRESHOLD = 0.01
+
+
 class BaseLight(object):
     """Indicate that this is a light."""
 
@@ -82,3 +90,65 @@ class Sunlight(BaseLight):
     def direction(self, direction):
         self._pos = d = Vector3(*direction[:3])
         d.normalize()
+
+
+def select_lights(lights, objects, limit=MAX_LIGHTS, threshold=LIGHT_THRESHOLD):
+    """Group objects by the lights that should be applied to them.
+
+    A point light is applied to an object if, at the object's bounding
+    sphere, it has at least the threshold intensity; sunlights apply to every
+    object. If more than limit lights apply to an object, only the sunlights
+    and then the brightest point lights are kept.
+
+    Objects with no known extent are considered to be touched by every
+    light. If there are no more than limit lights, they are all applied to
+    every object, so that objects are not split up needlessly.
+
+    Return a list of (lights, objects) pairs, in order of first appearance.
+
+    """
+    if not objects:
+        return []
+    if len(lights) <= limit:
+        return [(lights, objects)]
+
+    n = len(objects)
+    centres = numpy.zeros((n, 3))
+    radii = numpy.empty(n)
+    for i, o in enumerate(objects):
+        try:
+            r = o.bounding_radius()
+        except AttributeError:
+            r = None
+        if r is None:
+            radii[i] = numpy.inf
+        else:
+            centres[i] = tuple(o.pos)
+            radii[i] = r
+
+    points = numpy.array([tuple(l._pos) for l in lights])
+    intensities = numpy.array([float(l.intensity) for l in lights])
+    falloffs = numpy.array([float(l.falloff) for l in lights])
+    suns = numpy.array([not l.w for l in lights])
+
+    # Distance from each object's bounds to each light
+    v = centres[:, numpy.newaxis, :] - points[numpy.newaxis, :, :]
+    dist = numpy.sqrt((v * v).sum(axis=2)) - radii[:, numpy.newaxis]
+    dist = numpy.maximum(dist, 0.0)
+    strength = intensities / (1.0 + falloffs * dist * dist)
+    strength[:, suns] = numpy.inf
+    strength[strength < threshold] = 0.0
+
+    strongest = numpy.argsort(-strength, axis=1, kind='mergesort')[:, :limit]
+    applied = numpy.take_along_axis(strength, strongest, axis=1) > 0
+
+    groups = []
+    index = {}
+    for o, ls, keep in zip(objects, strongest.tolist(), applied.tolist()):
+        key = tuple(sorted(l for l, k in zip(ls, keep) if k))
+        try:
+            groups[index[key]][1].append(o)
+        except KeyError:
+            index[key] = len(groups)
+            groups.append(([lights[l] for l in key], [o]))
+    return groups
@@ -0,0 +1,241 @@
+"""A binary cache of models loaded from text formats such as .obj.
+
+Each model is cached in a file of its own, containing a JSON header followed
+by the packed arrays of every mesh. The header records the size, mtime and
+SHA-1 of the source files the model was built from - the model itself and
+its material libraries - along with the materials defined in those
+libraries.
+
+A cache file is valid as long as each source file either has the recorded
+size and mtime, or failing that, the recorded hash. Cached arrays are
+memory-mapped rather than read.
+
+"""
+import os
+import json
+import mmap
+import struct
+import hashlib
+
+import numpy
+
+from ..model import Model, Mesh, Material
+
+
+MAGIC = 'WSGMODEL'
+VERSION = 1
+
+# The length of the JSON header follows the magic number
+HEADER_LEN = struct.Struct('<I')
+
+# Arrays are aligned to this many bytes
+ALIGN = 16
+
+ARRAYS = [
+    ('vertices', numpy.float32),
+    ('normals', numpy.float32),
+    ('texcoords', numpy.float32),
+    ('indices', numpy.uint32),
+]
+
+
+def data_start(header_end):
+    """Get the offset of the arrays, given the offset of the header's end."""
+    return header_end + -header_end % ALIGN
+
+
+def file_hash(filename):
+    """Compute the SHA-1 hex digest of a file's contents."""
+    h = hashlib.sha1()
+    with open(filename, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), ''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def source_info(filename):
+    """Describe a source file, so that changes to it can be detected."""
+    st = os.stat(filename)
+    return {
+        'path': filename,
+        'size': st.st_size,
+        'mtime': st.st_mtime,
+        'sha1': file_hash(filename),
+    }
+
+
+def is_unchanged(info):
+    """Return True if the source file described by info is unchanged."""
+    try:
+        st = os.stat(info['path'])
+    except OSError:
+        return False
+    if st.st_size == info['size'] and st.st_mtime == info['mtime']:
+        return True
+    return file_hash(info['path']) == info['sha1']
+
+
+def serialise_material(material):
+    """Get the properties of material that can be saved.
+
+    Loaded textures are left out; they are loaded again when needed.
+
+    """
+    return dict(
+        (k, v) for k, v in material.iteritems()
+        if not k.startswith('tex_')
+    )
+
+
+class ModelCache(object):
+    """A directory of cached models.
+
+    :param directory: The directory to hold cache files. It is created when
+                      the first model is saved.
+
+    """
+    def __init__(self, directory):
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, filename, options):
+        """Get the path of the cache file for filename."""
+        key = repr((os.path.abspath(filename), sorted(options.items())))
+        digest = hashlib.sha1(key).hexdigest()[:12]
+        return os.path.join(
+            self.directory,
+            '%s-%s.model' % (os.path.basename(filename), digest)
+        )
+
+    def load(self, filename, mtl_loader, **options):
+        """Load the model built from filename with the given options.
+
+        Materials are registered with mtl_loader, unless it has already
+        loaded their library. Return None if the model is not cached, or
+        the cache is out of date.
+
+        """
+        try:
+            f = open(self.path(filename, options), 'rb')
+        except IOError:
+            self.misses += 1
+            return None
+        with f:
+            header = self.read_header(f)
+            if header is None or not self.is_valid(header):
+                self.misses += 1
+                return None
+            start = data_start(f.tell())
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        for lib in header['mtllibs']:
+            if lib['path'] not in mtl_loader.mtllibs:
+                mtl_loader.add_materials(
+                    lib['path'],
+                    [Material(m) for m in lib['materials']]
+                )
+
+        meshes = []
+        for m in header['meshes']:
+            arrays = {}
+            for name, dtype in ARRAYS:
+                offset, count = m[name]
+                if count:
+                    arrays[name] = numpy.frombuffer(
+                        data, dtype=dtype, count=count, offset=start + offset
+                    )
+                else:
+                    arrays[name] = numpy.zeros(0, dtype=dtype)
+            meshes.append(Mesh(
+                name=m['name'],
+                mode=m['mode'],
+                material=mtl_loader.get_material(m['material']),
+                **arrays
+            ))
+        self.hits += 1
+        return Model(name=header['name'], meshes=meshes)
+
+    def is_cached(self, filename, **options):
+        """Return True if an up-to-date copy of a model is cached."""
+        try:
+            with open(self.path(filename, options), 'rb') as f:
+                header = self.read_header(f)
+        except IOError:
+            return False
+        return header is not None and self.is_valid(header)
+
+    def read_header(self, f):
+        """Read the header of a cache file, or return None if it is invalid."""
+        if f.read(len(MAGIC)) != MAGIC:
+            return None
+        try:
+            length, = HEADER_LEN.unpack(f.read(HEADER_LEN.size))
+            header = json.loads(f.read(length))
+        except (struct.error, ValueError):
+            return None
+        if header.get('version') != VERSION:
+            return None
+        return header
+
+    def is_valid(self, header):
+        """Return True if the sources of a cached model are unchanged."""
+        sources = [header['source']] + header['mtllibs']
+        return all(is_unchanged(s) for s in sources)
+
+    def save(self, filename, model, mtl_loader, mtllibs, **options):
+        """Cache model, which was built from filename and mtllibs."""
+        meshes = []
+        chunks = []
+        offset = 0
+        for m in model.meshes:
+            desc = {
+                'name': m.name,
+                'mode': int(m.mode),
+                'material': m.material['name'],
+            }
+            for name, dtype in ARRAYS:
+                a = numpy.asarray(getattr(m, name), dtype=dtype)
+                desc[name] = (offset, len(a))
+                data = a.tobytes()
+                pad = -len(data) % ALIGN
+                chunks.append(data + '\0' * pad)
+                offset += len(data) + pad
+            meshes.append(desc)
+
+        libs = []
+        for lib in mtllibs:
+            info = source_info(lib)
+            info['materials'] = [
+                serialise_material(mtl_loader.get_material(name))
+                for name in mtl_loader.libraries[lib]
+            ]
+            libs.append(info)
+
+        header = {
+            'version': VERSION,
+            'name': model.name,
+            'source': source_info(filename),
+            'mtllibs': libs,
+            'meshes': meshes,
+        }
+
+        encoded = json.dumps(header, sort_keys=True)
+        header_end = len(MAGIC) + HEADER_LEN.size + len(encoded)
+
+        path = self.path(filename, options)
+        tmp = '%s.%d.tmp' % (path, os.getpid())
+        try:
+            if not os.path.isdir(self.directory):
+                os.makedirs(self.directory)
+            with open(tmp, 'wb') as f:
+                f.write(MAGIC)
+                f.write(HEADER_LEN.pack(len(encoded)))
+                f.write(encoded)
+                f.write('\0' * (data_start(header_end) - header_end))
+                for c in chunks:
+                    f.write(c)
+            os.rename(tmp, path)
+        except (IOError, OSError):
+            # The cache is only an optimisation; carry on without it
+            pass
@@ -1,6 +1,10 @@
+import re
 import os.path
 
+import numpy
+
 from ..model import Model, Mesh, AnimatedModel, DEFAULT_FRAMERATE, Material
+from .modelcache import ModelCache
 
 from OpenGL.GL import GL_TRIANGLES, GL_QUADS
 
@@ -14,57 +18,177 @@ def optimise_model(model):
     This significantly improves drawing performance.
 
     """
-    from array import array
-    materials = {}
+    keys = []
     meshes_by_mat = {}
     for m in model.meshes:
-        matid = id(m.material)
-        mode = m.mode
-        materials[matid] = m.material
-        meshes_by_mat.setdefault((mode, matid), []).append(m)
+        key = (m.mode, id(m.material))
+        if key not in meshes_by_mat:
+            keys.append(key)
+            meshes_by_mat[key] = []
+        meshes_by_mat[key].append(m)
 
     out = []
-    for (mode, matid), meshes in meshes_by_mat.items():
-        vs = array('f')
-        ns = array('f')
-        uvs = array('f')
-        indices = array('L')
+    for key in keys:
+        meshes = meshes_by_mat[key]
+        offset = 0
+        indices = []
         for m in meshes:
-            offset = len(vs) // 3
-            vs.extend(m.vertices)
-            ns.extend(m.normals)
-            uvs.extend(m.texcoords)
-            indices.extend(i + offset for i in m.indices)
+            m_indices = numpy.asarray(m.indices, dtype=numpy.uint32)
+            indices.append(m_indices + offset)
+            offset += len(m.vertices) // 3
         out.append(Mesh(
-            mode=mode,
-            vertices=vs,
-            normals=ns,
-            texcoords=uvs,
-            indices=indices,
-            material=materials[matid]
+            mode=key[0],
+            vertices=concatenate(meshes, 'vertices'),
+            normals=concatenate(meshes, 'normals'),
+            texcoords=concatenate(meshes, 'texcoords'),
+            indices=numpy.concatenate(indices),
+            material=meshes[0].material
         ))
     model.meshes = out
 
 
+def concatenate(meshes, attr):
+    """Join an attribute of meshes into a single float32 array."""
+    return numpy.concatenate([
+        numpy.asarray(getattr(m, attr), dtype=numpy.float32) for m in meshes
+    ])
+
+
+def parse_numbers(text, dtype=float):
+    """Parse whitespace-separated numbers from text into a 1D array."""
+    return numpy.fromstring(text, dtype=dtype, sep=' ')
+
+
+def parse_vectors(lines, size):
+    """Parse the first size numbers on each of lines into an array."""
+    values = parse_numbers(' '.join(lines))
+    if len(values) != len(lines) * size:
+        # Some lines have more (or fewer) components than we need
+        values = numpy.array(
+            [v for l in lines for v in l.split()[:size]],
+            dtype=float
+        )
+    return values.reshape(-1, size)
+
+
+def parse_index(corner):
+    """Parse a face corner such as 1/2/3 or 1//3 into (v, uv, n).
+
+    Missing indices are returned as 0.
+
+    """
+    w = corner.split('/')
+    return (
+        int(w[0]),
+        int(w[1]) if len(w) >= 2 and w[1] else 0,
+        int(w[2]) if len(w) >= 3 and w[2] else 0,
+    )
+
+
+def parse_corners(faces):
+    """Parse the corners of faces into an (n, 3) array of (v, uv, n) indices.
+
+    Return the array, and whether any of the faces is a quad.
+
+    """
+    text = ' '.join(faces)
+    count = len(text.split())
+    quads = (
+        count != 3 * len(faces) and
+        any(len(f.split()) == 4 for f in faces)
+    )
+
+    # If there are k slashes per corner on average, and no corner has more
+    # than k, then every corner has the same form and they can all be parsed
+    # in one go.
+    slashes, remainder = divmod(text.count('/'), max(count, 1))
+    if not remainder and slashes <= 2:
+        too_many = '/[^\\s/]*' * slashes + '/'
+        if not re.search(too_many, text):
+            fields = slashes + 1
+            values = parse_numbers(
+                text.replace('//', '/0/').replace('/', ' '),
+                dtype=int
+            )
+            if len(values) == fields * count:
+                indices = numpy.zeros((count, 3), dtype=int)
+                indices[:, :fields] = values.reshape(-1, fields)
+                return indices, quads
+
+    indices = numpy.array([parse_index(c) for c in text.split()], dtype=int)
+    return indices.reshape(-1, 3), quads
+
+
+def first_occurrences(rows):
+    """Number the distinct rows of an array in order of first appearance.
+
+    Return the index of the first occurrence of each distinct row, and for
+    each row, the number of the distinct row it is equal to.
+
+    """
+    if not len(rows):
+        return numpy.zeros(0, dtype=int), numpy.zeros(0, dtype=int)
+
+    # Combine the columns into a single key for each row
+    rows = rows - rows.min(axis=0)
+    spans = rows.max(axis=0) + 1
+    keys = numpy.zeros(len(rows), dtype=numpy.int64)
+    for col, span in zip(rows.T, spans):
+        keys = keys * span + col
+
+    _, first, inverse = numpy.unique(
+        keys, return_index=True, return_inverse=True
+    )
+    order = numpy.argsort(first)
+    numbers = numpy.empty_like(order)
+    numbers[order] = numpy.arange(len(order))
+    return first[order], numbers[inverse]
+
+
 class ObjFileLoader(object):
-    """Load models from Wavefront .obj files."""
-    def __init__(self):
+    """Load models from Wavefront .obj files.
+
+    :param cache_dir: If given, parsed models are cached in binary form in
+                      this directory, and loaded from there while the .obj
+                      and .mtl files they came from are unchanged.
+
+    """
+    def __init__(self, cache_dir=None):
         self.mtl_loader = MtlFileLoader()
+        self.cache = ModelCache(cache_dir) if cache_dir else None
 
     def load_obj(self, filename, swapyz=False):
         """Load a Wavefront OBJ file and return a Model."""
+        if self.cache:
+            model = self.cache.load(filename, self.mtl_loader, swapyz=swapyz)
+            if model:
+                return model
+
+        mtllibs = []
+        model = self.parse_obj(filename, swapyz, mtllibs)
+        if self.cache:
+            self.cache.save(
+                filename, model, self.mtl_loader, mtllibs, swapyz=swapyz
+            )
+        return model
 
+    def parse_obj(self, filename, swapyz=False, mtllibs=None):
+        """Parse a Wavefront OBJ file and return a Model.
+
+        The paths of any material libraries it uses are appended to mtllibs.
+
+        """
         mode = GL_TRIANGLES
 
-        # These list hold defined vectors
+        # The lines defining vectors, parsed once the file has been read
         vertices = []
         normals = []
         texcoords = []
 
-        # This will hold indexes into the vectors above
+        # The lines defining faces
         faces = []
 
-        # (faces, material) tuples
+        # (faces, material, name) tuples
         facegroups = []
 
         material = None
@@ -74,94 +198,67 @@ class ObjFileLoader(object):
             if line.startswith('#'):
                 continue
 
-            values = line.split()
+            values = line.split(None, 1)
             if not values:
                 continue
 
-            if values[0] == 'v':
-                v = map(float, values[1:4])
-                if swapyz:
-                    v = v[0], v[2], v[1]
-                vertices.append(v)
-            elif values[0] == 'vn':
-                v = map(float, values[1:4])
-                if swapyz:
-                    v = v[0], v[2], v[1]
-                normals.append(v)
-            elif values[0] == 'vt':
-                texcoords.append(map(float, values[1:3]))
-            elif values[0] in ('usemtl', 'usemat'):
+            cmd = values[0]
+            rest = values[1] if len(values) > 1 else ''
+            if cmd == 'v':
+                vertices.append(rest)
+            elif cmd == 'vn':
+                normals.append(rest)
+            elif cmd == 'vt':
+                texcoords.append(rest)
+            elif cmd == 'f':
+                faces.append(rest)
+            elif cmd in ('usemtl', 'usemat'):
                 if faces and material:
                     facegroups.append((faces, material, name))
                     faces = []
-                material = self.mtl_loader.get_material(values[1])
-            elif values[0] == 'mtllib':
-                self.mtl_loader.load_materials(
-                    os.path.join(os.path.dirname(filename), values[1])
-                )
-            elif values[0] == 'f':
-                vs = []
-                uvs = []
-                ns = []
-                for v in values[1:]:
-                    w = v.split('/')
-                    vs.append(int(w[0]))
-                    if len(w) >= 2 and len(w[1]) > 0:
-                        uvs.append(int(w[1]))
-                    else:
-                        uvs.append(0)
-                    if len(w) >= 3 and len(w[2]) > 0:
-                        ns.append(int(w[2]))
-                    else:
-                        ns.append(0)
-                if len(vs) == 4:
-                    mode = GL_QUADS
-                faces.append((vs, uvs, ns))
-            elif values[0] == 'o':
-                name = values[1]
+                material = self.mtl_loader.get_material(rest.split()[0])
+            elif cmd == 'mtllib':
+                lib = os.path.join(os.path.dirname(filename), rest.split()[0])
+                self.mtl_loader.load_materials(lib)
+                if mtllibs is not None:
+                    mtllibs.append(lib)
+            elif cmd == 'o':
+                name = rest.split()[0]
 
         if faces and material:
             facegroups.append((faces, material, name))
 
-        meshes = []
+        vertices = parse_vectors(vertices, 3)
+        normals = parse_vectors(normals, 3)
+        texcoords = parse_vectors(texcoords, 2)
+        if swapyz:
+            vertices = vertices[:, [0, 2, 1]]
+            normals = normals[:, [0, 2, 1]]
 
+        meshes = []
         for faces, material, name in facegroups:
-            count = 0
-            outvs = []
-            outns = []
-            outuvs = []
-            indices = []
-
-            seen = {}
-
-            for face in faces:
-                vs, uvs, ns = face
-
-                for v, n, uv in zip(vs, ns, uvs):
-                    vdata = (v, n, uv)
-                    try:
-                        i = seen[vdata]
-                    except KeyError:
-                        i = count
-                        count += 1
-                        seen[vdata] = i
-                        outvs.extend(vertices[v - 1])
-                        if normals:
-                            outns.extend(normals[n - 1])
-                        if texcoords:
-                            outuvs.extend(texcoords[uv - 1])
-                    indices.append(i)
-
+            corners, quads = parse_corners(faces)
+            if quads:
+                mode = GL_QUADS
+
+            # Each distinct combination of vertex, normal and texture
+            # coordinate becomes a vertex of the mesh
+            first, indices = first_occurrences(corners)
+            v, uv, n = corners[first].T
             meshes.append(Mesh(
                 name=name,
                 mode=mode,
-                vertices=outvs,
-                normals=outns,
-                texcoords=outuvs,
+                vertices=vertices[v - 1].ravel(),
+                normals=normals[n - 1].ravel() if len(normals) else [],
+                texcoords=texcoords[uv - 1].ravel() if len(texcoords) else [],
                 indices=indices,
                 material=material,
             ))
 
+        # The mode is set for every mesh once all faces have been seen
+        for m in meshes:
+            m.mode = mode
+
         model = Model(name=filename, meshes=meshes)
         optimise_model(model)
         return model
@@ -200,6 +297,7 @@ class MtlFileLoader(object):
     def __init__(self):
         self.mtllibs = set()
         self.materials = {}
+        self.libraries = {}  # the names of the materials in each library
 
     def get_material(self, name):
         """Get a loaded material."""
@@ -240,9 +338,16 @@ class MtlFileLoader(object):
         """Load a material library as a dict."""
         if filename in self.mtllibs:
             return
-        self.mtllibs.add(filename)
 
+        materials = []
         for mtl in self._read_mtl(filename):
-            name = mtl['name']
             mtl['relpath'] = os.path.dirname(filename)
-            self.materials[name] = mtl
+            materials.append(mtl)
+        self.add_materials(filename, materials)
+
+    def add_materials(self, filename, materials):
+        """Add materials that were loaded from the library filename."""
+        self.mtllibs.add(filename)
+        self.libraries[filename] = [m['name'] for m in materials]
+        for mtl in materials:
+            self.materials[mtl['name']] = mtl
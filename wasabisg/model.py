@@ -8,7 +8,9 @@ A material is a dictionary of parameters, some of which may be textures.
 
 """
 
-from weakref import WeakValueDictionary
+import os.path
+from collections import OrderedDict
+import numpy
 import pyglet
 import pyglet.graphics
 import pyglet.image
@@ -38,12 +40,12 @@ class Mesh(object):
             ('v3f/static', self.vertices),
         ]
 
-        if self.normals:
+        if len(self.normals):
             assert len(self.normals) == 3 * l, \
                 "len(normals) != len(vertices)"
             data.append(('n3f/static', self.normals))
 
-        if self.texcoords:
+        if len(self.texcoords):
             assert len(self.texcoords) == 2 * l, \
                 "len(texcoords) != len(vertices)"
             data.append(('t2f/static', self.texcoords))
@@ -58,6 +60,25 @@ class Mesh(object):
 
         return self.list
 
+    def copy(self, material=None):
+        """Create a mesh that shares this mesh's geometry.
+
+        The copy uses material if given, or else a copy of this mesh's
+        material.
+
+        """
+        if material is None:
+            material = self.material.copy()
+        return Mesh(
+            mode=self.mode,
+            vertices=self.vertices,
+            normals=self.normals,
+            texcoords=self.texcoords,
+            indices=self.indices,
+            material=material,
+            name=self.name
+        )
+
     def __repr__(self):
         return '<Mesh %s>' % self.name
 
@@ -76,20 +97,38 @@ class Model(object):
 
         This allows eg. texture maps to be redefined.
         """
-        # Some parts of this are renderer-specific
-        m = Model()
-        m.name = self.name
+        materials = {}
+        meshes = []
+        for mesh in self.meshes:
+            mtlid = id(mesh.material)
+            try:
+                mtl = materials[mtlid]
+            except KeyError:
+                mtl = materials[mtlid] = mesh.material.copy()
+            meshes.append(mesh.copy(material=mtl))
+
+        m = Model(meshes=meshes, name=self.name)
         m.group = self.group
-        m.batch = self.batch
-        m.meshes = [
-            (name, l, mtl.copy())
-            for name, l, mtl in self.meshes
-        ]
         return m
 
+    def release_textures(self):
+        """Give up the references the model's materials hold to textures."""
+        materials = dict((id(m.material), m.material) for m in self.meshes)
+        for mtl in materials.values():
+            mtl.release_textures()
+
     def update(self, dt):
         pass
 
+    def bounding_radius(self):
+        """Get the distance of the furthest vertex from the model's origin."""
+        r = 0.0
+        for m in self.meshes:
+            if len(m.vertices):
+                vs = numpy.asarray(m.vertices, dtype=float).reshape(-1, 3)
+                r = max(r, float(numpy.sqrt((vs * vs).sum(axis=1)).max()))
+        return r
+
     def to_batch(self):
         # This is renderer-specific and belongs elsewhere
         return self.batch
@@ -165,21 +204,17 @@ class AnimatedModel(object):
         materials = {}
         fs = []
         for f in self.frames:
-            m = Model()
-            m.name = f.name
-            m.group = f.group
-            m.batch = f.batch
-            for name, l, material in f.meshes:
-                mtlid = material['name']
+            meshes = []
+            for mesh in f.meshes:
+                mtlid = mesh.material['name']
                 try:
                     mtl = materials[mtlid]
                 except KeyError:
-                    mtl = material.copy()
-                    materials[mtlid] = mtl
+                    mtl = materials[mtlid] = mesh.material.copy()
+                meshes.append(mesh.copy(material=mtl))
 
-                m.meshes.append(
-                    (name, l, mtl)
-                )
+            m = Model(meshes=meshes, name=f.name)
+            m.group = f.group
             m.materials = materials
             fs.append(m)
 
@@ -196,18 +231,125 @@ class AnimatedModel(object):
     def get_instance(self):
         return AnimatedModelInstance(self)
 
+    def release_textures(self):
+        """Give up the references the frames' materials hold to textures."""
+        for f in self.frames:
+            f.release_textures()
+
+
+def texture_bytes(texture):
+    """Estimate the video memory used by a mipmapped RGBA texture."""
+    return texture.width * texture.height * 4 * 4 // 3
+
 
 class TextureLoader(object):
-    def __init__(self):
-        self.cache = WeakValueDictionary()
+    """Load textures from image resources, sharing them between materials.
+
+    Each image file is loaded into a single GL texture, however many
+    materials use it. Textures are reference counted: load_texture() and
+    retain() take a reference, and release() gives one up. Textures with no
+    references stay cached, so they can be picked up again cheaply, until the
+    cache grows beyond budget bytes; the least recently released are then
+    dropped, which frees their GL textures.
+
+    """
+    def __init__(self, budget=64 * 1024 * 1024):
+        self.budget = budget
+        self.textures = {}
+        self.refs = {}
+        self.paths = {}  # the path of each texture, by id
+        self.unused = OrderedDict()  # least recently released first
+        self.resident = 0
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+    def resolve(self, name):
+        """Get the path of the image resource name."""
+        try:
+            location = pyglet.resource.location(name)
+        except pyglet.resource.ResourceNotFoundException:
+            return os.path.realpath(name)
+        path = getattr(location, 'path', None)
+        if path is None:
+            # Not on the filesystem, eg. in a zip file
+            return name
+        return os.path.realpath(os.path.join(path, name))
+
+    def load(self, name):
+        """Load the image resource name into a texture."""
+        image = pyglet.image.load(name, pyglet.resource.file(name))
+        return image.get_mipmapped_texture()
 
     def load_texture(self, name):
+        """Get a reference to the texture for the image resource name."""
+        path = self.resolve(name)
         try:
-            return self.cache[name]
+            texture = self.textures[path]
         except KeyError:
-            image = pyglet.image.load(name, pyglet.resource.file(name))
-            self.cache[name] = image
-            return image.get_mipmapped_texture()
+            texture = self.textures[path] = self.load(name)
+            self.paths[id(texture)] = path
+            self.refs[path] = 0
+            self.resident += texture_bytes(texture)
+            self.misses += 1
+        else:
+            self.hits += 1
+        self._retain(path)
+        self.evict()
+        return texture
+
+    def _retain(self, path):
+        self.refs[path] += 1
+        self.unused.pop(path, None)
+
+    def retain(self, texture):
+        """Take another reference to texture.
+
+        Textures that were not loaded by this loader are ignored.
+
+        """
+        path = self.paths.get(id(texture))
+        if path is not None:
+            self._retain(path)
+
+    def release(self, texture):
+        """Give up a reference to texture."""
+        path = self.paths.get(id(texture))
+        if path is None:
+            return
+        self.refs[path] -= 1
+        if self.refs[path] <= 0:
+            self.refs[path] = 0
+            self.unused[path] = True
+            self.evict()
+
+    def evict(self):
+        """Drop unreferenced textures until the cache is within budget."""
+        while self.resident > self.budget and self.unused:
+            path, _ = self.unused.popitem(last=False)
+            texture = self.textures.pop(path)
+            del self.paths[id(texture)]
+            del self.refs[path]
+            self.resident -= texture_bytes(texture)
+            self.evicted += 1
+
+    def set_budget(self, budget):
+        """Change the size of the cache in bytes."""
+        self.budget = budget
+        self.evict()
+
+    def stats(self):
+        """Get cache statistics, including resident texture memory."""
+        return {
+            'textures': len(self.textures),
+            'referenced': len(self.textures) - len(self.unused),
+            'unused': len(self.unused),
+            'resident_bytes': self.resident,
+            'budget': self.budget,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evicted': self.evicted,
+        }
 
 
 class Material(dict):
@@ -229,6 +371,8 @@ class Material(dict):
             return tex
 
     def __setitem__(self, key, value):
+        if key.startswith('tex_') and key in self:
+            self.loader.release(self[key])
         dict.__setitem__(self, key, value)
         if key.startswith('map_'):
             tk = 'tex_' + key
@@ -236,11 +380,24 @@ class Material(dict):
                 del(self[tk])
                 self.get_texture(key)
 
+    def __delitem__(self, key):
+        if key.startswith('tex_') and key in self:
+            self.loader.release(self[key])
+        dict.__delitem__(self, key)
+
     def copy(self):
         m = Material()
         m.update(self)
+        for k, v in self.iteritems():
+            if k.startswith('tex_'):
+                self.loader.retain(v)
         return m
 
+    def release_textures(self):
+        """Give up this material's references to its textures."""
+        for k in [k for k in self if k.startswith('tex_')]:
+            del self[k]
+
     def create_group(self, parent=None):
         # FIXME: this is renderer-specific and belongs in prepare_model
         from .shader import MaterialGroup
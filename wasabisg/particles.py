@@ -7,6 +7,7 @@ from lepton.renderer import BillboardRenderer
 from lepton.texturizer import SpriteTexturizer
 
 from .shader import Shader
+from .atlas import sprite_coords
 
 
 class ParticleSystemNode(object):
@@ -16,6 +17,7 @@ class ParticleSystemNode(object):
         self.system = ParticleSystem()
         self.group = group or ParticleDisplayGroup()
         self.textures = set()
+        self.unprepared = []
 
     def update(self, dt):
         self.system.update(dt)
@@ -24,13 +26,33 @@ class ParticleSystemNode(object):
         return True
 
     def create_group(self, controllers, texture):
+        """Create a particle group drawn with the given texture.
+
+        texture may also be a callable that returns a texture, in which case
+        it will not be called until the particles are first drawn. It may be
+        a region of a larger texture, such as an Atlas, so that groups can
+        share a texture.
+
+        """
         particlegroup = ParticleGroup(controllers=controllers, system=self.system)
-        texturizer = SpriteTexturizer(texture.id)
-        particlegroup.renderer = BillboardRenderer(texturizer)
-        self.textures.add(texture)  # hold a reference to this, otherwise it will get deleted
+        self.unprepared.append((particlegroup, texture))
         return particlegroup
 
+    def prepare(self):
+        """Create renderers for any groups that do not yet have them."""
+        for particlegroup, texture in self.unprepared:
+            if callable(texture):
+                texture = texture()
+            texturizer = SpriteTexturizer(
+                texture.id, coords=[sprite_coords(texture)]
+            )
+            particlegroup.renderer = BillboardRenderer(texturizer)
+            self.textures.add(texture)  # hold a reference to this, otherwise it will get deleted
+        del self.unprepared[:]
+
     def draw(self, camera):
+        if self.unprepared:
+            self.prepare()
         if self.group:
             self.group.set_state_recursive()
         self.system.draw()
@@ -1,54 +1,46 @@
 from pyglet.graphics import Batch
 from OpenGL.GL import *
 
-from .shader import Shader, MaterialGroup
-from .lighting import Light, Sunlight, BaseLight
+from .shader import Shader, MaterialGroup, gl_calls
+from .lighting import Light, Sunlight, BaseLight, select_lights
+from .timings import Timings
+from .instancing import Instancer, INSTANCE_MATRIX_LOCATION
+from .renderqueue import RenderQueue, back_to_front
 
 
 class Renderer(object):
     """Abstract class for rendering a scene."""
-    def render(self, scene, camera):
+    def render(self, scene, camera, objects=None):
         pass
 
 
 class RenderPass(object):
-    """Base class for a render pass."""
-    def __init__(self, transparency=False, group=None):
+    """Base class for a render pass.
+
+    A transparent pass draws its objects from back to front.
+
+    """
+    def __init__(self, transparency=False, group=None, name=None):
         self.transparency = transparency
         self.group = group
+        self.name = name or ('transparent' if transparency else 'opaque')
 
     def filter(self, node):
         return self.transparency == node.is_transparent()
 
     def render(self, camera, objects):
+        objects = [o for o in objects if self.filter(o)]
+        if self.transparency:
+            objects = back_to_front(camera, objects)
         if self.group:
             self.group.set_state_recursive()
         for o in objects:
-            if self.filter(o):
-                o.draw(camera)
+            o.draw(camera)
         if self.group:
             self.group.unset_state_recursive()
 
 
-lighting_shader = Shader(
-    vert="""
-
-varying vec3 normal;
-varying vec3 pos; // position of the fragment in screen space
-varying vec2 uv;
-
-//uniform mat4 inv_view;
-
-void main(void)
-{
-    vec4 a = gl_Vertex;
-    gl_Position = gl_ModelViewProjectionMatrix * a;
-    normal = (gl_NormalMatrix * gl_Normal).xyz;
-    pos = (gl_ModelViewMatrix * a).xyz;
-    uv = gl_MultiTexCoord0.st;
-}
-""",
-    frag="""
+LIGHTING_FRAG = """
 
 varying vec3 normal;
 varying vec3 pos;
@@ -125,19 +117,93 @@ void main (void) {
     gl_FragColor = vec4(colour.xyz, mapcolour.a * dissolve);
 }
 """
+
+
+def bind_lighting_materials(shader):
+    shader.bind_material_to_texture('map_Kd', 'diffuse_tex')
+    shader.bind_material_to_uniformf('Kd', 'diffuse_colour')
+    shader.bind_material_to_uniformf('Ks', 'specular')
+    shader.bind_material_to_uniformf('Ns', 'specular_exponent')
+    shader.bind_material_to_uniformf('d', 'dissolve')
+    shader.bind_material_to_uniformf('transmit', 'transmit')
+    shader.bind_material_to_uniformi('illum', 'illum')
+
+
+lighting_shader = Shader(
+    vert="""
+
+varying vec3 normal;
+varying vec3 pos; // position of the fragment in screen space
+varying vec2 uv;
+
+//uniform mat4 inv_view;
+
+void main(void)
+{
+    vec4 a = gl_Vertex;
+    gl_Position = gl_ModelViewProjectionMatrix * a;
+    normal = (gl_NormalMatrix * gl_Normal).xyz;
+    pos = (gl_ModelViewMatrix * a).xyz;
+    uv = gl_MultiTexCoord0.st;
+}
+""",
+    frag=LIGHTING_FRAG
 )
-lighting_shader.bind_material_to_texture('map_Kd', 'diffuse_tex')
-lighting_shader.bind_material_to_uniformf('Kd', 'diffuse_colour')
-lighting_shader.bind_material_to_uniformf('Ks', 'specular')
-lighting_shader.bind_material_to_uniformf('Ns', 'specular_exponent')
-lighting_shader.bind_material_to_uniformf('d', 'dissolve')
-lighting_shader.bind_material_to_uniformf('transmit', 'transmit')
-lighting_shader.bind_material_to_uniformi('illum', 'illum')
+bind_lighting_materials(lighting_shader)
+
+
+# The same lighting, for models drawn by an Instancer
+instanced_lighting_shader = Shader(
+    vert="""
+
+attribute mat4 instance_matrix;
+
+varying vec3 normal;
+varying vec3 pos; // position of the fragment in screen space
+varying vec2 uv;
+
+void main(void)
+{
+    vec4 a = instance_matrix * gl_Vertex;
+    gl_Position = gl_ModelViewProjectionMatrix * a;
+    normal = gl_NormalMatrix * (instance_matrix * vec4(gl_Normal, 0.0)).xyz;
+    pos = (gl_ModelViewMatrix * a).xyz;
+    uv = gl_MultiTexCoord0.st;
+}
+""",
+    frag=LIGHTING_FRAG,
+    attributes={'instance_matrix': INSTANCE_MATRIX_LOCATION},
+    name='instanced'
+)
+bind_lighting_materials(instanced_lighting_shader)
 
 
 class LightingPass(object):
-    def __init__(self, ambient=(0, 0, 0, 1)):
+    """Light opaque objects.
+
+    Each object is drawn once, with up to lighting.MAX_LIGHTS (8) of the
+    lights that reach it (see select_lights()). Objects are drawn through a
+    RenderQueue, sorted by shader, lights and material; the state changes
+    made in the last frame are counted in queue.changes.
+
+    Lights beyond the limit are silently dropped for that object: the
+    sunlights are kept, then the point lights that are brightest at the
+    object. So when many lights reach an object, eg. the muzzle flashes of
+    a broadside, the dimmer ones do not light it.
+
+    If instancing is True and the GL supports it, nodes that share a model
+    are drawn together with hardware instancing.
+
+    """
+    name = 'lighting'
+
+    def __init__(self, ambient=(0, 0, 0, 1), instancing=True):
         self.ambient = ambient
+        self.instancer = Instancer() if instancing else None
+        self.lights = []
+        self.light_uniforms = {}
+        self.light_groups = 0  # the number of sets of lights last frame
+        self.queue = RenderQueue()
         self.currentviewport = None
         self.fbo = None
         self.lightbuf = self.depthbuf = None
@@ -195,18 +261,70 @@ class LightingPass(object):
                 shader_objects.append(o)
             else:
                 standard_objects.append(o)
-        self.render_objects(camera, lights, standard_objects, shader=lighting_shader)
+
+        self.set_lights(camera, lights)
+        groups = select_lights(lights, standard_objects)
+        self.light_groups = len(groups)
+
+        queue = self.queue
+        queue.clear()
+        instancer = self.instancer
+        if instancer and instancer.available():
+            instancer.clear()
+            for ls, objs in groups:
+                ls = tuple(ls)
+                batches, others = instancer.collect(objs)
+                for b in batches:
+                    queue.add(b, instanced_lighting_shader, ls)
+                for o in others:
+                    queue.add(o, lighting_shader, ls)
+            if instancer.count:
+                instancer.upload()
+        else:
+            for ls, objs in groups:
+                ls = tuple(ls)
+                for o in objs:
+                    queue.add(o, lighting_shader, ls)
 
         for o in shader_objects:
-            self.render_objects(camera, lights, [o], shader=o.shader)
+            for ls, objs in select_lights(lights, [o]):
+                queue.add(o, o.shader, tuple(ls))
+
+        self.render_queue(camera)
 
         glPopAttrib()
 
         glEnable(GL_DEPTH_TEST)
         glDepthFunc(GL_LEQUAL)
 
-    def render_objects(self, camera, lights, objects, shader=lighting_shader):
-        lights = lights[:]
+    def set_lights(self, camera, lights):
+        """Compute the uniform values for each light, for this frame."""
+        view_matrix = camera.get_view_matrix()
+        self.lights = lights
+        self.light_uniforms = uniforms = {}
+        for l in lights:
+            x, y, z = view_matrix * l._pos
+            uniforms[l] = (l.colour, (x, y, z, l.w), l.intensity, l.falloff)
+
+    def begin_shader(self, shader):
+        shader.bind()
+        shader.uniformf('ambient', *self.ambient)
+
+    def apply_lights(self, shader, lights):
+        """Upload the uniforms for lights to shader."""
+        if lights:
+            uniforms = self.light_uniforms
+            colours, positions, intensities, falloffs = zip(
+                *[uniforms[l] for l in lights]
+            )
+            shader.uniform4fv('colours', colours)
+            shader.uniform4fv('positions', positions)
+            shader.uniform1fv('intensities', intensities)
+            shader.uniform1fv('falloffs', falloffs)
+        shader.uniformi('num_lights', len(lights))
+
+    def render_queue(self, camera):
+        """Draw the queued objects in a single pass, each with its lights."""
         glEnable(GL_DEPTH_TEST)
         glDepthFunc(GL_LEQUAL)
         glBlendFunc(GL_SRC_ALPHA, GL_ZERO)
@@ -216,49 +334,17 @@ class LightingPass(object):
         glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_NEAREST)
         glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_NEAREST)
 
-        # First pass writes depth, so write it with an offset
+        # Write depth with an offset
         glEnable(GL_POLYGON_OFFSET_FILL)
         glPolygonOffset(0.01, 1)
         glDepthMask(GL_TRUE)
 
         #glBindFramebuffer(GL_FRAMEBUFFER, fbo)
-        if not lights:
+        if not self.lights or not self.queue:
+            self.queue.changes.reset()
             return
 
-        shader.bind()
-        shader.uniformf('ambient', *self.ambient)
-        view_matrix = camera.get_view_matrix()
-
-        while lights:
-            ls = lights[:8]
-            lights = lights[8:]
-
-            light_pos = []
-            for l in ls:
-                x, y, z = view_matrix * l._pos
-                light_pos.append((x, y, z, l.w))
-
-            shader.uniform4fv('colours', [l.colour for l in ls])
-            shader.uniform4fv('positions', light_pos)
-            shader.uniform1fv(
-                'intensities', [l.intensity for l in ls])
-            shader.uniform1fv(
-                'falloffs', [l.falloff for l in ls])
-            shader.uniformi('num_lights', len(ls))
-            for o in objects:
-                o.draw(camera)
-
-            if not lights:
-                break
-
-            # Subsequent passes are drawn without writing to the z-buffer
-            glDisable(GL_POLYGON_OFFSET_FILL)
-            glDepthMask(GL_FALSE)
-            glBlendFunc(GL_SRC_ALPHA, GL_ONE)
-            shader.uniformf('ambient', 0, 0, 0, 0)
-
-        shader.unbind()
-        glDepthMask(GL_TRUE)
+        self.queue.submit(camera, self.begin_shader, self.apply_lights)
         glBindFramebuffer(GL_FRAMEBUFFER, 0)
         glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
 
@@ -318,6 +404,8 @@ composite_shader.bind_material_to_texture('map_Kd', 'diffuse')
 
 
 class CompositePass(object):
+    name = 'composite'
+
     def __init__(self, lightingpass):
         self.lightingpass = lightingpass
 
@@ -341,8 +429,28 @@ class CompositePass(object):
 
 
 class LightingAccumulationRenderer(object):
-    def __init__(self):
-        self.lighting = LightingPass()
+    """Render lit objects, then transparent objects.
+
+    The time taken by each pass is recorded to timings, as sections named
+    'render.<pass name>'.
+
+    Pass instancing=False to draw every node individually, even if the GL
+    supports instanced drawing.
+
+    If an Atlas is given, the diffuse textures of meshes are packed into it
+    where possible as models are prepared, so that they can share a texture.
+
+    After each frame, gl_calls holds the number of GL calls issued by
+    shaders during the frame, and the number skipped as redundant;
+    lighting.queue.changes counts the changes of shader, lights, material
+    and texture made by the lighting pass.
+
+    """
+    def __init__(self, timings=None, instancing=True, atlas=None):
+        self.timings = timings or Timings()
+        self.atlas = atlas
+        self.gl_calls = gl_calls
+        self.lighting = LightingPass(instancing=instancing)
 #        self.composite = CompositePass(self.lighting)
         self.passes = [
             self.lighting,
@@ -364,14 +472,20 @@ class LightingAccumulationRenderer(object):
         return model
 
     def prepare_mesh(self, mesh, batch):
+        if self.atlas is not None:
+            self.atlas.pack_mesh(mesh)
         mat = mesh.material
         mat.load_textures()
 
-        l = mesh.to_list(batch, group=MaterialGroup(mat))
-        mesh.list = l
+        mesh.group = MaterialGroup(mat)
+        mesh.list = mesh.to_list(batch, group=mesh.group)
 
-    def render(self, scene, camera):
+    def render(self, scene, camera, objects=None):
+        """Render objects - by default, all the objects in scene."""
+        if objects is None:
+            objects = scene.objects
         self.lighting.ambient = scene.ambient
+        gl_calls.reset()
 
         flags = GL_ALL_ATTRIB_BITS
         glPushAttrib(flags)
@@ -382,6 +496,9 @@ class LightingAccumulationRenderer(object):
         glEnable(GL_BLEND)
         glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
         camera.set_matrix()
-        for p in self.passes:
-            p.render(camera, scene.objects)
+        section = self.timings.section
+        with section('render'):
+            for p in self.passes:
+                with section('render.' + p.name):
+                    p.render(camera, objects)
         glPopAttrib()
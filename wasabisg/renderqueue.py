@@ -0,0 +1,201 @@
+"""Sort what is drawn to minimise changes of GL state.
+
+Rather than drawing each node in turn, the lighting pass adds nodes to a
+RenderQueue. Plain ModelNodes and GroupNodes are broken down into one draw
+item per mesh; other nodes are kept whole. The items are then sorted by
+shader, lights, texture and material, so that every change of state is made
+once for all the items that share it.
+
+"""
+from OpenGL.GL import glPushMatrix, glPopMatrix, glTranslatef, glRotatef
+
+from .model import Model
+
+
+class StateChanges(object):
+    """Count the state changes made while submitting a queue."""
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.shaders = 0
+        self.lights = 0
+        self.materials = 0
+        self.textures = 0
+        self.draws = 0
+
+    def as_dict(self):
+        return {
+            'shaders': self.shaders,
+            'lights': self.lights,
+            'materials': self.materials,
+            'textures': self.textures,
+            'draws': self.draws,
+        }
+
+    def __repr__(self):
+        return '<StateChanges %s>' % ' '.join(
+            '%s=%d' % kv for kv in sorted(self.as_dict().items())
+        )
+
+
+def texture_id(group):
+    """Get the id of the diffuse texture of a MaterialGroup, or 0."""
+    tex = group.material.get('tex_map_Kd')
+    return tex.id if tex is not None else 0
+
+
+class RenderQueue(object):
+    """Draw items sorted by the GL state they need.
+
+    Each item is held as a tuple of its sort key - the order in which its
+    shader, lights and material were first seen, and its texture - followed
+    by a sequence number, so that items that need the same state keep the
+    order they were added in.
+
+    """
+    def __init__(self):
+        from .scenegraph import ModelNode, GroupNode
+        self.ModelNode = ModelNode
+        self.GroupNode = GroupNode
+        self.items = []
+        self.shaders = {}
+        self.lights = {}
+        self.materials = {}
+        self.changes = StateChanges()
+
+    def __len__(self):
+        return len(self.items)
+
+    def clear(self):
+        del self.items[:]
+        self.shaders.clear()
+        self.lights.clear()
+        self.materials.clear()
+
+    def _order(self, orders, k):
+        try:
+            return orders[k]
+        except KeyError:
+            n = orders[k] = len(orders)
+            return n
+
+    def static(self, node):
+        """Return True if node can be broken down into meshes."""
+        if node.group is not None:
+            return False
+        cls = type(node)
+        if cls is self.ModelNode:
+            model = node.model_instance
+            return (
+                isinstance(model, Model) and
+                all(hasattr(m, 'group') for m in model.meshes)
+            )
+        elif cls is self.GroupNode:
+            return all(self.static(n) for n in node.nodes)
+        return False
+
+    def add(self, node, shader, lights=()):
+        """Add node, to be drawn with shader and the given lights."""
+        s = self._order(self.shaders, shader)
+        l = self._order(self.lights, lights)
+        if self.static(node):
+            self._add_meshes(node, (), s, l, shader, lights)
+        else:
+            self.items.append(
+                (s, l, -1, -1, len(self.items), shader, lights, node, None, None)
+            )
+
+    def _add_meshes(self, node, transforms, s, l, shader, lights):
+        transforms += ((node.pos, node.rotation),)
+        if type(node) is self.GroupNode:
+            for n in node.nodes:
+                self._add_meshes(n, transforms, s, l, shader, lights)
+            return
+        items = self.items
+        for mesh in node.model_instance.meshes:
+            group = mesh.group
+            m = self._order(self.materials, group)
+            items.append((
+                s, l, texture_id(group), m, len(items),
+                shader, lights, None, mesh, transforms
+            ))
+
+    def submit(self, camera, begin_shader, set_lights):
+        """Draw every item in order.
+
+        begin_shader(shader) is called to bind each shader, and
+        set_lights(shader, lights) to apply each set of lights.
+
+        """
+        changes = self.changes
+        changes.reset()
+        shader = group = texture = None
+        current_s = current_l = -1
+        for item in sorted(self.items):
+            s, ls, node, mesh, transforms = item[5:]
+            if item[0] != current_s:
+                if group:
+                    group.unset_state_recursive()
+                    group = texture = None
+                begin_shader(s)
+                shader = s
+                current_s = item[0]
+                current_l = -1
+                changes.shaders += 1
+            if item[1] != current_l:
+                set_lights(s, ls)
+                current_l = item[1]
+                changes.lights += 1
+
+            if mesh is None:
+                if group:
+                    group.unset_state_recursive()
+                    group = texture = None
+                node.draw(camera)
+            else:
+                g = mesh.group
+                if g is not group:
+                    if group:
+                        group.unset_state_recursive()
+                    g.set_state_recursive()
+                    group = g
+                    changes.materials += 1
+                    t = item[2]
+                    if t != texture:
+                        texture = t
+                        changes.textures += 1
+                glPushMatrix()
+                for pos, rotation in transforms:
+                    glTranslatef(*pos)
+                    glRotatef(*rotation)
+                mesh.list.draw(mesh.mode)
+                glPopMatrix()
+            changes.draws += 1
+
+        if group:
+            group.unset_state_recursive()
+        if shader:
+            shader.unbind()
+
+
+def back_to_front(camera, objects):
+    """Sort objects by decreasing distance along the camera's view.
+
+    Objects without a position come first, in their original order.
+
+    """
+    x, y, z = camera.pos
+    fx, fy, fz = camera.eye_vector()
+    unplaced = []
+    placed = []
+    for i, o in enumerate(objects):
+        try:
+            px, py, pz = o.pos
+        except AttributeError:
+            unplaced.append(o)
+        else:
+            depth = (px - x) * fx + (py - y) * fy + (pz - z) * fz
+            placed.append((-depth, i, o))
+    placed.sort()
+    return unplaced + [o for _, _, o in placed]
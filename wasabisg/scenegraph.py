@@ -1,4 +1,7 @@
 import itertools
+from math import sqrt, tan, radians
+
+import numpy
 import pyglet
 
 from pyglet.graphics import Group
@@ -70,6 +73,14 @@ class ModelNode(object):
     def is_transparent(self):
         return self.transparent
 
+    def bounding_radius(self):
+        """Get the radius of a sphere about pos that contains the model.
+
+        Return None if the model's extent is not known.
+
+        """
+        return getattr(self.model_instance, 'radius', None)
+
     def draw_with_group(self, camera):
         self.group.set_state_recursive()
         self.draw_inner(camera)
@@ -106,6 +117,24 @@ class GroupNode(object):
     def is_transparent(self):
         return False
 
+    def bounding_radius(self):
+        """Get the radius of a sphere about pos that contains all the nodes.
+
+        Return None if the extent of any node is not known.
+
+        """
+        r = 0.0
+        for n in self.nodes:
+            try:
+                nr = n.bounding_radius()
+            except AttributeError:
+                return None
+            if nr is None:
+                return None
+            x, y, z = n.pos
+            r = max(r, sqrt(x * x + y * y + z * z) + nr)
+        return r
+
     def draw_with_group(self, camera):
         self.group.set_state_recursive()
         self.draw_inner(camera)
@@ -173,19 +202,28 @@ class Scene(object):
     def __init__(
             self,
             ambient=(0, 0, 0, 1.0),
-            renderer=LightingAccumulationRenderer):
+            renderer=LightingAccumulationRenderer,
+            culling=True):
 
         self.ambient = ambient
         self.objects = []
         self.models = {}
 
+        # Skip objects outside the camera's view when rendering
+        self.culling = culling
+        self.drawn = 0
+        self.culled = 0
+
         if callable(renderer):
             self.renderer = renderer()
         else:
             self.renderer = renderer
 
     def prepare_model(self, model):
-        return self.renderer.prepare_model(model)
+        model = self.renderer.prepare_model(model)
+        if isinstance(model, Model) and not hasattr(model, 'radius'):
+            model.radius = model.bounding_radius()
+        return model
 
     def prepare_modelnode(self, c):
         c.model_instance = self.prepare_model(c.model_instance)
@@ -208,6 +246,22 @@ class Scene(object):
         directly is supported as a convenience.
 
         """
+        obj = self.prepare_node(obj)
+        if obj in self.objects:
+            return
+        self.objects.append(obj)
+
+    def add_all(self, objs):
+        """Add several objects to the scene at once."""
+        present = set(id(o) for o in self.objects)
+        for obj in objs:
+            obj = self.prepare_node(obj)
+            if id(obj) not in present:
+                present.add(id(obj))
+                self.objects.append(obj)
+
+    def prepare_node(self, obj):
+        """Prepare obj for rendering, and return the node to add to the scene."""
         if isinstance(obj, Mesh):
             model = Model(meshes=[obj])
             model = self.prepare_model(model)
@@ -219,9 +273,7 @@ class Scene(object):
             obj.model_instance = self.prepare_model(obj.model_instance)
         elif isinstance(obj, GroupNode):
             self.prepare_group(obj)
-        if obj in self.objects:
-            return
-        self.objects.append(obj)
+        return obj
 
     def remove(self, obj):
         """Remove obj from the scene."""
@@ -230,14 +282,67 @@ class Scene(object):
         except ValueError:
             pass
 
+    def remove_all(self, objs):
+        """Remove several objects from the scene at once."""
+        removed = set(id(o) for o in objs)
+        self.objects[:] = [o for o in self.objects if id(o) not in removed]
+
     def update(self, dt):
         """Update all objects in the scene with the given time step."""
         for o in self.objects:
             o.update(dt)
 
+    def cull(self, camera):
+        """Get the objects that may be visible to camera.
+
+        Objects are culled if their bounding sphere lies outside the camera's
+        view frustum. Objects whose extent is not known - including lights,
+        which may light objects that are in view - are never culled.
+
+        The number of objects drawn and culled are recorded as self.drawn and
+        self.culled.
+
+        """
+        bounded = []
+        centres = []
+        radii = []
+        for i, o in enumerate(self.objects):
+            try:
+                r = o.bounding_radius()
+            except AttributeError:
+                continue
+            if r is not None:
+                bounded.append(i)
+                centres.append(tuple(o.pos))
+                radii.append(r)
+
+        if not bounded:
+            self.drawn = len(self.objects)
+            self.culled = 0
+            return self.objects
+
+        planes = camera.frustum_planes()
+        centres = numpy.array(centres, dtype=float)
+        dist = centres.dot(planes[:, :3].T) + planes[:, 3]
+        radii = numpy.array(radii)
+        outside = (dist < -radii[:, numpy.newaxis]).any(axis=1)
+        hidden = set(numpy.array(bounded)[outside].tolist())
+
+        self.culled = len(hidden)
+        self.drawn = len(self.objects) - self.culled
+        if not hidden:
+            return self.objects
+        return [o for i, o in enumerate(self.objects) if i not in hidden]
+
     def render(self, camera):
         """Render the scene with the given camera."""
-        self.renderer.render(self, camera)
+        if self.culling:
+            objects = self.cull(camera)
+        else:
+            objects = self.objects
+            self.drawn = len(objects)
+            self.culled = 0
+        self.renderer.render(self, camera, objects)
 
 
 class Camera(object):
@@ -270,6 +375,44 @@ class Camera(object):
         """Get the direction in which the camera is looking."""
         return self.look_at - self.pos
 
+    def basis(self):
+        """Get the forward, right and up unit vectors of the camera."""
+        f = (v3(self.look_at) - v3(self.pos)).normalized()
+        s = f.cross(Vector3(0, 1, 0)).normalize()
+        u = s.cross(f)
+        return f, s, u
+
+    def frustum_planes(self):
+        """Get the planes bounding the camera's view, as a (6, 4) array.
+
+        Each plane is given as (a, b, c, d), such that a point (x, y, z) is
+        on the inside of the plane when ax + by + cz + d >= 0.
+
+        """
+        f, s, u = self.basis()
+        f = numpy.array(tuple(f))
+        s = numpy.array(tuple(s))
+        u = numpy.array(tuple(u))
+        pos = numpy.array(tuple(self.pos), dtype=float)
+
+        tan_v = tan(radians(self.fov * 0.5))
+        tan_h = tan_v * self.aspect
+        sides = numpy.array([
+            f * tan_h + s,  # left
+            f * tan_h - s,  # right
+            f * tan_v + u,  # bottom
+            f * tan_v - u,  # top
+        ])
+        sides /= numpy.sqrt((sides * sides).sum(axis=1))[:, numpy.newaxis]
+        normals = numpy.vstack([sides, f, -f])
+        points = numpy.array([
+            pos, pos, pos, pos,
+            pos + f * self.near,
+            pos + f * self.far
+        ])
+        d = -(normals * points).sum(axis=1)
+        return numpy.column_stack([normals, d])
+
     def set_projection_matrix(self):
         glMatrixMode(GL_PROJECTION)
         glLoadIdentity()
@@ -350,3 +493,24 @@ class OrthographicCamera(Camera):
         glMatrixMode(GL_PROJECTION)
         glLoadIdentity()
         glOrtho(*self.bounds())
+
+    def frustum_planes(self):
+        """Get the planes bounding the camera's view, as a (6, 4) array."""
+        f, s, u = self.basis()
+        f = numpy.array(tuple(f))
+        s = numpy.array(tuple(s))
+        u = numpy.array(tuple(u))
+        pos = numpy.array(tuple(self.pos), dtype=float)
+
+        l, r, b, t, near, far = self.bounds()
+        normals = numpy.array([s, -s, u, -u, f, -f])
+        points = numpy.array([
+            pos + s * l,
+            pos + s * r,
+            pos + u * b,
+            pos + u * t,
+            pos + f * near,
+            pos + f * far
+        ])
+        d = -(normals * points).sum(axis=1)
+        return numpy.column_stack([normals, d])
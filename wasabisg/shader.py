@@ -27,6 +27,26 @@ class ShaderError(Exception):
     """The shader could not be compiled."""
 
 
+class CallCounter(object):
+    """Count the GL calls issued by shaders, and those skipped as redundant.
+
+    Renderers reset the counter at the start of each frame.
+
+    """
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.calls = 0
+        self.skipped = 0
+
+    def __repr__(self):
+        return '<CallCounter calls=%d skipped=%d>' % (self.calls, self.skipped)
+
+
+gl_calls = CallCounter()
+
+
 def flatten(a):
     return list(chain(*a))
 
@@ -41,31 +61,58 @@ def get_white_texture():
 
 
 class Shader(object):
-    # vert, frag and geom take arrays of source strings
-    # the arrays will be concattenated into one string by OpenGL
-    def __init__(self, vert='', frag='', geom='', reserved_textures=0, name=''):
+    """A GLSL program.
+
+    The program is compiled the first time it is needed rather than when it
+    is constructed, so that shaders can be defined at import time without a
+    GL context.
+
+    """
+    def __init__(self, vert='', frag='', geom='', reserved_textures=0, name='',
+            attributes=None):
         self.uniform_bindings = {}
         self.texture_bindings = {}
         self.locations = {}
         self.name = name
+        self.vert = vert
+        self.frag = frag
+        self.geom = geom
 
         # Number of texture units not used for material maps
         self.reserved_textures = reserved_textures
 
+        # Fixed locations for vertex attributes, by name
+        self.attributes = attributes or {}
+
+        # The last values uploaded to each uniform location, and buffers for
+        # uploading arrays
+        self.values = {}
+        self.buffers = {}
+
+        # we are not compiled or linked yet
+        self.handle = None
+        self.linked = False
+
+    def compile(self):
+        """Compile and link the program, if this has not been done already."""
+        if self.handle is not None:
+            return
+
         # create the program handle
         self.handle = glCreateProgram()
-        # we are not linked yet
-        self.linked = False
 
         # create the vertex shader
-        self.createShader([vert], GL_VERTEX_SHADER)
+        self.createShader([self.vert], GL_VERTEX_SHADER)
 
         # create the fragment shader
-        self.createShader([frag], GL_FRAGMENT_SHADER)
+        self.createShader([self.frag], GL_FRAGMENT_SHADER)
 
         # the geometry shader will be the same, once pyglet supports the extension
-        if geom:
-            self.createShader([geom], GL_GEOMETRY_SHADER)
+        if self.geom:
+            self.createShader([self.geom], GL_GEOMETRY_SHADER)
+
+        for name, loc in self.attributes.iteritems():
+            glBindAttribLocation(self.handle, loc, name)
 
         # attempt to link the program
         self.link()
@@ -137,7 +184,12 @@ class Shader(object):
     def bind(self):
         # bind the program
         global activeshader
+        if activeshader is self:
+            gl_calls.skipped += 1
+            return
+        self.compile()
         glUseProgram(self.handle)
+        gl_calls.calls += 1
         activeshader = self
 
     def unbind(self):
@@ -145,6 +197,7 @@ class Shader(object):
         # program, so this should probably be a class method instead
         global activeshader
         glUseProgram(0)
+        gl_calls.calls += 1
         activeshader = None
 
     UNIFORMFS = [
@@ -161,25 +214,65 @@ class Shader(object):
         glUniform3i,
         glUniform4i
     ]
+    UNIFORMFVS = [
+        None,
+        glUniform1fv,
+        glUniform2fv,
+        glUniform3fv,
+        glUniform4fv
+    ]
 
     def getUniformLocation(self, name):
         if name in self.locations:
             return self.locations[name]
+        self.compile()
         loc = self.locations[name] = glGetUniformLocation(self.handle, name)
         return loc
 
+    def upload(self, f, loc, vals):
+        """Call f(loc, *vals), unless vals are already set at loc.
+
+        Uniforms keep their values while other programs are in use, so a
+        value only needs uploading when it changes.
+
+        """
+        if loc == -1 or self.values.get(loc) == vals:
+            gl_calls.skipped += 1
+            return
+        self.values[loc] = vals
+        f(loc, *vals)
+        gl_calls.calls += 1
+
+    def upload_array(self, name, values, size):
+        """Upload an array of float uniforms, each of size components."""
+        loc = self.getUniformLocation(name)
+        if size == 1:
+            flat = tuple(values)
+        else:
+            flat = tuple(chain.from_iterable(values))
+        if loc == -1 or self.values.get(loc) == flat:
+            gl_calls.skipped += 1
+            return
+        self.values[loc] = flat
+
+        # Reuse a buffer for the array, growing it if needed
+        l = len(flat)
+        buf = self.buffers.get(loc)
+        if buf is None or len(buf) < l:
+            buf = self.buffers[loc] = (c_float * l)()
+        buf[:l] = flat
+        self.UNIFORMFVS[size](loc, l // size, buf)
+        gl_calls.calls += 1
+
     def uniformf(self, name, *vals):
         """Upload a floating point uniform
 
         This program must be currently bound.
         """
         assert len(vals) in range(1, 5)
-        f = self.UNIFORMFS[len(vals)]
-        if name not in self.locations:
-            self.locations[name] = loc = glGetUniformLocation(self.handle, name)
-        else:
-            loc = self.locations[name]
-        f(loc, *vals)
+        self.upload(
+            self.UNIFORMFS[len(vals)], self.getUniformLocation(name), vals
+        )
 
     def uniformi(self, name, *vals):
         """Upload an integer uniform
@@ -187,59 +280,36 @@ class Shader(object):
         This program must be currently bound.
         """
         assert len(vals) in range(1, 5)
-        f = self.UNIFORMIS[len(vals)]
-        if name not in self.locations:
-            self.locations[name] = loc = glGetUniformLocation(self.handle, name)
-        else:
-            loc = self.locations[name]
-        f(loc, *vals)
+        self.upload(
+            self.UNIFORMIS[len(vals)], self.getUniformLocation(name), vals
+        )
 
     # upload a uniform matrix
     # works with matrices stored as lists,
     # as well as euclid matrices
     def uniform_matrixf(self, name, mat):
         # obtian the uniform location
-        loc = selg.getUniformLocation(name)
+        loc = self.getUniformLocation(name)
         # uplaod the 4x4 floating point matrix
         glUniformMatrix4fv(loc, 1, False, (c_float * 16)(*mat))
+        self.values.pop(loc, None)
+        gl_calls.calls += 1
 
     def uniform1fv(self, name, values):
         """Pass an array of values"""
-        if name not in self.locations:
-            self.locations[name] = loc = glGetUniformLocation(self.handle, name)
-        else:
-            loc = self.locations[name]
-        l = len(values)
-        arr = (c_float * l)(*values)
-        glUniform1fv(loc, l, arr)
+        self.upload_array(name, values, 1)
 
     def uniform2fv(self, name, values):
         """Pass an array of values"""
-        if name not in self.locations:
-            self.locations[name] = loc = glGetUniformLocation(self.handle, name)
-        else:
-            loc = self.locations[name]
-        arr = (c_float * (len(values) * 2))(*(f for v in values for f in v))
-        glUniform2fv(loc, len(values), arr)
+        self.upload_array(name, values, 2)
 
     def uniform3fv(self, name, values):
         """Pass an array of values"""
-        if name not in self.locations:
-            self.locations[name] = loc = glGetUniformLocation(self.handle, name)
-        else:
-            loc = self.locations[name]
-        arr = (c_float * (len(values) * 3))(*(f for v in values for f in v))
-        glUniform3fv(loc, len(values), arr)
+        self.upload_array(name, values, 3)
 
     def uniform4fv(self, name, values):
         """Pass an array of values"""
-        if name not in self.locations:
-            self.locations[name] = loc = glGetUniformLocation(self.handle, name)
-        else:
-            loc = self.locations[name]
-        l = len(values)
-        arr = (c_float * (l * 4))(*(f for v in values for f in v))
-        glUniform4fv(loc, l, arr)
+        self.upload_array(name, values, 4)
 
     def set_material(self, material):
         """Read uniform properties from the given material."""
@@ -273,6 +343,7 @@ class Shader(object):
         """Bind a texture id to the uniform 'uniform', using texture unit unit"""
         glActiveTexture(GL_TEXTURE0 + unit)
         glBindTexture(GL_TEXTURE_2D, id)
+        gl_calls.calls += 2
         self.uniformi(uniform, unit)
 
     def unset_material(self, material):
@@ -285,15 +356,12 @@ class Shader(object):
 
     def bind_material_to_uniformf(self, matprop, uniform):
         self.uniform_bindings[matprop] = (uniform, float)
-        self.getUniformLocation(uniform)
 
     def bind_material_to_uniformi(self, matprop, uniform):
         self.uniform_bindings[matprop] = (uniform, int)
-        self.getUniformLocation(uniform)
 
     def bind_material_to_texture(self, matprop, uniform):
         self.texture_bindings[matprop] = uniform
-        self.getUniformLocation(uniform)
 
 
 class ShaderGroup(Group):
@@ -0,0 +1,130 @@
+"""Lightweight, always-on timing of named sections of each frame.
+
+Usage::
+
+    timings = Timings()
+
+    with timings.section('physics'):
+        do_physics()
+
+    timings.stats('physics')  # => {'p50': ..., 'p90': ..., ...}
+
+Only the most recent samples of each section are kept, so that percentiles
+describe current performance. Recording a sample costs two timer calls and
+a deque append; percentiles are only computed when statistics are read.
+
+Times measured around rendering are the CPU time taken to submit GL
+commands, not the time taken by the GPU to execute them.
+
+"""
+from collections import deque
+from timeit import default_timer
+
+
+class Section(object):
+    """A context manager that records its duration to a Timings object."""
+    __slots__ = ('name', 'samples', 'timings', 'start')
+
+    def __init__(self, timings, name):
+        self.timings = timings
+        self.name = name
+        self.samples = deque(maxlen=timings.samples)
+        self.start = None
+
+    def __enter__(self):
+        self.start = default_timer()
+
+    def __exit__(self, *exc_info):
+        dt = default_timer() - self.start
+        self.samples.append(dt)
+        self.timings.totals[self.name] += dt
+        self.timings.counts[self.name] += 1
+
+
+def percentile(sorted_samples, p):
+    """Return the p'th percentile of sorted_samples, by nearest rank."""
+    n = len(sorted_samples)
+    i = int(round(p / 100.0 * (n - 1)))
+    return sorted_samples[i]
+
+
+class Timings(object):
+    """Rolling statistics of the time taken by named sections.
+
+    :param samples: The number of recent samples to keep for each section.
+
+    """
+    PERCENTILES = (50, 90, 99)
+
+    def __init__(self, samples=300):
+        self.samples = samples
+        self.sections = {}
+        self.totals = {}
+        self.counts = {}
+
+    def section(self, name):
+        """Return a context manager that times a section called name."""
+        try:
+            return self.sections[name]
+        except KeyError:
+            s = self.sections[name] = Section(self, name)
+            self.totals[name] = 0.0
+            self.counts[name] = 0
+            return s
+
+    def record(self, name, seconds):
+        """Record a sample for the section name that was timed elsewhere."""
+        s = self.section(name)
+        s.samples.append(seconds)
+        self.totals[name] += seconds
+        self.counts[name] += 1
+
+    def reset(self):
+        """Discard all samples and totals."""
+        for name, s in self.sections.items():
+            s.samples.clear()
+            self.totals[name] = 0.0
+            self.counts[name] = 0
+
+    def names(self):
+        return sorted(self.sections)
+
+    def total(self, name):
+        """Get the total time spent in name since the last reset."""
+        return self.totals.get(name, 0.0)
+
+    def stats(self, name):
+        """Get statistics for the recent samples of name, in milliseconds.
+
+        Return None if name has no recent samples.
+
+        """
+        try:
+            s = self.sections[name]
+        except KeyError:
+            return None
+        samples = sorted(s.samples)
+        if not samples:
+            return None
+        n = len(samples)
+        stats = {
+            'count': self.counts[name],
+            'mean': 1000.0 * sum(samples) / n,
+            'max': 1000.0 * samples[-1],
+        }
+        for p in self.PERCENTILES:
+            stats['p%d' % p] = 1000.0 * percentile(samples, p)
+        return stats
+
+    def report(self):
+        """Get statistics for every section, as a dict keyed by name.
+
+        This is safe to call from another thread, such as a web server.
+
+        """
+        report = {}
+        for name, s in self.sections.items():
+            stats = self.stats(name)
+            if stats:
+                report[name] = stats
+        return report